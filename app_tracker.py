@@ -12,8 +12,6 @@ class ApplicationTracker:
         self.current_app = None
         self.start_time = None
         self.app_times = {}
-        # Initialize logging
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
     def get_active_window_process(self):
@@ -31,8 +29,8 @@ class ApplicationTracker:
                 process = psutil.Process(pid)
                 process_name = process.name()
                 
-                # Log the detected window and process
-                self.logger.info(f"Active Window: '{window_title}' - Process: {process_name}")
+                # Log the detected window and process (every poll, so debug only)
+                self.logger.debug("Active Window: %r - Process: %s", window_title, process_name)
                 
                 # Only return non-system processes with window titles
                 if window_title and process_name not in ['explorer.exe', 'MemCompression', 'System']:
@@ -40,11 +38,11 @@ class ApplicationTracker:
                 return process_name
                 
             except psutil.NoSuchProcess:
-                self.logger.warning(f"Could not find process with PID {pid}")
+                self.logger.warning("Could not find process with PID %s", pid)
                 return "Unknown"
                 
         except Exception as e:
-            self.logger.error(f"Error getting active window: {e}")
+            self.logger.error("Error getting active window: %s", e)
             return "Unknown"
     
     def track(self):
@@ -71,8 +69,8 @@ class ApplicationTracker:
                             else:
                                 self.app_times[self.current_app] = duration
                             
-                            self.logger.info(f"Switched from '{self.current_app}' to '{active_app}' "
-                                           f"(duration: {duration:.2f}s)")
+                            self.logger.info("Switched from %r to %r (duration: %.2fs)",
+                                             self.current_app, active_app, duration)
                     
                     # Reset for new app
                     self.current_app = active_app
@@ -102,14 +100,15 @@ class ApplicationTracker:
         app_groups = {}
         for app_window, duration in self.app_times.items():
             app_name = app_window.split(" (")[0]
-            window_title = app_window.split(" (")[1][:-1] if " (" in app_window else ""
+            window_title = app_window.split(" (", 1)[1][:-1] if " (" in app_window else ""
             
             if app_name not in app_groups:
                 app_groups[app_name] = {"total": 0, "windows": {}}
             
             app_groups[app_name]["total"] += duration
             if window_title:
-                app_groups[app_name]["windows"][window_title] = duration
+                windows = app_groups[app_name]["windows"]
+                windows[window_title] = windows.get(window_title, 0) + duration
         
         data = {
             'date': current_date,
@@ -139,14 +138,15 @@ class ApplicationTracker:
         app_groups = {}
         for app_window, duration in self.app_times.items():
             app_name = app_window.split(" (")[0]
-            window_title = app_window.split(" (")[1][:-1] if " (" in app_window else ""
+            window_title = app_window.split(" (", 1)[1][:-1] if " (" in app_window else ""
             
             if app_name not in app_groups:
                 app_groups[app_name] = {"total": 0, "windows": {}}
             
             app_groups[app_name]["total"] += duration
             if window_title:
-                app_groups[app_name]["windows"][window_title] = duration
+                windows = app_groups[app_name]["windows"]
+                windows[window_title] = windows.get(window_title, 0) + duration
         
         # Display grouped summary
         for app_name, data in sorted(app_groups.items(), key=lambda x: x[1]["total"], reverse=True):
@@ -161,5 +161,6 @@ class ApplicationTracker:
                     print(f"    - {window}: {minutes:.2f} minutes")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     tracker = ApplicationTracker()
     tracker.track() 
\ No newline at end of file
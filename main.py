@@ -1,8 +1,16 @@
+from time_tracker.tracker.activity_log import configure_logging
 from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.watchdog import WatchdogProbe
 
 def main():
-    tracker = ApplicationTracker()
-    tracker.track()
+    listener = configure_logging()
+    probe = WatchdogProbe()
+    try:
+        tracker = ApplicationTracker(window_source=probe, resume=True)
+        tracker.track()
+    finally:
+        probe.close()
+        listener.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
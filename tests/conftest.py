@@ -1,8 +1,25 @@
 import pytest
 import sys
+import time
 from pathlib import Path
 
 # Add project root to Python path
 project_root = str(Path(__file__).parent.parent)
 if project_root not in sys.path:
-    sys.path.insert(0, project_root) 
\ No newline at end of file
+    sys.path.insert(0, project_root) 
+
+@pytest.fixture
+def new_york_tz(monkeypatch):
+    """
+    Fixture to run a test in a timezone with daylight saving time.
+
+    Returns:
+        str: The TZ name, America/New_York (clocks go forward on 2024-03-10)
+    """
+    if not hasattr(time, "tzset"):
+        pytest.skip("Setting TZ needs time.tzset")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield "America/New_York"
+    monkeypatch.undo()
+    time.tzset()
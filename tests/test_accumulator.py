@@ -0,0 +1,103 @@
+import threading
+import pytest
+from time_tracker.tracker.accumulator import TimeAccumulator
+
+# Constants for testing
+TEST_TOTALS = {
+    "code.exe (main.py)": 600.0,
+    "chrome.exe (Docs)": 300.0,
+    "explorer.exe": 45.0,
+}
+
+@pytest.fixture
+def totals():
+    """
+    Fixture to create an accumulator holding the test totals.
+
+    Returns:
+        TimeAccumulator: Accumulator with three apps
+    """
+    return TimeAccumulator(TEST_TOTALS)
+
+class TestTimeAccumulator:
+    """Test suite for the copy-on-write app totals."""
+
+    def test_mapping(self, totals):
+        """Test that the accumulator reads like the dict it replaces."""
+        assert totals == TEST_TOTALS, "Should compare equal to a dict with the same totals"
+        totals.add("explorer.exe", 15.0)
+        totals["notepad.exe"] = 5.0
+        del totals["chrome.exe (Docs)"]
+        assert dict(totals) == {"code.exe (main.py)": 600.0, "explorer.exe": 60.0,
+                                "notepad.exe": 5.0}, "Updates should be applied"
+        assert len(totals) == 3, "Length should follow additions and removals"
+        with pytest.raises(KeyError):
+            del totals["missing.exe"]
+
+    def test_snapshot_isolation(self, totals):
+        """Test that a snapshot never sees later updates."""
+        snapshot = totals.snapshot()
+        totals.add("code.exe (main.py)", 60.0)
+        totals.add("new.exe", 1.0)
+
+        assert snapshot == TEST_TOTALS, "An old snapshot should keep its totals"
+        assert totals.snapshot()["code.exe (main.py)"] == 660.0, \
+            "A new snapshot should see the update"
+        assert totals.epoch == snapshot.epoch + 2, "Every update should publish an epoch"
+
+    def test_structural_sharing(self):
+        """Test that an update copies only the shard it touches."""
+        totals = TimeAccumulator({f"app{i}.exe": float(i) for i in range(1000)})
+        before = totals.snapshot()
+        totals.add("app1.exe", 1.0)
+        after = totals.snapshot()
+
+        shared = sum(old is new for old, new in zip(before._shards, after._shards))
+        assert shared == len(before._shards) - 1, "Untouched shards should be shared"
+
+    def test_diff(self, totals):
+        """Test that a diff reports only the entries updated since an earlier snapshot."""
+        before = totals.snapshot()
+        assert before.diff(None) == (dict(before), []), "No earlier snapshot means all changed"
+        assert before.diff(before) == ({}, []), "A snapshot should not differ from itself"
+
+        totals.add("code.exe (main.py)", 60.0)
+        totals.fold("chrome.exe (Docs)", "chrome.exe")
+        changed, removed = totals.snapshot().diff(before)
+        assert changed == {"code.exe (main.py)": 660.0, "chrome.exe": 300.0}, \
+            "Should report the updated totals"
+        assert removed == ["chrome.exe (Docs)"], "Should report the removed app"
+
+    def test_fold(self, totals):
+        """Test that folding a title into its process is a single update."""
+        epoch = totals.epoch
+        totals.fold("chrome.exe (Docs)", "chrome.exe")
+        assert "chrome.exe (Docs)" not in totals, "The folded key should be removed"
+        assert totals["chrome.exe"] == 300.0, "Its time should move to the process"
+        assert totals.epoch == epoch + 1, "Folding should publish one snapshot"
+
+    def test_concurrent_readers(self):
+        """Test that readers on other threads always see a consistent total."""
+        totals = TimeAccumulator({"a.exe (x)": 0.0})
+        stop = threading.Event()
+        seen = [[], []]
+
+        def read(sums):
+            while not stop.is_set():
+                sums.append(sum(totals.snapshot().values()))
+
+        readers = [threading.Thread(target=read, args=(sums,)) for sums in seen]
+        for reader in readers:
+            reader.start()
+        for i in range(20000):
+            totals.add(f"a.exe ({i % 50})", 1.0)
+            if i % 7 == 0:
+                totals.fold(f"a.exe ({i % 50})", "a.exe")
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+        assert sum(totals.values()) == 20000.0, "No time should be lost"
+        # A half-applied fold would show up as the total dropping
+        for sums in seen:
+            assert sums == sorted(sums), "Each reader should see the total only grow"
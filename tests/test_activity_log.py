@@ -0,0 +1,74 @@
+import pytest
+import logging
+import logging.handlers
+from unittest.mock import Mock
+from time_tracker.tracker.activity_log import (
+    RecentActivity, SwitchEvent, configure_logging
+)
+from time_tracker.tracker.application_tracker import ApplicationTracker
+
+@pytest.fixture
+def restore_root_logger():
+    """Restore the root logger's handlers and level after a test."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+class TestRecentActivity:
+    """Test suite for the recent switch ring buffer."""
+
+    def test_ring_buffer_bounded(self):
+        """Test that only the newest switches are kept."""
+        recent = RecentActivity(maxlen=3)
+        for i in range(10):
+            recent.append(SwitchEvent(float(i), f"app{i}", f"app{i + 1}", 2.0))
+
+        assert len(recent) == 3, "Buffer should keep maxlen events"
+        assert recent.total == 10, "Total should count every switch"
+        assert [e.from_app for e in recent.recent()] == ["app9", "app8", "app7"], \
+            "Recent events should be newest first"
+        assert len(recent.recent(1)) == 1, "Should limit the number of events returned"
+
+    def test_tracker_records_switches(self):
+        """Test that the tracker returns and buffers structured switch events."""
+        tracker = ApplicationTracker(storage_handler=Mock())
+        tracker._handle_app_switch("a.exe", 100.0)
+        event = tracker._handle_app_switch("b.exe", 105.0)
+
+        assert event == SwitchEvent(105.0, "a.exe", "b.exe", 5.0), \
+            "Switch should be returned as a structured event"
+        assert tracker.recent_switches.recent() == [event], "Switch should be buffered"
+        assert tracker._handle_app_switch("b.exe", 106.0) is None, \
+            "No event without a switch"
+
+    def test_tracker_does_not_configure_logging(self, restore_root_logger):
+        """Test that constructing a tracker leaves logging configuration alone."""
+        restore_root_logger.handlers[:] = []
+        ApplicationTracker(storage_handler=Mock())
+        assert restore_root_logger.handlers == [], "Tracker should not add handlers"
+
+class TestConfigureLogging:
+    """Test suite for the queued logging setup."""
+
+    def test_routes_through_queue(self, restore_root_logger, capsys):
+        """Test that records are handled by the background listener."""
+        listener = configure_logging(logging.INFO)
+        try:
+            assert any(isinstance(h, logging.handlers.QueueHandler)
+                       for h in restore_root_logger.handlers), "Should install a QueueHandler"
+            logging.getLogger("test").info("Switched from %r", "a.exe")
+        finally:
+            listener.stop()
+
+        assert "Switched from 'a.exe'" in capsys.readouterr().err, \
+            "Listener should format and emit the record"
+
+    def test_reconfigure_replaces_queue_handler(self, restore_root_logger):
+        """Test that configuring twice does not duplicate queue handlers."""
+        configure_logging().stop()
+        configure_logging().stop()
+        queue_handlers = [h for h in restore_root_logger.handlers
+                          if isinstance(h, logging.handlers.QueueHandler)]
+        assert len(queue_handlers) == 1, "Only one QueueHandler should be installed"
@@ -1,7 +1,12 @@
 import pytest
 from unittest.mock import Mock, patch
 from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.pipeline import SegmentEvent
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.__main__ import main
+import json
 import time
+from datetime import date, datetime
 
 # Constants for testing
 TEST_APP_NAME = "test_app.exe"
@@ -52,8 +57,8 @@ class TestApplicationTracker:
         """Test updating application time with various durations."""
         app_name = TEST_APP_NAME
         
-        # Update time for the first time
-        tracker._update_app_time(app_name, duration)
+        # Short segments are dropped by the default pipeline's debounce stage
+        tracker.pipeline.send(SegmentEvent(app_name, 100.0, 100.0 + duration))
         
         if should_log:
             assert app_name in tracker.app_times, \
@@ -64,6 +69,21 @@ class TestApplicationTracker:
             assert app_name not in tracker.app_times, \
                 f"App should not be logged for duration {duration}"
     
+    def test_threshold_comes_from_pipeline(self):
+        """Test that only the pipeline's debounce decides which segments are too short."""
+        tracker = ApplicationTracker(storage_handler=Mock(), pipeline_config={
+            "stages": [{"type": "debounce", "min_seconds": 0.2}],
+            "sinks": [{"type": "tracker"}],
+        })
+        tracker._handle_app_switch("a.exe", 0.0)
+        tracker._handle_app_switch("b.exe", 0.5)
+        tracker._handle_app_switch("a.exe", 0.6)
+        
+        assert tracker.app_times == {"a.exe": 0.5}, \
+            "Segments longer than the configured debounce should count"
+        assert tracker.focus_sketches["a.exe"].count == 1, \
+            "Focus sketches should see the same segments"
+    
     @patch('time.time')
     def test_handle_app_switch(self, mock_time, tracker):
         """Test handling of application switching."""
@@ -114,5 +134,108 @@ class TestApplicationTracker:
         tracker.track()
         
         # Verify cleanup was performed
-        tracker.storage.save_data.assert_called_once_with(tracker.app_times)
-        tracker.storage.display_summary.assert_called_once_with(tracker.app_times) 
\ No newline at end of file
+        tracker.storage.save_data.assert_called_once_with(
+            tracker.app_times, focus_sketches=tracker.focus_sketches)
+        tracker.storage.display_summary.assert_called_once_with(tracker.app_times)     
+    def test_record_segment_timeline(self, tracker):
+        """Test that finished segments are recorded in the day timeline."""
+        start = datetime(2024, 3, 21, 14, 0).timestamp()
+        tracker._handle_app_switch(TEST_APP_NAME, start)
+        tracker._handle_app_switch("new_app.exe", start + 600)
+        
+        timeline = tracker.timelines[date(2024, 3, 21)]
+        assert timeline.app_at(datetime(2024, 3, 21, 14, 5)) == TEST_APP_NAME, \
+            "Timeline should show the app active at that minute"
+        
+        tracker.save()
+        tracker.storage.save_timeline.assert_called_once_with(timeline)
+
+    def test_resume_today(self, tmp_path):
+        """Test that a restarted tracker extends today's saved totals."""
+        storage = DataStorage(data_dir=tmp_path)
+        first = ApplicationTracker(storage_handler=storage)
+        first._record_segment("code.exe (main.py)", time.time() - 120, time.time() - 60)
+        first.save()
+        
+        resumed = ApplicationTracker(storage_handler=storage, resume=True)
+        assert resumed.app_times == pytest.approx(first.app_times), \
+            "Should start from the saved totals"
+        assert date.today() in resumed.timelines, "Should reload today's timeline"
+    
+    def test_resume_loads_once(self, tmp_path):
+        """Test that resuming many titles publishes once and skips the day file."""
+        storage = DataStorage(data_dir=tmp_path)
+        first = ApplicationTracker(storage_handler=storage)
+        start = time.time() - 3600
+        for n in range(3000):
+            first._record_segment(f"code.exe (file{n}.py)", start, start + 1.5)
+        first.save()
+        
+        with patch.object(storage, "load_day", side_effect=AssertionError("day file parsed")):
+            resumed = ApplicationTracker(storage_handler=storage, resume=True)
+        assert resumed.app_times.epoch == 1, "Totals should be published in one step"
+        assert len(resumed.app_times) == 3000, "Every title should be resumed"
+        assert resumed.focus_sketches["code.exe"].count == 3000, \
+            "Focus sketches should come from the same load"
+
+    def test_events(self, mock_storage):
+        """Test that events() yields switches, heartbeats and checkpoints and saves on close."""
+        ticks = iter(range(1000, 100000, 10))
+        apps = iter(["a.exe", "a.exe", "b.exe", "b.exe", "b.exe", "a.exe"] * 100)
+        tracker = ApplicationTracker(storage_handler=mock_storage,
+                                     clock=lambda: float(next(ticks)),
+                                     window_source=lambda: next(apps))
+
+        events = tracker.events(interval=0, heartbeat_every=25, checkpoint_every=55)
+        received = [next(events) for _ in range(6)]
+        events.close()
+
+        types = [event["type"] for event in received]
+        assert {"switch", "heartbeat", "checkpoint"} <= set(types), \
+            "Should yield every kind of event"
+        switch = next(event for event in received if event["type"] == "switch")
+        assert (switch["from"], switch["to"]) == ("a.exe", "b.exe"), \
+            "Switch events should name both apps"
+        checkpoint = next(event for event in received if event["type"] == "checkpoint")
+        assert checkpoint["app_times"], "Checkpoints should carry the totals"
+        assert mock_storage.save_data.call_count == types.count("checkpoint") + 1, \
+            "Should save at every checkpoint and once more on close"
+
+    def test_stream_command_output_is_ndjson(self, tmp_path, capsys):
+        """Test that every stdout line of the stream command is a JSON object."""
+        sleeps = iter(range(3))
+
+        def sleep(seconds):
+            if next(sleeps, None) is None:
+                raise KeyboardInterrupt
+
+        with patch('time_tracker.tracker.application_tracker.time.sleep', side_effect=sleep):
+            with pytest.raises(SystemExit) as exit_info:
+                main(["--data-dir", str(tmp_path), "stream", "--interval", "0",
+                      "--heartbeat", "0", "--checkpoint", "0"])
+
+        assert exit_info.value.code == 0, "Stream should stop cleanly on Ctrl+C"
+        lines = capsys.readouterr().out.splitlines()
+        events = [json.loads(line) for line in lines]
+        assert "checkpoint" in {event["type"] for event in events}, \
+            "Checkpoints (which save) should be streamed"
+        assert date.today() in [day for day, _ in DataStorage(tmp_path).iter_days()], \
+            "The stream should still save its data"
+
+    def test_stream_command_shares_snapshot(self, tmp_path, capsys):
+        """Test that the stream command honours the same global options as the window."""
+        sleeps = iter(range(3))
+
+        def sleep(seconds):
+            if next(sleeps, None) is None:
+                raise KeyboardInterrupt
+
+        with patch('time_tracker.tracker.application_tracker.time.sleep', side_effect=sleep), \
+             patch('time_tracker.cli.SnapshotPublisher') as publisher:
+            with pytest.raises(SystemExit):
+                main(["--data-dir", str(tmp_path), "--shared-snapshot", "tt_stream",
+                      "stream", "--interval", "0"])
+
+        publisher.assert_called_once_with("tt_stream")
+        assert publisher.return_value.publish_changes.called, "Polls should publish the totals"
+        publisher.return_value.close.assert_called_once_with()
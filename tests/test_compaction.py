@@ -0,0 +1,143 @@
+import pytest
+import json
+from datetime import date, timedelta
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.data_handlers.compaction import Compactor, RetentionPolicy
+from time_tracker.data_handlers.export import iter_usage_rows
+from time_tracker.data_handlers.history import HistoryQuery
+from time_tracker.data_handlers.query_cache import QueryCache
+
+# Constants for testing
+TODAY = date(2024, 6, 15)
+POLICY = RetentionPolicy(detail_days=30, summary_days=60, top_titles=2)
+
+def make_day(day):
+    """Build saved data for a day with three titled chrome windows."""
+    return {
+        "date": day.isoformat(),
+        "total_tracking_time": 100.0,
+        "applications": {
+            "chrome.exe": {
+                "total_time": 100.0,
+                "windows": {"Mail": 50.0, "Docs": 30.0, "News": 20.0},
+            }
+        },
+    }
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Fixture to create a storage directory holding 90 consecutive days.
+
+    Returns:
+        DataStorage: Storage with days from TODAY - 89 to TODAY
+    """
+    storage = DataStorage(data_dir=tmp_path)
+    for offset in range(90):
+        day = TODAY - timedelta(days=offset)
+        storage.write_day(day, make_day(day))
+    return storage
+
+def load(path):
+    """Load a JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+class TestCompactor:
+    """Test suite for the retention and downsampling job."""
+
+    @pytest.mark.storage
+    def test_recent_days_keep_detail(self, storage):
+        """Test that days inside the detail window are left untouched."""
+        Compactor(storage, POLICY).run(today=TODAY)
+
+        data = load(storage.day_path(TODAY - timedelta(days=30)))
+        assert "compaction" not in data, "Recent day should not be compacted"
+        assert len(data["applications"]["chrome.exe"]["windows"]) == 3, \
+            "Recent day should keep every title"
+
+    @pytest.mark.storage
+    def test_older_days_keep_top_titles(self, storage):
+        """Test that aged days keep totals and only the top titles."""
+        Compactor(storage, POLICY).run(today=TODAY)
+
+        data = load(storage.day_path(TODAY - timedelta(days=31)))
+        chrome = data["applications"]["chrome.exe"]
+        assert chrome["windows"] == {"Mail": 50.0, "Docs": 30.0}, \
+            "Only the top titles should be kept"
+        assert chrome["total_time"] == 100.0, "App total should be preserved"
+
+    @pytest.mark.storage
+    def test_old_months_rolled_up(self, storage):
+        """Test that whole months past the summary window become monthly rollups."""
+        summarized, rolled_up = Compactor(storage, POLICY).run(today=TODAY)
+
+        # Cutoff is 2024-04-15, so only March (from the 18th) is complete
+        march = [day for day, _ in storage.iter_days(end=date(2024, 3, 31))]
+        assert march == [], "Rolled up days should be removed"
+        assert rolled_up == 14, "March 18-31 should be rolled up"
+        assert storage.day_path(date(2024, 4, 1)).exists(), \
+            "Incomplete months should not be rolled up"
+
+        month = load(storage.month_path(date(2024, 3, 1)))
+        assert month["applications"]["chrome.exe"]["total_time"] == 1400.0, \
+            "Monthly rollup should sum app totals"
+        assert len(month["days"]) == 14, "Monthly rollup should list merged days"
+
+    @pytest.mark.storage
+    def test_incremental_runs(self, storage):
+        """Test that a second run only touches newly aged-out days."""
+        compactor = Compactor(storage, POLICY)
+        compactor.run(today=TODAY)
+
+        assert compactor.run(today=TODAY) == (0, 0), "Nothing new should be compacted"
+        assert compactor.run(today=TODAY + timedelta(days=1)) == (1, 0), \
+            "One more day should age out"
+
+    @pytest.mark.storage
+    def test_resume_does_not_double_count(self, storage):
+        """Test that a day merged before an interruption is not counted twice."""
+        compactor = Compactor(storage, POLICY)
+        day = date(2024, 3, 20)
+        compactor._roll_up_day(day, storage.day_path(day))
+        storage.write_day(day, make_day(day))  # Simulate a crash before the delete
+
+        compactor.run(today=TODAY)
+
+        month = load(storage.month_path(day))
+        assert month["applications"]["chrome.exe"]["total_time"] == 1400.0, \
+            "Re-running after an interruption should not double count"
+
+    @pytest.mark.storage
+    def test_late_days_are_compacted(self, storage):
+        """Test that old days written after a run are still summarized and rolled up."""
+        compactor = Compactor(storage, POLICY)
+        compactor.run(today=TODAY)
+
+        late_summary = TODAY - timedelta(days=40)
+        storage.delete_day(late_summary)
+        storage.write_day(late_summary, make_day(late_summary))
+        late_rollup = date(2024, 3, 5)
+        storage.write_day(late_rollup, make_day(late_rollup))
+
+        assert compactor.run(today=TODAY) == (1, 1), "Both late days should be compacted"
+        assert storage.manifest_entry(late_rollup) is None, "The late day should be rolled up"
+        month = storage.load_month(late_rollup)
+        assert month["applications"]["chrome.exe"]["total_time"] == 1500.0, \
+            "The rollup should be recomputed with the late day"
+
+    @pytest.mark.storage
+    def test_readers_fall_back_to_rollups(self, storage):
+        """Test that export, report and history still see rolled up months."""
+        Compactor(storage, POLICY).run(today=TODAY)
+        march = (date(2024, 3, 1), date(2024, 3, 31))
+
+        rows = list(iter_usage_rows(storage, *march))
+        assert rows == [("2024-03", "chrome.exe", "", 1400.0)], \
+            "Export should yield the rollup's totals"
+        assert QueryCache(storage).app_totals(*march) == {"chrome.exe": 1400.0}, \
+            "Reports should count the rollup"
+        assert list(HistoryQuery(storage, start=march[0], end=march[1]).rows()) == rows, \
+            "History should list the rollup"
+        assert [key for key, _ in storage.iter_periods(end=date(2024, 4, 1))] == \
+            ["2024-03", "2024-04-01"], "Rollups should sort before the following days"
@@ -0,0 +1,103 @@
+import pytest
+import csv
+import json
+from datetime import date
+from time_tracker.__main__ import main
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.data_handlers.export import iter_usage_rows, write_csv
+
+# Constants for testing
+TEST_DAYS = {
+    "2024-03-20": {
+        "chrome.exe": {"total_time": 90.0, "windows": {"Google": 60.0, "YouTube": 30.0}},
+    },
+    "2024-03-21": {
+        "notepad.exe": {"total_time": 50.0, "windows": {"Document": 45.0}},
+        "explorer.exe": {"total_time": 12.5, "windows": {}},
+    },
+}
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """
+    Fixture to create a data directory with saved day files.
+
+    Returns:
+        Path: Directory holding one file per test day
+    """
+    storage = DataStorage(data_dir=tmp_path)
+    for day, applications in TEST_DAYS.items():
+        storage.write_day(date.fromisoformat(day), {
+            "date": day,
+            "total_tracking_time": sum(a["total_time"] for a in applications.values()),
+            "applications": applications,
+        })
+    (tmp_path / "notes.json").write_text("{}")
+    return tmp_path
+
+class TestExport:
+    """Test suite for flat history export."""
+
+    @pytest.mark.storage
+    def test_iter_days_range(self, data_dir):
+        """Test listing saved days within a date range."""
+        storage = DataStorage(data_dir=data_dir)
+
+        all_days = [day for day, _ in storage.iter_days()]
+        assert all_days == [date(2024, 3, 20), date(2024, 3, 21)], \
+            "Should list day files oldest first and skip other files"
+
+        ranged = [day for day, _ in storage.iter_days(start=date(2024, 3, 21))]
+        assert ranged == [date(2024, 3, 21)], "Should respect the start of the range"
+
+    @pytest.mark.storage
+    def test_iter_usage_rows(self, data_dir):
+        """Test flattening saved days into rows."""
+        rows = list(iter_usage_rows(DataStorage(data_dir=data_dir)))
+
+        assert ("2024-03-20", "chrome.exe", "Google", 60.0) in rows, \
+            "Window rows should be exported"
+        assert ("2024-03-21", "notepad.exe", "", 5.0) in rows, \
+            "Untitled remainder should be exported with an empty window"
+        assert ("2024-03-21", "explorer.exe", "", 12.5) in rows, \
+            "Apps without windows should be exported"
+        assert sum(row[3] for row in rows) == 152.5, "Exported time should match totals"
+
+    def test_iter_usage_rows_is_lazy(self, data_dir):
+        """Test that rows are produced one day at a time."""
+        rows = iter_usage_rows(DataStorage(data_dir=data_dir))
+        assert next(rows)[0] == "2024-03-20", "First row should come from the oldest day"
+
+    def test_write_csv(self, data_dir, tmp_path):
+        """Test CSV output has a header and one line per row."""
+        output = tmp_path / "out.csv"
+        with open(output, "w", newline="") as out:
+            write_csv(iter_usage_rows(DataStorage(data_dir=data_dir)), out)
+
+        with open(output, newline="") as f:
+            lines = list(csv.reader(f))
+        assert lines[0] == ["date", "app", "window", "seconds"], "Should write a header"
+        assert len(lines) == 6, "Should write one line per row"
+
+    def test_export_command_csv_line_endings(self, data_dir, capsysbinary):
+        """Test that CSV on stdout ends lines with a single \\r\\n on every platform."""
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--data-dir", str(data_dir), "export", "--format", "csv"])
+
+        assert exit_info.value.code == 0, "Export should succeed"
+        out = capsysbinary.readouterr().out
+        assert out.startswith(b"date,app,window,seconds\r\n"), "Should write the header"
+        assert b"\r\r\n" not in out and out.count(b"\r\n") == 6, \
+            "Every row should end with exactly one \\r\\n"
+
+    def test_export_command_ndjson(self, data_dir, capsys):
+        """Test the export command writing NDJSON for a date range."""
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--data-dir", str(data_dir), "export", "--format", "ndjson",
+                  "--from", "2024-03-21", "--to", "2024-03-21"])
+
+        assert exit_info.value.code == 0, "Export should succeed"
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {r["date"] for r in records} == {"2024-03-21"}, "Should only export the range"
+        assert {"date": "2024-03-21", "app": "notepad.exe",
+                "window": "Document", "seconds": 45.0} in records, "Should export window rows"
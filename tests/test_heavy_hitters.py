@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import Mock
+from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.heavy_hitters import (
+    SpaceSaving, canonicalize_app, canonicalize_title
+)
+
+class TestCanonicalization:
+    """Test suite for window title canonicalization."""
+
+    @pytest.mark.parametrize("title,expected", [
+        ("(3) Inbox - Mail", "Inbox - Mail"),
+        ("Inbox (12+) - Mail", "Inbox - Mail"),
+        ("[2] Slack - general", "Slack - general"),
+        ("● main.py - Editor", "main.py - Editor"),
+        ("notes.txt *", "notes.txt"),
+        ("Report (final).docx", "Report (final).docx"),
+        ("Build 2024", "Build 2024"),
+    ])
+    def test_canonicalize_title(self, title, expected):
+        """Test stripping volatile counters and markers."""
+        assert canonicalize_title(title) == expected, f"Failed to canonicalize: {title}"
+
+    def test_canonicalize_app(self):
+        """Test canonicalizing the title part of an app key."""
+        assert canonicalize_app("chrome.exe ((3) Inbox)") == "chrome.exe (Inbox)"
+        assert canonicalize_app("chrome.exe ((3))") == "chrome.exe", \
+            "A title that is only a counter should collapse to the process"
+        assert canonicalize_app("explorer.exe") == "explorer.exe"
+
+class TestSpaceSaving:
+    """Test suite for the Space-Saving heavy-hitter sketch."""
+
+    def test_capacity_is_bounded(self):
+        """Test that the sketch never holds more counters than its capacity."""
+        sketch = SpaceSaving(10)
+        for i in range(1000):
+            sketch.add(f"title {i}", 1)
+        assert len(sketch) == 10, "Sketch should hold exactly its capacity"
+
+    def test_heavy_hitters_survive(self):
+        """Test that heavy keys stay monitored among many light ones."""
+        sketch = SpaceSaving(5)
+        for i in range(500):
+            sketch.add("heavy", 10)
+            sketch.add(f"light {i}", 1)
+
+        assert "heavy" in sketch, "Heavy key should be monitored"
+        key, count, error = sketch.top(1)[0]
+        assert key == "heavy", "Heavy key should rank first"
+        assert count - error <= 5000 <= count, "True weight should lie within the error bound"
+
+    def test_eviction_returns_key(self):
+        """Test that admitting a new key reports the evicted one."""
+        sketch = SpaceSaving(2)
+        sketch.add("a", 5)
+        sketch.add("b", 1)
+        assert sketch.add("c", 1) == "b", "Smallest counter should be evicted"
+        assert sketch.counts["c"] == 2, "New key should inherit the evicted count"
+
+class TestBoundedTracker:
+    """Test suite for the tracker's bounded title accounting."""
+
+    def test_process_totals_exact(self):
+        """Test that memory is capped while per-process totals stay exact."""
+        tracker = ApplicationTracker(storage_handler=Mock(), title_capacity=20)
+        start = 1000.0
+        for i in range(2000):
+            tracker._record_segment(f"chrome.exe (Tab {i})", start, start + 2)
+            tracker._record_segment("code.exe (main.py)", start + 2, start + 5)
+            start += 5
+
+        titled = [key for key in tracker.app_times if " (" in key]
+        assert len(titled) <= 20, "Titled entries should be capped"
+        assert "code.exe (main.py)" in tracker.app_times, "Heavy title should be kept"
+
+        chrome = sum(v for k, v in tracker.app_times.items() if k.startswith("chrome.exe"))
+        assert chrome == 4000.0, "Chrome total should be exact"
+        assert tracker.app_times["code.exe (main.py)"] == 6000.0, \
+            "Heavy title total should be exact"
+
+    def test_titles_canonicalized(self):
+        """Test that volatile counters do not create new entries."""
+        tracker = ApplicationTracker(storage_handler=Mock(), title_capacity=20)
+        tracker._record_segment("mail.exe ((3) Inbox)", 0.0, 10.0)
+        tracker._record_segment("mail.exe ((4) Inbox)", 10.0, 20.0)
+
+        assert tracker.app_times == {"mail.exe (Inbox)": 20.0}, \
+            "Counter variants should share one entry"
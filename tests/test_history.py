@@ -0,0 +1,126 @@
+import pytest
+import time
+from datetime import date
+from unittest.mock import patch
+from PyQt6.QtCore import QModelIndex, Qt
+from PyQt6.QtWidgets import QApplication
+from time_tracker.data_handlers.history import HistoryQuery
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.ui.history_model import HistoryModel
+
+# Constants for testing
+TEST_DAYS = {
+    "2024-03-20": {
+        "chrome.exe": {"total_time": 90.0, "windows": {"Google": 60.0, "YouTube": 30.0}},
+    },
+    "2024-03-21": {
+        "notepad.exe": {"total_time": 50.0, "windows": {"Document": 45.0}},
+        "explorer.exe": {"total_time": 12.5, "windows": {}},
+    },
+}
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Fixture to create a storage instance with saved test days.
+
+    Returns:
+        DataStorage: Storage holding two days of history
+    """
+    storage = DataStorage(data_dir=tmp_path)
+    for day, applications in TEST_DAYS.items():
+        storage.write_day(date.fromisoformat(day), {
+            "date": day,
+            "total_tracking_time": sum(a["total_time"] for a in applications.values()),
+            "applications": applications,
+        })
+    return storage
+
+@pytest.fixture
+def app():
+    """Create a Qt Application."""
+    return QApplication.instance() or QApplication([])
+
+def fetch_all(model, timeout=5.0):
+    """Fetch pages until the model is exhausted, processing queued signals."""
+    deadline = time.monotonic() + timeout
+    while not model._exhausted and time.monotonic() < deadline:
+        model.fetchMore(QModelIndex())
+        QApplication.processEvents()
+        time.sleep(0.005)
+    QApplication.processEvents()
+
+class TestHistoryQuery:
+    """Test suite for paged history queries."""
+
+    @pytest.mark.storage
+    def test_date_order(self, storage):
+        """Test that rows stream in date order in either direction."""
+        rows = list(HistoryQuery(storage).rows())
+        assert [row[0] for row in rows][0] == "2024-03-20", "Should start with the oldest day"
+        assert len(rows) == 5, "Should include untitled remainders"
+
+        rows = list(HistoryQuery(storage, descending=True).rows())
+        assert rows[0][0] == "2024-03-21", "Descending should start with the newest day"
+
+    @pytest.mark.storage
+    def test_filter_and_sort(self, storage):
+        """Test filtering by app or title and sorting by another column."""
+        rows = list(HistoryQuery(storage, filter_text="TUBE").rows())
+        assert rows == [("2024-03-20", "chrome.exe", "YouTube", 30.0)], \
+            "Filter should match titles case-insensitively"
+
+        rows = list(HistoryQuery(storage, sort_column="seconds", descending=True).rows())
+        assert [row[3] for row in rows] == [60.0, 45.0, 30.0, 12.5, 5.0], \
+            "Should sort by seconds"
+
+        with pytest.raises(ValueError):
+            HistoryQuery(storage, sort_column="minutes")
+
+    @pytest.mark.storage
+    def test_sort_merges_spilled_runs(self, storage):
+        """Test that sorting more rows than one run merges the spilled runs in order."""
+        expected = sorted(HistoryQuery(storage).rows(), key=lambda row: (row[3], row[0]))
+        with patch("time_tracker.data_handlers.history.RUN_ROWS", 2):
+            rows = list(HistoryQuery(storage, sort_column="seconds").rows())
+            descending = list(HistoryQuery(storage, sort_column="seconds",
+                                           descending=True).rows())
+        assert rows == expected, "Merged runs should give the same order as one sort"
+        assert [row[3] for row in descending] == [60.0, 45.0, 30.0, 12.5, 5.0], \
+            "Runs should merge in descending order too"
+
+    def test_pages(self, storage):
+        """Test splitting rows into fixed-size pages."""
+        assert [len(page) for page in HistoryQuery(storage).pages(2)] == [2, 2, 1], \
+            "Should yield full pages and a final partial page"
+
+class TestHistoryModel:
+    """Test suite for the lazily fetched history table model."""
+
+    def test_fetches_in_pages(self, app, storage):
+        """Test that rows arrive page by page from the background thread."""
+        model = HistoryModel(storage, page_size=2)
+        assert model.rowCount() == 0, "Nothing should load before the view asks"
+        assert model.canFetchMore(QModelIndex()), "Should offer rows to fetch"
+
+        fetch_all(model)
+        assert model.rowCount() == 5, "Should load every row"
+        assert not model.canFetchMore(QModelIndex()), "Should stop once exhausted"
+        assert model.data(model.index(0, 0)) == "2024-03-21", "Newest day should come first"
+        assert model.data(model.index(0, 3)) == "0.8", "Should show minutes"
+        model.close()
+
+    def test_sort_and_filter_restart_query(self, app, storage):
+        """Test that sorting and filtering reset the model and query again."""
+        model = HistoryModel(storage, page_size=2)
+        fetch_all(model)
+
+        model.sort(3, Qt.SortOrder.AscendingOrder)
+        assert model.rowCount() == 0, "Sorting should reset the loaded rows"
+        fetch_all(model)
+        assert model.rows[0][3] == 5.0, "Rows should come back sorted by seconds"
+
+        model.set_filter_text("notepad")
+        fetch_all(model)
+        assert {row[1] for row in model.rows} == {"notepad.exe"}, "Rows should be filtered"
+        model.close()
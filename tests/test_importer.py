@@ -0,0 +1,143 @@
+import pytest
+import json
+from datetime import date
+from unittest.mock import patch
+from time_tracker.__main__ import main
+from time_tracker.data_handlers.importer import LegacyImporter, read_legacy_file
+from time_tracker.data_handlers.storage import DataStorage
+
+# Constants for testing
+LEGACY_DAY = {
+    "date": "2024-03-20",
+    "total_tracking_time": 100.0,
+    "applications": {
+        # Written by the old grouping bug: 30s of "Inbox (5)" overwrote "Inbox (3)"
+        "chrome.exe": {"total_time": 70.0, "windows": {"Inbox": 30.0}},
+        "explorer.exe": {"total_time": 30.0, "windows": {}},
+    },
+}
+
+def write_legacy(path, data):
+    """Write a legacy day file, creating its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=4))
+    return path
+
+@pytest.fixture
+def legacy_dir(tmp_path):
+    """
+    Fixture to create legacy files scattered over several directories.
+
+    Returns:
+        Path: Directory tree holding legacy day files
+    """
+    root = tmp_path / "legacy"
+    write_legacy(root / "desktop" / "app_usage_2024-03-20.json", LEGACY_DAY)
+    write_legacy(root / "backup" / "app_usage_2024-03-20.json", LEGACY_DAY)
+    write_legacy(root / "work" / "app_usage_2024-03-20.json", dict(LEGACY_DAY, applications={
+        "code.exe": {"total_time": 50.0, "windows": {"main.py": 50.0}},
+    }))
+    write_legacy(root / "work" / "app_usage_2024-03-21.json", dict(LEGACY_DAY, date="2024-03-21"))
+    (root / "work" / "app_usage_2024-03-22.json").write_text("{not json")
+    return root
+
+class TestLegacyImporter:
+    """Test suite for the legacy file importer."""
+
+    def test_read_legacy_file(self, tmp_path):
+        """Test validation and normalization of a single file."""
+        path = write_legacy(tmp_path / "app_usage_2024-03-20.json", LEGACY_DAY)
+        legacy = read_legacy_file(path)
+
+        assert legacy.error is None, "A well-formed file should be valid"
+        assert legacy.data["applications"]["chrome.exe"] == {"total_time": 70.0,
+                                                             "windows": {"Inbox": 30.0}}, \
+            "Apps should be kept with their totals"
+
+        path = write_legacy(tmp_path / "app_usage_2024-03-21.json", LEGACY_DAY)
+        assert "does not match" in read_legacy_file(path).error, \
+            "A date that disagrees with the file name should be rejected"
+
+    @pytest.mark.storage
+    def test_import(self, legacy_dir, tmp_path):
+        """Test importing, deduplicating and merging per day."""
+        storage = DataStorage(data_dir=tmp_path / "data")
+        result = LegacyImporter(storage, workers=1).run([legacy_dir])
+
+        assert result.imported == 3, "Should import each distinct file once"
+        assert result.duplicates == 1, "Identical copies should be skipped"
+        assert len(result.invalid) == 1, "Unparseable files should be reported"
+        assert result.days == [date(2024, 3, 20), date(2024, 3, 21)], "Should report the days"
+
+        day = storage.load_day(date(2024, 3, 20))
+        assert set(day["applications"]) == {"chrome.exe", "explorer.exe", "code.exe"}, \
+            "Files for the same day should be merged"
+        assert day["total_tracking_time"] == 150.0, "Merged totals should add up"
+
+    @pytest.mark.storage
+    def test_bad_date_in_name_is_invalid(self, legacy_dir, tmp_path):
+        """Test that a file named after an impossible date is reported, not fatal."""
+        write_legacy(legacy_dir / "work" / "app_usage_2024-13-45.json",
+                     dict(LEGACY_DAY, date="2024-13-45"))
+        storage = DataStorage(data_dir=tmp_path / "data")
+        result = LegacyImporter(storage, workers=1).run([legacy_dir])
+
+        assert result.imported == 3, "The other files should still be imported"
+        assert any(path.endswith("app_usage_2024-13-45.json") and "ValueError" in error
+                   for path, error in result.invalid), "The bad file should be reported"
+
+    @pytest.mark.storage
+    def test_import_is_idempotent(self, legacy_dir, tmp_path):
+        """Test that re-running an import does not double count."""
+        storage = DataStorage(data_dir=tmp_path / "data")
+        LegacyImporter(storage, workers=1).run([legacy_dir])
+        result = LegacyImporter(storage, workers=1).run([legacy_dir])
+
+        assert result.imported == 0, "Already imported files should be skipped"
+        assert storage.load_day(date(2024, 3, 20))["total_tracking_time"] == 150.0, \
+            "Existing days should be unchanged"
+
+    @pytest.mark.storage
+    def test_retry_after_crash_before_log(self, legacy_dir, tmp_path):
+        """Test that days written by an import that died before its log are not counted twice."""
+        storage = DataStorage(data_dir=tmp_path / "data")
+        with patch("time_tracker.data_handlers.importer.atomic_write_json",
+                   side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                LegacyImporter(storage, workers=1).run([legacy_dir])
+        assert not (storage.data_dir / "import_log.json").exists(), "The log should be missing"
+
+        result = LegacyImporter(storage, workers=1).run([legacy_dir])
+        assert result.imported == 0, "Sources already in the day files should be skipped"
+        assert storage.load_day(date(2024, 3, 20))["total_tracking_time"] == 150.0, \
+            "The retry should not add the days again"
+        assert len(json.loads((storage.data_dir / "import_log.json").read_text())["imported"]) \
+            == 3, "The retry should record the sources in the log"
+
+    @pytest.mark.storage
+    def test_import_merges_with_existing_day(self, legacy_dir, tmp_path):
+        """Test that imported time adds to a day already in storage."""
+        storage = DataStorage(data_dir=tmp_path / "data")
+        storage.write_day(date(2024, 3, 21), {
+            "date": "2024-03-21", "total_tracking_time": 10.0,
+            "applications": {"chrome.exe": {"total_time": 10.0, "windows": {"Inbox": 10.0}}},
+        })
+        LegacyImporter(storage, workers=1).run([legacy_dir / "work"])
+
+        chrome = storage.load_day(date(2024, 3, 21))["applications"]["chrome.exe"]
+        assert chrome == {"total_time": 80.0, "windows": {"Inbox": 40.0}}, \
+            "Window and app times should be summed"
+
+    def test_import_command(self, legacy_dir, tmp_path, capsys):
+        """Test the import command with worker processes and a dry run."""
+        data_dir = tmp_path / "data"
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--data-dir", str(data_dir), "import", "--dry-run", "--workers", "2",
+                  str(legacy_dir)])
+
+        assert exit_info.value.code == 1, "Invalid files should make the command fail"
+        out = capsys.readouterr().out
+        assert "Would import 3 file(s) into 2 day(s); skipped 1 duplicate(s)" in out, \
+            "Should summarize the import"
+        assert "INVALID" in out, "Should list invalid files"
+        assert not list(data_dir.rglob("app_usage_*.json")), "A dry run should write nothing"
@@ -0,0 +1,185 @@
+import pytest
+import asyncio
+import socket
+import threading
+import time
+from datetime import date, datetime
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.ingest.client import IngestClient, IngestSink
+from time_tracker.ingest.protocol import encode_frame, read_frame
+from time_tracker.ingest.server import IngestServer
+from time_tracker.tracker.pipeline import SegmentEvent
+
+# Constants for testing
+TEST_DAY = date(2024, 3, 21)
+TEST_START = datetime(2024, 3, 21, 9, 0).timestamp()
+
+def event(app, offset, seconds):
+    """Return a segment event starting offset seconds into the test day's morning."""
+    return {"app": app, "start": TEST_START + offset, "end": TEST_START + offset + seconds}
+
+@pytest.fixture
+def running_server(tmp_path):
+    """
+    Fixture to run an ingest server on a background event loop.
+
+    Returns:
+        tuple: The IngestServer and a function running a coroutine on its loop
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def run(coro, timeout=10):
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    server = IngestServer(tmp_path / "central")
+    run(server.start())
+    yield server, run
+    run(server.stop())
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+async def send_batches(port, client, batches):
+    """Send numbered batches over a raw connection and return the welcome and acks."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(encode_frame({"type": "hello", "client": client}))
+    welcome = await read_frame(reader)
+    for seq, events in batches:
+        writer.write(encode_frame({"type": "batch", "seq": seq, "events": events}))
+    acks = [await read_frame(reader) for _ in batches]
+    writer.close()
+    return welcome, acks
+
+def client_totals(server, client):
+    """Return the saved totals of a client's test day."""
+    return DataStorage(server.clients_dir / client).load_app_times(TEST_DAY)
+
+class TestIngestServer:
+    """Test suite for the event ingestion server and client."""
+
+    def test_client_round_trip(self, running_server):
+        """Test that a client's events end up in its storage."""
+        server, _ = running_server
+        client = IngestClient("127.0.0.1", server.port, "ws-1", batch_size=2,
+                              flush_interval=0.05)
+        client.send("code.exe (main.py)", TEST_START, TEST_START + 60)
+        client.send("chrome.exe", TEST_START + 60, TEST_START + 90)
+        client.send("code.exe (main.py)", TEST_START + 90, TEST_START + 100)
+        assert client.flush(timeout=5), "Every event should be acknowledged"
+        client.close()
+
+        assert client_totals(server, "ws-1") == {"code.exe (main.py)": 70.0, "chrome.exe": 30.0}, \
+            "Events should be summed into the client's day"
+
+    def test_client_drops_rejected_batch(self, running_server):
+        """Test that a client gives up on a batch the server rejects."""
+        server, _ = running_server
+        client = IngestClient("127.0.0.1", server.port, "ws-8", batch_size=1,
+                              flush_interval=0.05)
+        client.send("a.exe", TEST_START + 10, TEST_START)
+        client.send("a.exe", TEST_START, TEST_START + 10)
+        assert client.flush(timeout=5), "A rejected batch should not be resent forever"
+        client.close()
+
+        assert client.rejected == 1, "The rejected event should be counted"
+        assert client_totals(server, "ws-8") == {"a.exe": 10.0}, \
+            "The valid batch after it should still be applied"
+
+    def test_resent_batches_applied_once(self, running_server):
+        """Test that acknowledgements make resends idempotent."""
+        server, run = running_server
+        batch = [event("a.exe", 0, 10.0)]
+        welcome, acks = asyncio.run(send_batches(server.port, "ws-2", [(1, batch), (1, batch)]))
+        assert welcome == {"type": "welcome", "ack": 0}, "A new client should start at 0"
+        assert [ack["seq"] for ack in acks] == [1, 1], "Both copies should be acknowledged"
+
+        welcome, acks = asyncio.run(send_batches(server.port, "ws-2", [(1, batch), (2, batch)]))
+        assert welcome["ack"] == 1, "A reconnecting client should learn what was committed"
+        assert client_totals(server, "ws-2") == {"a.exe": 20.0}, \
+            "Each batch should be applied exactly once"
+        sketches = DataStorage(server.clients_dir / "ws-2").load_focus_sketches(TEST_DAY)
+        assert sketches["a.exe"].count == 2, "Focus sketches should also see each batch once"
+
+    def test_state_survives_restart(self, running_server, tmp_path):
+        """Test that committed sequence numbers are persisted."""
+        server, run = running_server
+        asyncio.run(send_batches(server.port, "ws-3", [(5, [event("a.exe", 0, 1.0)])]))
+
+        assert IngestServer(tmp_path / "central").acked["ws-3"] == 5, \
+            "A restarted server should remember the last committed batch"
+
+    def test_malformed_batch_rejected_alone(self, running_server):
+        """Test that a batch with a bad event is rejected without affecting the others."""
+        server, _ = running_server
+        batches = [
+            (1, [event("a.exe", 0, 10.0)]),
+            (2, [event("a.exe", 10, 5.0), {"app": "a.exe", "start": TEST_START, "end": 0}]),
+            (3, [{"app": "a.exe", "start": "soon", "end": TEST_START}]),
+            (4, [{"app": "a.exe", "start": 1e300, "end": 1e300}]),
+            (5, [event("a.exe", 20, 1.0)]),
+        ]
+        _, acks = asyncio.run(send_batches(server.port, "ws-6", batches))
+        assert [ack["type"] for ack in acks] == ["ack", "reject", "reject", "reject", "ack"], \
+            "Only the malformed batches should be rejected"
+        assert client_totals(server, "ws-6") == {"a.exe": 11.0}, \
+            "No event of a rejected batch should be applied"
+        assert server.acked["ws-6"] == 5, "Rejected batches should not block later ones"
+
+    def test_old_days_evicted(self, running_server):
+        """Test that running totals of past days are dropped after a commit."""
+        server, _ = running_server
+        asyncio.run(send_batches(server.port, "ws-7", [(1, [event("a.exe", 0, 10.0)])]))
+        assert not server._days and not server._sketches, \
+            "Days before yesterday should not stay in memory"
+
+        asyncio.run(send_batches(server.port, "ws-7", [(2, [event("a.exe", 10, 5.0)])]))
+        assert client_totals(server, "ws-7") == {"a.exe": 15.0}, \
+            "A late event should add to the saved totals"
+
+    def test_sink_does_not_block_on_unreachable_server(self):
+        """Test that a sink's flush returns at once and close is bounded."""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        sink = IngestSink("127.0.0.1", port, "ws-9", close_timeout=0.2)
+        sink.write(SegmentEvent("a.exe", TEST_START, TEST_START + 10))
+
+        started = time.monotonic()
+        sink.flush()
+        assert time.monotonic() - started < 0.1, "flush() should not wait for the server"
+
+        started = time.monotonic()
+        sink.close()
+        assert time.monotonic() - started < 1.0, "close() should give up after its timeout"
+
+    def test_rejects_bad_hello(self, running_server):
+        """Test that a client id that is not a safe name is refused."""
+        server, _ = running_server
+
+        async def hello():
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(encode_frame({"type": "hello", "client": "../escape"}))
+            return await read_frame(reader)
+
+        assert asyncio.run(hello()) is None, "The connection should be closed"
+
+    @pytest.mark.slow
+    def test_many_connections_group_commit(self, running_server):
+        """Test many concurrent clients, committed in fewer groups than batches."""
+        server, _ = running_server
+
+        async def fleet():
+            await asyncio.gather(*(
+                send_batches(server.port, f"ws-{n}", [
+                    (seq, [event("a.exe", seq * 10 + i, 1.0) for i in range(10)])
+                    for seq in range(1, 6)
+                ])
+                for n in range(200)
+            ))
+
+        commits = server.commits
+        asyncio.run(fleet())
+        assert client_totals(server, "ws-199") == {"a.exe": 50.0}, "Every event should be kept"
+        assert server.commits - commits < 1000, "Batches should be committed in groups"
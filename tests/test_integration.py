@@ -97,7 +97,7 @@ class TestIntegration:
                 pytest.fail("Tracker thread did not stop cleanly")
         
         # Verify data was saved
-        data_files = list(temp_data_dir.glob("app_usage_*.json"))
+        data_files = list(temp_data_dir.rglob("app_usage_*.json"))
         assert len(data_files) == 1, "Should create exactly one data file"
         
         # Verify file content
@@ -118,7 +118,7 @@ class TestIntegration:
         storage.save_data(test_data)
         
         # Verify file was created
-        data_files = list(temp_data_dir.glob("app_usage_*.json"))
+        data_files = list(temp_data_dir.rglob("app_usage_*.json"))
         assert len(data_files) == 1, "Should create exactly one data file"
         
         # Verify file content
@@ -0,0 +1,72 @@
+import pytest
+import urllib.error
+import urllib.request
+from unittest.mock import Mock
+from time_tracker.metrics import MetricsRegistry, MetricsServer, timed
+
+@pytest.fixture
+def registry():
+    """
+    Fixture to create an enabled metrics registry.
+
+    Returns:
+        MetricsRegistry: Registry with recording switched on
+    """
+    registry = MetricsRegistry()
+    registry.enabled = True
+    return registry
+
+class TestMetrics:
+    """Test suite for the metrics registry and endpoint."""
+
+    def test_histogram_buckets(self, registry):
+        """Test that observations land in cumulative buckets."""
+        histogram = registry.histogram("probe_seconds", "Probe latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert '# TYPE probe_seconds histogram' in text, "Should declare the metric type"
+        assert 'probe_seconds_bucket{le="0.1"} 1' in text, "Should count values under 0.1"
+        assert 'probe_seconds_bucket{le="1.0"} 3' in text, "Buckets should be cumulative"
+        assert 'probe_seconds_bucket{le="+Inf"} 4' in text, "Should count every value"
+        assert 'probe_seconds_count 4' in text, "Should report the count"
+
+    def test_timed_only_records_when_enabled(self, registry):
+        """Test that the timing decorator is inert while the registry is disabled."""
+        func = timed("call_seconds", "Call latency", registry=registry)(Mock(return_value=7))
+        histogram = registry.histogram("call_seconds", "Call latency")
+
+        registry.enabled = False
+        assert func() == 7, "Should pass the return value through"
+        assert sum(histogram.counts) == 0, "Nothing should be recorded while disabled"
+
+        registry.enabled = True
+        func()
+        assert sum(histogram.counts) == 1, "Should record a call while enabled"
+
+    def test_gauge_reads_callback(self, registry):
+        """Test that gauges are read at render time and failures are skipped."""
+        values = {"a": 1}
+        registry.gauge("entries", "Entries", lambda: len(values))
+        registry.gauge("broken", "Broken", Mock(side_effect=OSError))
+        values["b"] = 2
+
+        text = registry.render()
+        assert "entries 2" in text, "Gauge should reflect the current value"
+        assert "\nbroken " not in text, "A failing gauge should not emit a sample"
+
+    def test_server_endpoint(self, registry):
+        """Test serving the registry over HTTP on localhost."""
+        registry.counter("switches_total", "Switches").inc(3)
+        server = MetricsServer(registry, port=0).start()
+        try:
+            url = f"http://127.0.0.1:{server.port}"
+            with urllib.request.urlopen(url + "/metrics") as response:
+                body = response.read().decode()
+            assert "switches_total 3" in body, "Should serve the counter value"
+
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(url + "/other")
+        finally:
+            server.stop()
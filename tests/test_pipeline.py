@@ -0,0 +1,83 @@
+import pytest
+import json
+from unittest.mock import Mock
+from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.pipeline import (
+    Classify, Debounce, ExcludeProcesses, Pipeline, SegmentEvent, build_pipeline
+)
+
+@pytest.fixture
+def config(tmp_path):
+    """
+    Fixture to create a pipeline config with every stage and an NDJSON sink.
+
+    Returns:
+        dict: Pipeline config
+    """
+    return {
+        "stages": [
+            {"type": "exclude", "processes": ["explorer.exe", "System"]},
+            {"type": "canonicalize"},
+            {"type": "classify", "rules": {"work": ["^code\\.exe"], "web": ["chrome"]}},
+            {"type": "debounce", "min_seconds": 2},
+        ],
+        "sinks": [
+            {"type": "tracker"},
+            {"type": "ndjson", "path": str(tmp_path / "segments.ndjson"), "batch_size": 10},
+        ],
+    }
+
+class TestPipeline:
+    """Test suite for the segment processing pipeline."""
+
+    def test_stages_filter_and_rewrite(self):
+        """Test that stages drop, rewrite and tag events in one pass."""
+        sink = Mock()
+        pipeline = Pipeline([ExcludeProcesses(["System"]), Classify({"work": ["code"]}),
+                             Debounce(1.0)], [sink])
+
+        assert pipeline.send(SegmentEvent("System", 0.0, 10.0)) is None, \
+            "Excluded process should be dropped"
+        assert pipeline.send(SegmentEvent("code.exe (a.py)", 0.0, 0.5)) is None, \
+            "Short segment should be debounced"
+        accepted = pipeline.send(SegmentEvent("code.exe (a.py)", 0.0, 5.0))
+
+        assert accepted.category == "work", "Segment should be classified"
+        sink.write.assert_called_once_with(accepted)
+
+    def test_run_generator(self):
+        """Test processing an iterable of segments lazily."""
+        pipeline = Pipeline([Debounce(1.0)], [])
+        events = [SegmentEvent("a.exe", 0.0, 0.5), SegmentEvent("b.exe", 0.5, 3.0)]
+        assert [e.app for e in pipeline.run(events)] == ["b.exe"]
+
+    def test_unknown_stage_rejected(self):
+        """Test that a misspelled config entry is reported."""
+        with pytest.raises(ValueError):
+            build_pipeline({"stages": [{"type": "debounse"}]})
+
+    def test_tracker_uses_configured_pipeline(self, config, tmp_path):
+        """Test that the tracker routes finished segments through the config."""
+        tracker = ApplicationTracker(storage_handler=Mock(), pipeline_config=config)
+        tracker._handle_app_switch("explorer.exe (Desktop)", 0.0)
+        tracker._handle_app_switch("code.exe ((2) main.py)", 10.0)
+        tracker._handle_app_switch("chrome.exe (Docs)", 20.0)
+        tracker._handle_app_switch("code.exe (main.py)", 21.5)
+        tracker._handle_app_switch("notepad.exe", 30.0)
+
+        assert tracker.app_times == {"code.exe (main.py)": 18.5}, \
+            "Excluded, short and canonicalized segments should be handled by the stages"
+
+        tracker.save()
+        lines = (tmp_path / "segments.ndjson").read_text().splitlines()
+        assert [json.loads(line)["category"] for line in lines] == ["work", "work"], \
+            "Batched sink should be flushed on save"
+
+    def test_default_pipeline_keeps_one_second_rule(self):
+        """Test that the default pipeline matches the historical duration check."""
+        tracker = ApplicationTracker(storage_handler=Mock())
+        tracker._handle_app_switch("a.exe", 0.0)
+        tracker._handle_app_switch("b.exe", 1.0)
+        tracker._handle_app_switch("c.exe", 2.5)
+
+        assert tracker.app_times == {"b.exe": 1.5}, "Segments of 1s or less should be dropped"
@@ -0,0 +1,99 @@
+import pytest
+import time
+from unittest.mock import Mock, patch
+from time_tracker.tracker.process_table import (
+    ProcessInfo, ProcessSnapshotter, describe_process
+)
+
+def fake_process(pid, name, cmdline=None, exe=None, ppid=1, create_time=None):
+    """Build an object shaped like a psutil.Process from process_iter(attrs=...)."""
+    process = Mock()
+    process.info = {"pid": pid, "name": name, "exe": exe, "cmdline": cmdline, "ppid": ppid,
+                    "create_time": create_time}
+    return process
+
+@pytest.fixture
+def process_iter():
+    """
+    Fixture to patch psutil.process_iter with a small process list.
+
+    Returns:
+        Mock: The patched process_iter
+    """
+    with patch('time_tracker.tracker.process_table.psutil.process_iter') as mock_iter:
+        mock_iter.return_value = [
+            fake_process(10, "chrome.exe", ["chrome.exe"], "C:\\chrome.exe"),
+            fake_process(20, "python.exe", ["python.exe", "-u", "C:\\work\\train.py"]),
+            fake_process(30, "System", None),
+        ]
+        yield mock_iter
+
+class TestProcessSnapshotter:
+    """Test suite for the background process table."""
+
+    @pytest.mark.process
+    def test_refresh_publishes_table(self, process_iter):
+        """Test that a refresh publishes an immutable pid table."""
+        snapshotter = ProcessSnapshotter()
+        snapshotter.refresh()
+
+        assert snapshotter.lookup(10).exe == "C:\\chrome.exe", "Should keep process metadata"
+        assert snapshotter.lookup(30).cmdline == (), "Missing cmdline should be empty"
+        with pytest.raises(TypeError):
+            snapshotter.table[40] = None
+        process_iter.assert_called_once_with(attrs=ProcessSnapshotter.ATTRS, ad_value=None)
+
+    @pytest.mark.process
+    def test_miss_wakes_refresh(self, process_iter):
+        """Test that looking up an unknown pid triggers an early refresh."""
+        snapshotter = ProcessSnapshotter(interval=60).start()
+        try:
+            process_iter.return_value = [fake_process(40, "new.exe")]
+            assert snapshotter.lookup(40) is None, "Unknown pid should miss at first"
+
+            for _ in range(200):
+                if snapshotter.lookup(40) is not None:
+                    break
+                time.sleep(0.01)
+            assert snapshotter.lookup(40).name == "new.exe", \
+                "Miss should refresh without waiting for the interval"
+        finally:
+            snapshotter.stop()
+
+    @pytest.mark.process
+    def test_reused_pid_misses(self, process_iter):
+        """Test that a pid reused by a new process is not reported under the old name."""
+        process_iter.return_value = [fake_process(50, "old.exe", create_time=100.0)]
+        snapshotter = ProcessSnapshotter()
+        snapshotter.refresh()
+
+        with patch('time_tracker.tracker.process_table.psutil.Process') as process:
+            process.return_value.create_time.return_value = 200.0
+            assert snapshotter.lookup(50) is None, "A reused pid should count as a miss"
+
+            process.return_value.create_time.return_value = 100.0
+            for _ in range(3):
+                assert snapshotter.lookup(50).name == "old.exe", \
+                    "The same process should be found"
+            assert process.call_count == 2, \
+                "Repeat lookups of the same process should not ask the OS again"
+
+    @pytest.mark.process
+    @pytest.mark.parametrize("cmdline,expected", [
+        (("python.exe", "-u", "C:\\work\\train.py"), "python.exe [train.py]"),
+        (("python.exe", "-m", "pytest"), "python.exe [pytest]"),
+        (("python.exe",), "python.exe"),
+        (("python.exe", "-c", "import train"), "python.exe"),
+        (("node", "-e", "run()", "server.js"), "node"),
+        (("java.exe", "-cp", "lib", "-jar", "/opt/app.jar"), "java.exe [app.jar]"),
+    ])
+    def test_describe_interpreters(self, cmdline, expected):
+        """Test that interpreters are told apart by their script."""
+        info = ProcessInfo(1, cmdline[0], None, cmdline, 0)
+        assert describe_process(info) == expected
+
+    @pytest.mark.process
+    def test_describe_regular_process(self):
+        """Test that other processes keep their name."""
+        info = ProcessInfo(1, "chrome.exe", None, ("chrome.exe", "--type=renderer"), 0)
+        assert describe_process(info) == "chrome.exe"
@@ -0,0 +1,117 @@
+import random
+import pytest
+from datetime import date
+from time_tracker.__main__ import main
+from time_tracker.data_handlers.focus_stats import focus_percentiles, merge_focus_sketches
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.tracker.quantiles import KLLSketch
+
+# Constants for testing
+TEST_DAY = date(2024, 3, 21)
+TEST_QUANTILES = (0.5, 0.9, 0.99)
+
+def rank_error(values, estimate, q):
+    """Return how far the estimate's rank is from q, as a fraction of the values."""
+    below = sum(value < estimate for value in values)
+    return abs(below / len(values) - q)
+
+@pytest.fixture
+def durations():
+    """
+    Fixture to create skewed focus segment lengths.
+
+    Returns:
+        list: 20000 lognormal durations in seconds
+    """
+    rng = random.Random(7)
+    return [rng.lognormvariate(3, 1.2) for _ in range(20000)]
+
+class TestKLLSketch:
+    """Test suite for the mergeable quantile sketch."""
+
+    def test_accuracy(self, durations):
+        """Test that estimated percentiles have a small rank error in bounded space."""
+        sketch = KLLSketch(seed=1)
+        for value in durations:
+            sketch.update(value)
+
+        assert sketch.count == len(durations), "Should count every value"
+        assert sum(len(items) for items in sketch.levels) < 3 * sketch.k, \
+            "Should keep a bounded number of items"
+        for q, estimate in zip(TEST_QUANTILES, sketch.quantiles(TEST_QUANTILES)):
+            assert rank_error(durations, estimate, q) < 0.02, f"p{q * 100:g} should be close"
+        assert sketch.quantile(0) == min(durations), "p0 should be the minimum"
+        assert sketch.quantile(1) == max(durations), "p100 should be the maximum"
+
+    def test_merge_any_order(self, durations):
+        """Test that sketches of parts merge into an accurate whole in any order."""
+        parts = [durations[i::5] for i in range(5)]
+        sketches = []
+        for i, part in enumerate(parts):
+            sketch = KLLSketch(seed=i)
+            for value in part:
+                sketch.update(value)
+            sketches.append(sketch)
+
+        forward, backward = KLLSketch(seed=10), KLLSketch(seed=11)
+        for sketch in sketches:
+            forward.merge(sketch.copy())
+        for sketch in reversed(sketches):
+            backward.merge(sketch.copy())
+
+        for merged in (forward, backward):
+            assert merged.count == len(durations), "Merging should keep the total count"
+            estimate = merged.quantile(0.9)
+            assert rank_error(durations, estimate, 0.9) < 0.03, \
+                "Merged p90 should be close in either order"
+
+    def test_serialization(self, durations):
+        """Test that a sketch survives a round trip through its dict form."""
+        sketch = KLLSketch(seed=2)
+        for value in durations[:5000]:
+            sketch.update(value)
+        restored = KLLSketch.from_dict(sketch.to_dict())
+
+        assert restored.count == sketch.count, "Should keep the count"
+        assert restored.quantile(0.5) == pytest.approx(sketch.quantile(0.5), abs=0.01), \
+            "Should answer the same queries"
+        with pytest.raises(ValueError):
+            restored.merge(KLLSketch(k=50))
+
+class TestFocusStatistics:
+    """Test suite for focus sketches in day files."""
+
+    @pytest.mark.storage
+    def test_saved_and_merged_across_storages(self, tmp_path):
+        """Test that sketches saved by two users merge into fleet percentiles."""
+        storages = []
+        for user, focus in (("alice", 60.0), ("bob", 600.0)):
+            storage = DataStorage(data_dir=tmp_path / user)
+            sketch = KLLSketch()
+            for _ in range(100):
+                sketch.update(focus)
+            storage.save_data({"code.exe": focus * 100}, day=TEST_DAY,
+                              focus_sketches={"code.exe": sketch})
+            storages.append(storage)
+
+        assert storages[0].load_focus_sketches(TEST_DAY)["code.exe"].count == 100, \
+            "Should read the sketch back from the day file"
+        rows = focus_percentiles(merge_focus_sketches(storages))
+        assert rows == [("code.exe", 200, [60.0, 600.0, 600.0])], \
+            "Should merge both users' sketches"
+
+    def test_focus_command(self, tmp_path, capsys):
+        """Test the focus command including ingested clients."""
+        (tmp_path / "clients" / "laptop").mkdir(parents=True)
+        for path in (tmp_path, tmp_path / "clients" / "laptop"):
+            sketch = KLLSketch()
+            sketch.update(120.0)
+            DataStorage(data_dir=path).save_data({"code.exe": 120.0}, day=TEST_DAY,
+                                                 focus_sketches={"code.exe": sketch})
+
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--data-dir", str(tmp_path), "focus", "--fleet"])
+
+        assert exit_info.value.code == 0, "Focus should succeed"
+        assert "code.exe (2 segments): 2.0 / 2.0 / 2.0" in capsys.readouterr().out, \
+            "Should print merged percentiles in minutes"
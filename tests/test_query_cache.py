@@ -0,0 +1,105 @@
+import pytest
+import json
+import os
+from datetime import date
+from unittest.mock import patch
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.data_handlers.query_cache import QueryCache
+
+def write_day(storage, day, chrome_seconds):
+    """Save a day holding only chrome time."""
+    storage.write_day(day, {
+        "date": day.isoformat(),
+        "total_tracking_time": chrome_seconds,
+        "applications": {"chrome.exe": {"total_time": chrome_seconds, "windows": {}}},
+    })
+
+@pytest.fixture
+def parsed_days():
+    """
+    Fixture to record which day files get parsed.
+
+    Returns:
+        list: Names of day files passed to json.load
+    """
+    parsed = []
+    real_load = json.load
+
+    def spy(f, *args, **kwargs):
+        if os.path.basename(f.name).startswith("app_usage_"):
+            parsed.append(os.path.basename(f.name))
+        return real_load(f, *args, **kwargs)
+
+    with patch('time_tracker.data_handlers.query_cache.json.load', side_effect=spy):
+        yield parsed
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Fixture to create storage with three saved days.
+
+    Returns:
+        DataStorage: Storage with 2024-03-20 to 2024-03-22
+    """
+    storage = DataStorage(data_dir=tmp_path)
+    for offset, seconds in enumerate([10.0, 20.0, 30.0]):
+        write_day(storage, date(2024, 3, 20 + offset), seconds)
+    return storage
+
+class TestQueryCache:
+    """Test suite for the mtime-keyed history query cache."""
+
+    @pytest.mark.storage
+    def test_app_totals(self, storage):
+        """Test summing app totals over a range."""
+        cache = QueryCache(storage)
+        assert cache.app_totals() == {"chrome.exe": 60.0}, "Should sum every day"
+        assert cache.app_totals(start=date(2024, 3, 21)) == {"chrome.exe": 50.0}, \
+            "Should respect the range"
+
+    @pytest.mark.storage
+    def test_repeated_query_skips_parsing(self, storage, parsed_days):
+        """Test that a repeated query after a restart does not parse any day file."""
+        cache = QueryCache(storage)
+        cache.app_totals()
+        cache.save()
+        assert len(parsed_days) == 3, "First query should parse every day"
+
+        assert QueryCache(storage).app_totals() == {"chrome.exe": 60.0}
+        assert len(parsed_days) == 3, "Repeated query should not parse any day"
+
+    @pytest.mark.storage
+    def test_changed_day_invalidates(self, storage, parsed_days):
+        """Test that changing one day re-parses only that day."""
+        cache = QueryCache(storage)
+        cache.app_totals()
+        cache.save()
+        parsed_days.clear()
+
+        changed = storage.day_path(date(2024, 3, 21))
+        write_day(storage, date(2024, 3, 21), 25.0)
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert QueryCache(storage).app_totals() == {"chrome.exe": 65.0}, \
+            "Should see the new value"
+        assert parsed_days == ["app_usage_2024-03-21.json"], \
+            "Only the changed day should be parsed"
+
+    @pytest.mark.storage
+    def test_new_day_invalidates(self, storage):
+        """Test that a day added to the range invalidates the cached result."""
+        cache = QueryCache(storage)
+        cache.app_totals()
+        write_day(storage, date(2024, 3, 23), 5.0)
+
+        assert cache.app_totals() == {"chrome.exe": 65.0}, "New day should be included"
+
+    @pytest.mark.storage
+    def test_cache_is_compact(self, storage):
+        """Test that the cache file is written without indentation."""
+        cache = QueryCache(storage)
+        cache.app_totals()
+        cache.save()
+
+        assert "\n" not in cache.cache_path.read_text(), "Cache should be compact JSON"
@@ -0,0 +1,71 @@
+import pytest
+import json
+from unittest.mock import Mock
+from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.replay import (
+    ReplayEngine, VirtualClock, expected_totals, load_trace, synthetic_trace
+)
+
+class TestReplayEngine:
+    """Test suite for deterministic replay on a virtual clock."""
+
+    def test_injected_clock_and_source(self):
+        """Test that poll() uses the injected clock and window source."""
+        clock = VirtualClock(100.0)
+        apps = iter(["a.exe", "b.exe"])
+        tracker = ApplicationTracker(storage_handler=Mock(), clock=clock,
+                                     window_source=lambda: next(apps))
+        tracker.poll()
+        clock.advance(7.5)
+        tracker.poll()
+
+        assert tracker.app_times == {"a.exe": 7.5}, "Should account using the virtual clock"
+
+    def test_small_trace_totals(self):
+        """Test replaying a hand-written trace, including short segments."""
+        trace = [(0.0, "a.exe"), (10.0, "b.exe"), (10.5, "a.exe"), (20.0, "a.exe"),
+                 (30.0, "c.exe")]
+        result = ReplayEngine(trace).run(end_time=45.0)
+
+        assert result.actual == {"a.exe": 29.5, "c.exe": 15.0}, \
+            "Sub-second segments should be dropped and repeats merged"
+        assert result.mismatches == {}, "Tracker should match the independent totals"
+
+    def test_custom_debounce_matches(self):
+        """Test that the expected totals follow the tracker's own debounce threshold."""
+        tracker = ApplicationTracker(storage_handler=Mock(), pipeline_config={
+            "stages": [{"type": "debounce", "min_seconds": 5.0}],
+            "sinks": [{"type": "tracker"}],
+        })
+        trace = [(0.0, "a.exe"), (10.0, "b.exe"), (13.0, "a.exe"), (20.0, "c.exe")]
+        result = ReplayEngine(trace, tracker=tracker).run(end_time=30.0)
+
+        assert "b.exe" not in result.actual, "A 3 s segment is below this debounce"
+        assert result.mismatches == {}, "Expected totals should use the same threshold"
+
+    @pytest.mark.slow
+    def test_full_day_stress(self):
+        """Test an 8-hour, 50k-switch day replays exactly and fast."""
+        trace = synthetic_trace(50000, duration=8 * 3600, seed=42)
+        result = ReplayEngine(trace).run()
+
+        assert result.mismatches == {}, "Totals should be exactly right"
+        assert sum(result.actual.values()) == pytest.approx(
+            sum(expected_totals(trace, trace[-1][0]).values())), "Grand total should match"
+        assert result.speedup > 1000, "Replay should run thousands of times real speed"
+
+    def test_synthetic_trace_deterministic(self):
+        """Test that the same seed produces the same trace."""
+        assert synthetic_trace(100, seed=1) == synthetic_trace(100, seed=1)
+        assert synthetic_trace(100, seed=1) != synthetic_trace(100, seed=2)
+
+    def test_load_trace(self, tmp_path):
+        """Test loading a recorded NDJSON trace."""
+        path = tmp_path / "trace.ndjson"
+        path.write_text("\n".join(json.dumps(r) for r in [
+            {"timestamp": 5.0, "app": "b.exe"},
+            {"timestamp": 0.0, "app": "a.exe"},
+        ]) + "\n")
+
+        assert load_trace(path) == [(0.0, "a.exe"), (5.0, "b.exe")], \
+            "Trace should be loaded in time order"
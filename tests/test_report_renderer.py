@@ -0,0 +1,78 @@
+import pytest
+import json
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+from time_tracker.ui.charts import create_bar_chart, fill_bar_chart
+from time_tracker.ui.report_renderer import ChartRenderer, find_report_jobs, render_reports
+
+# Constants for testing
+TEST_APPLICATIONS = {
+    "code.exe": {"total_time": 3600.0, "windows": {"main.py": 2400.0}},
+    "chrome.exe": {"total_time": 1200.0, "windows": {}},
+}
+
+@pytest.fixture
+def app():
+    """Create a Qt Application."""
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def fleet_dir(tmp_path):
+    """
+    Fixture to create day files for two users.
+
+    Returns:
+        Path: Directory with one subdirectory of day files per user
+    """
+    fleet = tmp_path / "fleet"
+    for user in ("alice", "bob"):
+        partition = fleet / user / "2024" / "03"
+        partition.mkdir(parents=True)
+        for day in ("2024-03-20", "2024-03-21"):
+            (partition / f"app_usage_{day}.json").write_text(json.dumps({
+                "date": day, "total_tracking_time": 4800.0,
+                "applications": TEST_APPLICATIONS,
+            }))
+        (partition / "app_usage_2024-03.json").write_text("{}")
+    return fleet
+
+class TestReportRenderer:
+    """Test suite for offscreen chart report rendering."""
+
+    def test_find_report_jobs(self, fleet_dir, tmp_path):
+        """Test that day files keep their layout below the output directory."""
+        jobs = find_report_jobs([fleet_dir], tmp_path / "out")
+
+        assert len(jobs) == 4, "Should find every day file and skip monthly rollups"
+        assert (fleet_dir / "bob" / "2024" / "03" / "app_usage_2024-03-21.json",
+                tmp_path / "out" / "bob" / "2024" / "03" / "app_usage_2024-03-21.png") in jobs, \
+            "Output should mirror the input layout"
+
+    def test_render_png_and_svg(self, fleet_dir, tmp_path):
+        """Test rendering both formats with one reused renderer."""
+        renderer = ChartRenderer(width=600, height=300)
+        day_file = next(fleet_dir.rglob("app_usage_2024-03-20.json"))
+
+        png = renderer.render_day_file(day_file, tmp_path / "day.png")
+        image = QImage(str(png))
+        assert (image.width(), image.height()) == (600, 300), "PNG should have the requested size"
+
+        svg = renderer.render_day_file(day_file, tmp_path / "day.svg")
+        assert "code.exe" in svg.read_text(), "SVG should contain the chart labels"
+
+    def test_bar_chart_refill_replaces_axes(self, app):
+        """Test that refilling a chart does not pile up axes."""
+        chart = create_bar_chart(animated=False)
+        fill_bar_chart(chart, {"a.exe": 60.0, "b.exe": 30.0})
+        fill_bar_chart(chart, {"c.exe": 90.0})
+
+        assert len(chart.axes()) == 2, "Should keep one x and one y axis"
+
+    @pytest.mark.slow
+    def test_render_reports_pool(self, fleet_dir, tmp_path):
+        """Test fanning out over worker processes."""
+        jobs = find_report_jobs([fleet_dir], tmp_path / "out")
+
+        assert render_reports(jobs, workers=2, width=400, height=200) == 4, \
+            "Should render every job"
+        assert all(output.exists() for _, output in jobs), "Every image should be written"
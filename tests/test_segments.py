@@ -0,0 +1,93 @@
+import pytest
+from datetime import date, datetime
+from unittest.mock import Mock
+from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.segments import Segment, SegmentStore
+
+# Constants for testing
+TEST_SEGMENTS = [
+    ("code.exe (main.py)", 100.0, 160.0),
+    ("chrome.exe (Docs (draft))", 160.0, 190.5),
+    ("explorer.exe", 190.5, 200.0),
+    ("code.exe (main.py)", 200.0, 230.0),
+]
+
+@pytest.fixture
+def store():
+    """
+    Fixture to create a segment store holding the test segments.
+
+    Returns:
+        SegmentStore: Store with four segments
+    """
+    store = SegmentStore()
+    for app, start, end in TEST_SEGMENTS:
+        store.append(app, start, end)
+    return store
+
+class TestSegmentStore:
+    """Test suite for the array-backed segment log."""
+
+    def test_round_trip(self, store):
+        """Test that segments read back in order with their original names."""
+        assert len(store) == 4, "Should hold every appended segment"
+        assert [(s.app, s.start, s.end) for s in store] == TEST_SEGMENTS, \
+            "Iteration should reproduce the appended segments"
+        assert store[-1].duration == 30.0, "Negative indexes should count from the end"
+        with pytest.raises(IndexError):
+            store[4]
+
+    def test_interning(self, store):
+        """Test that repeated names share ids."""
+        assert store.processes == ["code.exe", "chrome.exe", "explorer.exe"], \
+            "Each process should be stored once"
+        assert store.titles == [None, "main.py", "Docs (draft)"], \
+            "Each title should be stored once after the no-title entry"
+        assert store[2].title is None, "Untitled apps should use title id 0"
+
+    def test_compact_columns(self, store):
+        """Test the per-segment size and column snapshots."""
+        assert store.nbytes == 24 * len(store), "Each segment should cost 24 bytes"
+        assert not hasattr(Segment(store, 0), "__dict__"), "Views should use __slots__"
+
+        starts = store.column("start")
+        assert starts.format == "d" and starts.tolist() == [100.0, 160.0, 190.5, 200.0], \
+            "Column views should expose the raw values"
+        store.append("a.exe", 230.0, 240.0)
+        assert len(store) == 5, "A held view should not stop the store from growing"
+        assert len(starts) == 4, "A view should be a snapshot"
+
+    def test_title_capacity(self):
+        """Test that titles beyond the capacity are folded into their process."""
+        store = SegmentStore(title_capacity=2)
+        for n in range(5):
+            store.append(f"code.exe (file{n}.py)", float(n), n + 1.0)
+        store.append("code.exe (file0.py)", 5.0, 6.0)
+
+        assert store.titles == [None, "file0.py", "file1.py"], "Should intern at most 2 titles"
+        assert [s.app for s in store][2:] == ["code.exe"] * 3 + ["code.exe (file0.py)"], \
+            "Later titles should be stored under their process"
+        assert store.folded_titles == 3, "Folded segments should be counted"
+
+    def test_tracker_records_segments(self):
+        """Test that the tracker logs every accepted segment."""
+        tracker = ApplicationTracker(storage_handler=Mock())
+        tracker._handle_app_switch("a.exe (x)", 100.0)
+        tracker._handle_app_switch("b.exe", 105.0)
+        tracker._handle_app_switch("a.exe (x)", 105.5)
+
+        assert [(s.app, s.start, s.end) for s in tracker.segments] == [("a.exe (x)", 100.0, 105.0)], \
+            "Only segments that pass the pipeline should be stored"
+
+    def test_tracker_starts_store_each_day(self):
+        """Test that the tracker's segment log only holds the current day."""
+        tracker = ApplicationTracker(storage_handler=Mock(), title_capacity=10)
+        first = datetime(2024, 3, 21, 23, 0).timestamp()
+        tracker._handle_app_switch("a.exe", first)
+        tracker._handle_app_switch("b.exe", first + 60)
+        tracker._handle_app_switch("a.exe", first + 7200)
+
+        assert tracker.segments.day == date(2024, 3, 22), "The log should follow the day"
+        assert [s.app for s in tracker.segments] == ["b.exe"], \
+            "Earlier days' segments should be dropped"
+        assert tracker.segments.title_capacity == 10, "The tracker's title bound should apply"
@@ -0,0 +1,144 @@
+import pytest
+import subprocess
+import sys
+import uuid
+from unittest.mock import Mock
+from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.shared_snapshot import SnapshotPublisher, SnapshotReader
+
+@pytest.fixture
+def publisher():
+    """
+    Fixture to create a publisher with a unique segment name.
+
+    Returns:
+        SnapshotPublisher: Publisher that is closed after the test
+    """
+    publisher = SnapshotPublisher(f"tt_test_{uuid.uuid4().hex[:8]}", capacity=4,
+                                  names_size=256)
+    yield publisher
+    publisher.close()
+
+class TestSharedSnapshot:
+    """Test suite for the shared memory live snapshot."""
+
+    def test_publish_and_read(self, publisher):
+        """Test that a reader sees the published totals and current app."""
+        reader = SnapshotReader(publisher.shm.name)
+        assert reader.read().totals == {}, "A new snapshot should be empty"
+
+        publisher.publish({"a.exe": 5.0, "b.exe (Doc)": 2.5}, "b.exe (Doc)", 100.0, 103.0)
+        snapshot = reader.read()
+        assert snapshot.totals == {"a.exe": 5.0, "b.exe (Doc)": 2.5}, "Should read the totals"
+        assert snapshot.current_app == "b.exe (Doc)", "Should read the current app"
+        assert (snapshot.current_start, snapshot.timestamp) == (100.0, 103.0), \
+            "Should read the timestamps"
+        assert snapshot.seq % 2 == 0, "A consistent snapshot has an even sequence"
+
+        publisher.publish({"a.exe": 7.0, "b.exe (Doc)": 2.5, "c.exe": 1.0}, None)
+        snapshot = reader.read()
+        assert snapshot.totals["a.exe"] == 7.0, "Changed totals should be updated"
+        assert snapshot.current_app is None, "No current app should read as None"
+        reader.close()
+
+    def test_capacity_limits(self, publisher):
+        """Test that apps beyond the record or name capacity are skipped."""
+        publisher.publish({f"app{i}.exe": float(i) for i in range(6)})
+        snapshot = SnapshotReader(publisher.shm.name).read()
+        assert len(snapshot.totals) == 4, "Should publish at most capacity records"
+        assert not snapshot.complete, "Skipped apps should mark the snapshot incomplete"
+
+        publisher.publish({f"app{i}.exe": float(i) for i in range(4)})
+        assert SnapshotReader(publisher.shm.name).read().complete, \
+            "The flag should clear once everything fits"
+
+    def test_removed_apps_tombstoned(self, publisher):
+        """Test that apps gone from the totals are removed and their slots reused."""
+        reader = SnapshotReader(publisher.shm.name)
+        publisher.publish({"a.exe": 1.0, "a.exe (Doc)": 2.0, "b.exe": 3.0, "c.exe": 4.0})
+        # "a.exe (Doc)" was folded into its process
+        publisher.publish({"a.exe": 3.0, "b.exe": 3.0, "c.exe": 4.0, "d.exe": 5.0})
+
+        snapshot = reader.read()
+        assert snapshot.totals == {"a.exe": 3.0, "b.exe": 3.0, "c.exe": 4.0, "d.exe": 5.0}, \
+            "A removed app should not be counted twice"
+        assert snapshot.complete, "The freed slot should be reused"
+        reader.close()
+
+    def test_stale_segment_replaced(self):
+        """Test that a segment left behind by a crashed publisher does not block startup."""
+        name = f"tt_test_{uuid.uuid4().hex[:8]}"
+        stale = SnapshotPublisher(name, capacity=4, names_size=256)
+        stale.publish({"a.exe": 1.0})
+
+        # The first publisher never closed, like one that crashed
+        publisher = SnapshotPublisher(name, capacity=4, names_size=256)
+        reader = SnapshotReader(name)
+        assert reader.read().totals == {}, "The new publisher should start empty"
+        reader.close()
+        publisher.close()
+        stale.shm.close()
+        stale.names_shm.close()
+
+    def test_reader_retries_during_write(self, publisher):
+        """Test that a snapshot is never read while a write is in progress."""
+        reader = SnapshotReader(publisher.shm.name)
+        publisher._begin()
+        with pytest.raises(TimeoutError):
+            reader.read(retries=10)
+        publisher._end()
+        assert reader.read(retries=10).seq == publisher.seq, "Should read once the write ends"
+        reader.close()
+
+    def test_read_from_other_process(self, publisher):
+        """Test that another process can read the snapshot and exit cleanly."""
+        publisher.publish({"code.exe (main.py)": 42.0}, "code.exe (main.py)", 1.0, 2.0)
+        code = ("from time_tracker.tracker.shared_snapshot import SnapshotReader; "
+                f"print(SnapshotReader({publisher.shm.name!r}).read().totals)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, check=True)
+
+        assert result.stdout.strip() == "{'code.exe (main.py)': 42.0}", \
+            "Should read the totals from another process"
+        assert SnapshotReader(publisher.shm.name).read().totals, \
+            "The reader's exit should not remove the segment"
+
+    def test_tracker_publishes_on_poll(self, publisher):
+        """Test that polling publishes the tracker's live totals."""
+        tracker = ApplicationTracker(storage_handler=Mock(), clock=Mock(side_effect=[0.0, 10.0]),
+                                     window_source=Mock(side_effect=["a.exe", "b.exe"]))
+        tracker.publisher = publisher
+        tracker.poll()
+        tracker.poll()
+
+        snapshot = SnapshotReader(publisher.shm.name).read()
+        assert snapshot.totals == {"a.exe": 10.0}, "Should publish the accounted totals"
+        assert snapshot.current_app == "b.exe", "Should publish the current app"
+
+    def test_tracker_publishes_only_changes(self, publisher):
+        """Test that a poll without a switch hands the publisher no totals to walk."""
+        tracker = ApplicationTracker(storage_handler=Mock(),
+                                     clock=Mock(side_effect=[0.0, 10.0, 11.0]),
+                                     window_source=Mock(side_effect=["a.exe", "b.exe", "b.exe"]))
+        tracker.publisher = Mock(wraps=publisher)
+        tracker.poll()
+        tracker.poll()
+        tracker.poll()
+
+        changes = [call.args[:2] for call in tracker.publisher.publish_changes.call_args_list]
+        assert changes == [({}, []), ({"a.exe": 10.0}, []), ({}, [])], \
+            "Each poll should pass only what changed since the last one"
+        assert SnapshotReader(publisher.shm.name).read().totals == {"a.exe": 10.0}, \
+            "The published totals should stay complete"
+
+    def test_skipped_apps_retried_when_space_frees(self, publisher):
+        """Test that an app left out for lack of slots is published once one is freed."""
+        publisher.publish_changes({f"app{i}.exe": float(i) for i in range(5)})
+        assert not SnapshotReader(publisher.shm.name).read().complete, \
+            "The fifth app should not fit"
+
+        publisher.publish_changes({}, ["app0.exe"])
+        snapshot = SnapshotReader(publisher.shm.name).read()
+        assert snapshot.totals == {f"app{i}.exe": float(i) for i in range(1, 5)}, \
+            "The skipped app should take the freed slot"
+        assert snapshot.complete, "The flag should clear once everything fits"
@@ -1,13 +1,14 @@
 import pytest
 import json
+import hashlib
 from pathlib import Path
 from unittest.mock import patch, mock_open
-from datetime import datetime
+from datetime import date, datetime
 from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.data_handlers.migration import migrate_flat_layout
 from time_tracker.data_handlers.formatters import group_application_data
 
 # Constants for testing
-TEST_DATA_DIR = "test_data"
 TEST_DATE = "2024-03-21"
 TEST_APPS = {
     "chrome.exe (Google)": 60.0,
@@ -23,14 +24,14 @@ def mock_datetime():
         yield mock_dt
 
 @pytest.fixture
-def storage():
+def storage(tmp_path):
     """
-    Fixture to create a storage instance with test directory.
+    Fixture to create a storage instance in a temporary directory.
     
     Returns:
         DataStorage: Configured storage instance for testing
     """
-    storage = DataStorage(data_dir=TEST_DATA_DIR)
+    storage = DataStorage(data_dir=tmp_path / "test_data")
     return storage
 
 class TestDataStorage:
@@ -61,19 +62,20 @@ class TestDataStorage:
         assert result["notepad.exe"]["windows"]["Document"] == 45.0, "Window time should be correct"
 
     @pytest.mark.storage
-    @patch('json.dump')
-    @patch('builtins.open', new_callable=mock_open)
-    def test_save_data(self, mock_file, mock_json_dump, storage, mock_datetime):
+    def test_save_data(self, tmp_path, mock_datetime):
         """Test saving application data to file."""
+        storage = DataStorage(data_dir=tmp_path)
+        
         # Save test data
         storage.save_data(TEST_APPS)
         
-        # Verify file operations
-        expected_filename = Path(TEST_DATA_DIR) / f'app_usage_{TEST_DATE}.json'
-        mock_file.assert_called_once_with(expected_filename, 'w')
+        # Verify the file lands in its YYYY/MM partition
+        expected_filename = tmp_path / "2024" / "03" / f'app_usage_{TEST_DATE}.json'
+        assert expected_filename.exists(), "Day file should be saved in its partition"
         
         # Verify saved data structure
-        saved_data = mock_json_dump.call_args[0][0]
+        with open(expected_filename) as f:
+            saved_data = json.load(f)
         assert saved_data['date'] == TEST_DATE, "Date should be correct"
         assert saved_data['total_tracking_time'] == sum(TEST_APPS.values()), \
             "Total time should be sum of all app times"
@@ -90,4 +92,174 @@ class TestDataStorage:
             "Should show summary header"
         assert "chrome.exe" in captured.out, "Should show Chrome usage"
         assert "notepad.exe" in captured.out, "Should show Notepad usage"
-        assert "minutes" in captured.out, "Should show time in minutes" 
\ No newline at end of file
+        assert "minutes" in captured.out, "Should show time in minutes" 
+
+    @pytest.mark.storage
+    def test_manifest_updated_on_save(self, tmp_path, mock_datetime):
+        """Test that saving a day records it in the manifest."""
+        storage = DataStorage(data_dir=tmp_path)
+        storage.save_data(TEST_APPS)
+        
+        with open(tmp_path / "manifest.json") as f:
+            manifest = json.load(f)
+        entry = manifest["days"][TEST_DATE]
+        payload = (tmp_path / entry["file"]).read_bytes()
+        assert entry["file"] == f"2024/03/app_usage_{TEST_DATE}.json", \
+            "Manifest should point at the partitioned file"
+        assert entry["size"] == len(payload), "Manifest should record the file size"
+        assert entry["sha256"] == hashlib.sha256(payload).hexdigest(), \
+            "Manifest should record the file checksum"
+        assert entry["total"] == sum(TEST_APPS.values()), "Manifest should record the total"
+
+    @pytest.mark.storage
+    def test_range_lookup_uses_manifest(self, tmp_path):
+        """Test that range lookups come from the manifest without globbing."""
+        storage = DataStorage(data_dir=tmp_path)
+        for day in range(1, 31):
+            storage.write_day(date(2024, 4, day), {"date": f"2024-04-{day:02d}",
+                                                   "total_tracking_time": 0,
+                                                   "applications": {}})
+        
+        fresh = DataStorage(data_dir=tmp_path)
+        with patch.object(Path, 'glob', side_effect=AssertionError("should not glob")):
+            days = [day for day, _ in fresh.iter_days(date(2024, 4, 10), date(2024, 4, 12))]
+        assert days == [date(2024, 4, 10), date(2024, 4, 11), date(2024, 4, 12)], \
+            "Should list exactly the days in range"
+
+    @pytest.mark.storage
+    def test_listing_survives_concurrent_writes(self, tmp_path):
+        """Test that a listing in progress keeps the manifest version it started with."""
+        storage = DataStorage(data_dir=tmp_path)
+        for day in range(1, 4):
+            storage.write_day(date(2024, 4, day), {"date": f"2024-04-{day:02d}",
+                                                   "total_tracking_time": 0,
+                                                   "applications": {}})
+        
+        listing = storage.iter_days()
+        assert next(listing)[0] == date(2024, 4, 1), "Should start with the first day"
+        # Another thread (e.g. a GUI save) changes the manifest mid-listing
+        storage.delete_day(date(2024, 4, 3))
+        storage.write_day(date(2024, 4, 4), {"date": "2024-04-04", "total_tracking_time": 0,
+                                             "applications": {}})
+        assert [day for day, _ in listing] == [date(2024, 4, 2), date(2024, 4, 3)], \
+            "The listing should finish from one consistent manifest"
+        assert len(list(storage.iter_days())) == 3, "New listings should see the changes"
+
+    @pytest.mark.storage
+    def test_delete_day_updates_manifest(self, tmp_path):
+        """Test that deleting a day removes its file and manifest entry."""
+        storage = DataStorage(data_dir=tmp_path)
+        path = storage.write_day(date(2024, 4, 1), {"date": "2024-04-01",
+                                                    "total_tracking_time": 0,
+                                                    "applications": {}})
+        storage.delete_day(date(2024, 4, 1))
+        
+        assert not path.exists(), "Day file should be removed"
+        assert DataStorage(data_dir=tmp_path).manifest_entry(date(2024, 4, 1)) is None, \
+            "Manifest entry should be removed"
+
+    @pytest.mark.storage
+    def test_migrate_flat_layout(self, tmp_path):
+        """Test converting an old flat directory into partitions."""
+        (tmp_path / "app_usage_2023-12-31.json").write_text(json.dumps(
+            {"date": "2023-12-31", "total_tracking_time": 5.0, "applications": {}}))
+        (tmp_path / "app_usage_2023-12-31.timeline").write_bytes(b"tl")
+        (tmp_path / "app_usage_2023-11.json").write_text("{}")
+        storage = DataStorage(data_dir=tmp_path)
+        
+        assert migrate_flat_layout(storage) == 3, "Should move every flat file"
+        assert (tmp_path / "2023" / "12" / "app_usage_2023-12-31.timeline").exists(), \
+            "Timeline should move with its day"
+        assert storage.month_path(date(2023, 11, 1)).exists(), "Monthly rollup should move"
+        assert [day for day, _ in storage.iter_days()] == [date(2023, 12, 31)], \
+            "Manifest should list the migrated day"
+
+    @pytest.mark.storage
+    def test_migrate_merges_existing_day(self, tmp_path):
+        """Test that a flat day file is summed into an existing partitioned copy."""
+        storage = DataStorage(data_dir=tmp_path)
+        day = date(2023, 12, 31)
+        storage.write_app_times(day, {"code.exe (a.py)": 10.0, "chrome.exe": 5.0})
+        (tmp_path / "app_usage_2023-12-31.json").write_text(json.dumps({
+            "date": "2023-12-31", "total_tracking_time": 7.0,
+            "applications": {"code.exe": {"total_time": 7.0, "windows": {"a.py": 7.0}}}}))
+        (tmp_path / "app_usage_2023-12-31.timeline").write_bytes(b"old")
+        storage.timeline_path(day).write_bytes(b"new")
+
+        with pytest.raises(FileExistsError):
+            migrate_flat_layout(storage)
+        assert storage.load_app_times(day) == {"code.exe (a.py)": 17.0, "chrome.exe": 5.0}, \
+            "Totals of both copies should be summed"
+        assert not (tmp_path / "app_usage_2023-12-31.json").exists(), \
+            "The merged flat file should be removed"
+        assert (tmp_path / "app_usage_2023-12-31.timeline").exists(), \
+            "A conflicting file that cannot be merged should be left in place"
+        assert storage.manifest_entry(day)["total"] == 22.0, "The manifest should see the merge"
+
+    @pytest.mark.storage
+    def test_flat_layout_migrated_on_first_use(self, tmp_path):
+        """Test that a flat directory is migrated instead of hidden by an empty manifest."""
+        (tmp_path / "app_usage_2023-12-31.json").write_text(json.dumps(
+            {"date": "2023-12-31", "total_tracking_time": 5.0, "applications": {}}))
+        storage = DataStorage(data_dir=tmp_path)
+
+        assert [day for day, _ in storage.iter_days()] == [date(2023, 12, 31)], \
+            "The flat day should be listed"
+        assert not (tmp_path / "app_usage_2023-12-31.json").exists(), \
+            "The flat file should have been moved"
+
+    @pytest.mark.storage
+    def test_first_use_survives_migration_conflict(self, tmp_path):
+        """Test that a conflict found by the implicit migration does not fail a save."""
+        day = date(2023, 12, 31)
+        storage = DataStorage(data_dir=tmp_path)
+        storage.write_app_times(day, {"chrome.exe": 5.0})
+        storage.timeline_path(day).write_bytes(b"partitioned")
+        (tmp_path / "app_usage_2023-12-31.timeline").write_bytes(b"flat")
+        (tmp_path / "app_usage_2023-12-30.json").write_text(json.dumps(
+            {"date": "2023-12-30", "total_tracking_time": 5.0, "applications": {}}))
+        (tmp_path / "manifest.json").unlink()
+
+        fresh = DataStorage(data_dir=tmp_path)
+        fresh.save_data({"code.exe": 3.0}, day=date(2024, 1, 2))
+        assert [day for day, _ in fresh.iter_days()] == \
+            [date(2023, 12, 30), day, date(2024, 1, 2)], \
+            "The save should succeed on the rebuilt manifest"
+        assert (tmp_path / "app_usage_2023-12-31.timeline").exists(), \
+            "The conflicting file should be left for the migrate command"
+        with pytest.raises(FileExistsError):
+            migrate_flat_layout(fresh)
+
+    @pytest.mark.storage
+    def test_load_app_times(self, tmp_path, mock_datetime):
+        """Test reading a saved day back as flat app times."""
+        storage = DataStorage(data_dir=tmp_path)
+        app_times = dict(TEST_APPS, **{"explorer.exe": 12.345})
+        storage.save_data(app_times)
+        day = date.fromisoformat(TEST_DATE)
+        
+        assert storage.load_app_times(day) == app_times, \
+            "Should resume exactly from the snapshot"
+        assert storage.load_app_times(date(2024, 3, 22)) == {}, \
+            "Unsaved days should have no totals"
+        
+        # A rewritten day file makes the snapshot stale
+        data = storage.load_day(day)
+        data["applications"]["chrome.exe"]["total_time"] = 100.0
+        storage.write_day(day, data)
+        resumed = storage.load_app_times(day)
+        assert resumed["chrome.exe (Google)"] == 60.0, "Windows should come from the day file"
+        assert resumed["chrome.exe"] == 10.0, "Untitled remainder should use the bare process"
+        assert resumed["explorer.exe"] == 12.35, "Apps without windows should be kept"
+
+    @pytest.mark.storage
+    def test_group_nested_window_titles(self):
+        """Test that titles containing " (" are kept whole and summed."""
+        result = group_application_data({
+            "chrome.exe (Inbox (3) - Gmail)": 20.0,
+            "chrome.exe (Inbox (5) - Gmail)": 10.0,
+        })
+        
+        assert result["chrome.exe"]["windows"] == {"Inbox (3) - Gmail": 20.0,
+                                                   "Inbox (5) - Gmail": 10.0}, \
+            "Each title should keep its own time"
@@ -0,0 +1,147 @@
+import filecmp
+import pytest
+from datetime import date
+from unittest.mock import patch
+from time_tracker.__main__ import main
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.data_handlers.sync import DirectorySync
+
+# Constants for testing
+TEST_DAYS = [date(2024, 3, 20), date(2024, 3, 21), date(2024, 3, 22)]
+CHUNK_SIZE = 256
+
+def mirrored(source, destination):
+    """Return True if the destination holds exactly the source's mirrored files."""
+    source_files = {p.relative_to(source) for p in source.rglob("*")
+                    if p.is_file() and not p.name.startswith(".")}
+    destination_files = {p.relative_to(destination) for p in destination.rglob("*")
+                         if p.is_file()}
+    return source_files == destination_files and all(
+        filecmp.cmp(source / rel, destination / rel, shallow=False) for rel in source_files)
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Fixture to create a data directory with a few saved days.
+
+    Returns:
+        DataStorage: Storage holding three days of totals
+    """
+    storage = DataStorage(data_dir=tmp_path / "data")
+    for i, day in enumerate(TEST_DAYS):
+        storage.save_data({f"app{n}.exe (window {n})": 60.0 * (n + i) for n in range(20)},
+                          day=day)
+    return storage
+
+class TestDirectorySync:
+    """Test suite for the chunked data directory mirror."""
+
+    @pytest.mark.storage
+    def test_initial_and_unchanged(self, storage, tmp_path):
+        """Test that a first sync copies everything and a second sends nothing."""
+        share = tmp_path / "share"
+        first = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert mirrored(storage.data_dir, share), "The destination should mirror the source"
+        assert first.changed > 0 and first.unchanged == 0, "Every file should be new"
+
+        second = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert (second.changed, second.chunks_sent) == (0, 0), \
+            "Nothing should be sent when nothing changed"
+
+    @pytest.mark.storage
+    def test_append_sends_tail(self, storage, tmp_path):
+        """Test that appending to a file only sends the chunks at its end."""
+        share = tmp_path / "share"
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        log = storage.data_dir / "journal.log"
+        log.write_bytes(b"x" * (CHUNK_SIZE * 10))
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+
+        with open(log, "ab") as f:
+            f.write(b"y" * 10)
+        result = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert (result.changed, result.chunks_sent, result.bytes_sent) == (1, 1, 10), \
+            "Only the appended tail should be sent"
+        assert mirrored(storage.data_dir, share), "The destination should have the new tail"
+
+    @pytest.mark.storage
+    def test_modified_destination_sent_whole(self, storage, tmp_path):
+        """Test that a destination copy changed behind the sync's back is not patched."""
+        share = tmp_path / "share"
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        log = storage.data_dir / "journal.log"
+        log.write_bytes(b"x" * (CHUNK_SIZE * 4))
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+
+        (share / "journal.log").write_bytes(b"z" * (CHUNK_SIZE * 4))
+        log.write_bytes(b"x" * (CHUNK_SIZE * 3) + b"y" * CHUNK_SIZE)
+        result = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert result.chunks_sent == 4, "The whole file should be sent"
+        assert mirrored(storage.data_dir, share), "The destination should match the source"
+
+    @pytest.mark.storage
+    def test_interrupted_patch_leaves_old_copy(self, storage, tmp_path):
+        """Test that a patch interrupted before the replace leaves the old file intact."""
+        share = tmp_path / "share"
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        log = storage.data_dir / "journal.log"
+        log.write_bytes(b"x" * (CHUNK_SIZE * 4))
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+
+        log.write_bytes(b"x" * (CHUNK_SIZE * 3) + b"y" * 10)
+        with patch("time_tracker.data_handlers.sync.os.replace",
+                   side_effect=OSError("share went away")):
+            with pytest.raises(OSError):
+                DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert (share / "journal.log").read_bytes() == b"x" * (CHUNK_SIZE * 4), \
+            "Readers should still see the complete old file"
+        assert not list(share.glob(".journal.log.*")), "The temporary copy should be removed"
+
+        result = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert result.chunks_sent == 1, "The next run should patch it again"
+        assert mirrored(storage.data_dir, share), "The destination should match the source"
+
+    @pytest.mark.storage
+    def test_deleted_day_removed(self, storage, tmp_path):
+        """Test that files removed from the source are removed from the destination."""
+        share = tmp_path / "share"
+        DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        storage.delete_day(TEST_DAYS[0])
+
+        result = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert result.deleted >= 1, "The day file should be deleted"
+        assert mirrored(storage.data_dir, share), "The destination should mirror the source"
+
+    @pytest.mark.storage
+    def test_resume_after_interruption(self, storage, tmp_path):
+        """Test that an interrupted sync leaves no partial files and resumes."""
+        share = tmp_path / "share"
+        sync = DirectorySync(storage.data_dir, share, CHUNK_SIZE)
+        original = sync._send
+        calls = []
+
+        def fail_third(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise OSError("share went away")
+            return original(*args)
+
+        with patch.object(sync, "_send", side_effect=fail_third):
+            with pytest.raises(OSError):
+                sync.run()
+        assert not list(share.rglob(".*.tmp")), "No temporary files should be left behind"
+        assert not (share / "manifest.json").exists(), "The manifest should be sent last"
+
+        result = DirectorySync(storage.data_dir, share, CHUNK_SIZE).run()
+        assert result.unchanged == 2, "Files sent before the interruption should be skipped"
+        assert mirrored(storage.data_dir, share), "The resumed sync should finish the mirror"
+
+    def test_sync_command(self, storage, tmp_path, capsys):
+        """Test the sync command and its refusal to sync into the data directory."""
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--data-dir", str(storage.data_dir), "sync", "--to", str(tmp_path / "share")])
+        assert exit_info.value.code == 0, "Sync should succeed"
+        assert "0 deleted" in capsys.readouterr().out, "Should print a summary"
+
+        with pytest.raises(ValueError):
+            DirectorySync(storage.data_dir, storage.data_dir / "mirror").run()
@@ -0,0 +1,99 @@
+import pytest
+from datetime import date, datetime, time
+from time_tracker.tracker.timeline import DayTimeline
+from time_tracker.data_handlers.storage import DataStorage
+
+# Constants for testing
+TEST_DAY = date(2024, 3, 21)
+TEST_APP = "code.exe (main.py)"
+OTHER_APP = "chrome.exe (Docs)"
+
+def at(hour, minute, second=0):
+    """Return the local timestamp for a time on the test day."""
+    return datetime.combine(TEST_DAY, time(hour, minute, second)).timestamp()
+
+@pytest.fixture
+def timeline():
+    """
+    Fixture to create an empty timeline for the test day.
+
+    Returns:
+        DayTimeline: Timeline with one-minute slots
+    """
+    return DayTimeline(TEST_DAY)
+
+class TestDayTimeline:
+    """Test suite for the per-minute occupancy timeline."""
+
+    def test_initialization(self, timeline):
+        """Verify the timeline is preallocated and empty."""
+        assert len(timeline.slots) == 1440, "Should have one slot per minute"
+        assert timeline.app_at(time(14, 20)) is None, "Empty slot should map to None"
+
+    def test_lookup_time_of_day(self, timeline):
+        """Test looking up the app active at a time of day."""
+        timeline.record(TEST_APP, at(14, 0), at(14, 30))
+
+        assert timeline.app_at(time(14, 20)) == TEST_APP, "Should find the active app"
+        assert timeline.app_at(datetime.combine(TEST_DAY, time(14, 29))) == TEST_APP
+        assert timeline.app_at(time(14, 30)) is None, "End of segment is exclusive"
+        assert timeline.seconds_at(time(14, 10)) == 60, "Full slot should count 60 seconds"
+
+    def test_dominant_app_per_slot(self, timeline):
+        """Test that a shared slot keeps the app with the most seconds."""
+        timeline.record(TEST_APP, at(9, 0, 0), at(9, 0, 20))
+        timeline.record(OTHER_APP, at(9, 0, 20), at(9, 0, 45))
+        timeline.record(TEST_APP, at(9, 0, 45), at(9, 1, 0))
+
+        assert timeline.app_at(time(9, 0)) == TEST_APP, \
+            "App with 35s should beat app with 25s"
+        assert timeline.seconds_at(time(9, 0)) == 35, "Should keep dominant seconds"
+
+    def test_clips_to_day(self, timeline):
+        """Test that segments outside the day are clipped."""
+        timeline.record(TEST_APP, at(23, 59), at(23, 59) + 3600)
+
+        assert timeline.app_at(time(23, 59)) == TEST_APP, "Last slot should be recorded"
+
+    def test_daylight_saving_day(self, new_york_tz):
+        """Test that a day with a clock change maps times and timestamps alike."""
+        day = date(2024, 3, 10)
+        timeline = DayTimeline(day)
+        timeline.record(TEST_APP, datetime(2024, 3, 10, 14, 0).timestamp(),
+                        datetime(2024, 3, 10, 14, 10).timestamp())
+        timeline.record(OTHER_APP, datetime(2024, 3, 11, 0, 30).timestamp(),
+                        datetime(2024, 3, 11, 0, 40).timestamp())
+
+        assert timeline.slot_count == 23 * 60, "The day should be 23 hours long"
+        assert timeline.app_at(time(14, 5)) == TEST_APP, "Clock time should find the segment"
+        assert timeline.app_at(time(13, 5)) is None, "The hour before should stay empty"
+        assert OTHER_APP not in timeline.apps, "The next day's segment should be clipped"
+
+    def test_serialization_roundtrip(self, timeline):
+        """Test that the binary form restores the same timeline."""
+        timeline.record(TEST_APP, at(8, 0), at(8, 45))
+        timeline.record(OTHER_APP, at(8, 45), at(9, 10))
+
+        blob = timeline.to_bytes()
+        restored = DayTimeline.from_bytes(blob)
+
+        assert len(blob) < 10 * 1024, "A day should take a few KB"
+        assert restored.day == TEST_DAY, "Day should be restored"
+        assert restored.slots == timeline.slots, "Slots should be restored"
+        assert restored.seconds == timeline.seconds, "Seconds should be restored"
+        assert restored.app_at(time(9, 0)) == OTHER_APP, "App names should be restored"
+
+    @pytest.mark.storage
+    def test_storage_roundtrip(self, timeline, tmp_path):
+        """Test saving a timeline alongside the day file."""
+        storage = DataStorage(data_dir=tmp_path)
+        timeline.record(TEST_APP, at(14, 0), at(14, 30))
+
+        storage.save_timeline(timeline)
+
+        assert (tmp_path / "2024" / "03" / "app_usage_2024-03-21.timeline").exists(), \
+            "Timeline should be saved next to the day file"
+        restored = storage.load_timeline(TEST_DAY)
+        assert restored.app_at(time(14, 20)) == TEST_APP, "Should load the saved timeline"
+        assert storage.load_timeline(date(2024, 3, 22)) is None, \
+            "Missing timeline should load as None"
@@ -0,0 +1,149 @@
+import random
+import pytest
+from datetime import date, datetime
+from PyQt6.QtWidgets import QApplication
+from time_tracker.tracker.timeline import DayTimeline
+from time_tracker.tracker.timeline_pyramid import TimelinePyramid
+from time_tracker.ui.timeline_widget import TimelineWidget
+
+# Constants for testing
+TEST_DAY = date(2024, 3, 21)
+MIDNIGHT = datetime(2024, 3, 21).timestamp()
+
+@pytest.fixture
+def app():
+    """Create a Qt Application."""
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def pyramid():
+    """
+    Fixture to create a pyramid for a working day of short switches.
+
+    Returns:
+        TimelinePyramid: Mostly code.exe from 9:00 to 12:00 with short
+            chrome.exe visits, then mail.exe until 13:00
+    """
+    pyramid = TimelinePyramid(TEST_DAY)
+    now = MIDNIGHT + 9 * 3600
+    while now < MIDNIGHT + 12 * 3600:
+        pyramid.add("code.exe (main.py)", now, now + 50)
+        pyramid.add("chrome.exe (Docs)", now + 50, now + 60)
+        now += 60
+    pyramid.add("mail.exe", now, now + 3600)
+    return pyramid
+
+class TestTimelinePyramid:
+    """Test suite for the level-of-detail day timeline."""
+
+    def test_full_resolution(self, pyramid):
+        """Test that the base level keeps every switch."""
+        assert pyramid.app_at(9 * 3600 + 10) == "code.exe (main.py)", \
+            "Should show the app active at that second"
+        assert pyramid.app_at(9 * 3600 + 55) == "chrome.exe (Docs)", \
+            "Short visits should survive at full resolution"
+        assert pyramid.app_at(8 * 3600) is None, "Untracked time should be empty"
+
+    def test_dominant_when_zoomed_out(self, pyramid):
+        """Test that a whole-day view shows the app that dominated each pixel."""
+        dominant = pyramid.dominant(0, 24 * 3600, 24)
+        names = [pyramid.apps[app_id] for app_id in dominant]
+        assert names[9:12] == ["code.exe (main.py)"] * 3, \
+            "Each hour pixel should show its dominant app, not the last switch"
+        assert names[12] == "mail.exe", "Should show the next app's hour"
+        # Buckets are not aligned to pixels, so an edge pixel may pick up
+        # a neighbour's app; pixels further away must stay empty
+        assert names[7] is None and names[14] is None, "Idle pixels should be empty"
+
+    def test_zoomed_in(self, pyramid):
+        """Test that a one-minute view resolves the short visits."""
+        start = 10 * 3600
+        dominant = pyramid.dominant(start, start + 60, 60)
+        names = [pyramid.apps[app_id] for app_id in dominant]
+        assert names[:50] == ["code.exe (main.py)"] * 50, "Should show the first 50 seconds"
+        assert names[50:] == ["chrome.exe (Docs)"] * 10, "Should show the last 10 seconds"
+
+    def test_level_choice(self, pyramid):
+        """Test that queries use the coarsest level narrower than a pixel."""
+        assert pyramid.level_for(1) == 0, "One second per pixel needs the base level"
+        assert pyramid.level_for(100) == 6, "100s per pixel should use 64s buckets"
+
+    def test_matches_brute_force(self):
+        """Test that every level agrees with a direct count on aligned buckets."""
+        rng = random.Random(0)
+        pyramid = TimelinePyramid(TEST_DAY)
+        now = MIDNIGHT
+        coverage = {}
+        while now < MIDNIGHT + 4096:
+            app = rng.choice(["a.exe", "b.exe", "c.exe"])
+            length = rng.choice([1, 3, 7, 20])
+            pyramid.add(app, now, now + length)
+            for second in range(int(now - MIDNIGHT), int(now - MIDNIGHT) + length):
+                coverage[second] = app
+            now += length
+
+        for width in (256, 1024, 4096):
+            dominant = pyramid.dominant(0, 4096, 4096 // width)
+            for pixel, app_id in enumerate(dominant):
+                counts = {}
+                for second in range(pixel * width, (pixel + 1) * width):
+                    counts[coverage[second]] = counts.get(coverage[second], 0) + 1
+                # Merging pairs keeps the stronger child, which may lose to
+                # an app spread thinly over both halves, but never by much
+                assert counts[pyramid.apps[app_id]] >= max(counts.values()) / 3, \
+                    "Should show an app that covered much of the bucket"
+        assert len(pyramid.levels) == 18, "A day of seconds should need 18 levels"
+
+    def test_from_timeline(self):
+        """Test seeding from a saved minute timeline."""
+        timeline = DayTimeline(TEST_DAY)
+        timeline.record("code.exe", MIDNIGHT + 3600, MIDNIGHT + 7200)
+        pyramid = TimelinePyramid.from_timeline(timeline)
+        assert pyramid.app_at(5400) == "code.exe", "Should copy the timeline's slots"
+        assert pyramid.dominant(0, 24 * 3600, 24)[1] == pyramid.app_id("code.exe"), \
+            "Upper levels should be built"
+
+    def test_daylight_saving_day(self, new_york_tz):
+        """Test that offsets count real seconds on a day with a clock change."""
+        pyramid = TimelinePyramid(date(2024, 3, 10))
+        pyramid.add("code.exe", datetime(2024, 3, 10, 14, 0).timestamp(),
+                    datetime(2024, 3, 10, 14, 10).timestamp())
+        pyramid.add("late.exe", datetime(2024, 3, 11, 0, 30).timestamp(),
+                    datetime(2024, 3, 11, 0, 40).timestamp())
+
+        assert pyramid.day_seconds == 23 * 3600, "The day should be 23 hours long"
+        offset = datetime(2024, 3, 10, 14, 5).timestamp() - pyramid.timestamp(0)
+        assert offset == 13 * 3600 + 300, "14:05 is 13 hours in after the clocks went forward"
+        assert pyramid.app_at(offset) == "code.exe", "The segment should be at 14:05"
+        assert "late.exe" not in pyramid.apps, "The next day's segment should be clipped"
+
+    def test_widget_paints(self, app, pyramid):
+        """Test that the widget paints the visible span and clamps zooming."""
+        widget = TimelineWidget()
+        widget.resize(480, 80)
+        widget.set_pyramid(pyramid)
+        widget.set_view(9 * 3600, 13 * 3600)
+        image = widget.grab().toImage()
+        assert image.pixelColor(10, 40) != image.pixelColor(10, 2), \
+            "Tracked time should be painted"
+
+        widget.set_view(100, 110)
+        assert widget.view_end - widget.view_start == 60, "Should not zoom in past a minute"
+
+    def test_widget_colors_follow_names(self, app):
+        """Test that colors stay with the process when another day numbers apps differently."""
+        widget = TimelineWidget()
+        first = TimelinePyramid(TEST_DAY)
+        first.app_id("code.exe")
+        first.app_id("mail.exe")
+        widget.set_pyramid(first)
+        code_color = widget._color(first.app_id("code.exe"))
+
+        second = TimelinePyramid(TEST_DAY)
+        second.app_id("mail.exe")
+        second.app_id("code.exe")
+        widget.set_pyramid(second)
+        assert widget._color(second.app_id("code.exe")) == code_color, \
+            "A process should keep its color across pyramids"
+        assert widget._color(second.app_id("mail.exe")) != code_color, \
+            "Another process should not inherit the color of its app id"
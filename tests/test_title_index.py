@@ -0,0 +1,126 @@
+import pytest
+import time
+from datetime import date, timedelta
+from time_tracker.__main__ import main
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.data_handlers.title_index import (IndexSegment, TitleHit, TitleIndex,
+                                                     tokenize)
+
+# Constants for testing
+TEST_DAYS = {
+    "2024-03-20": {
+        "code.exe": {"total_time": 130.0, "windows": {"PROJ-42 fix parser - main.py": 100.0,
+                                                      "PROJ-7 docs": 30.0}},
+        "chrome.exe": {"total_time": 40.0, "windows": {"PROJ-42 review": 40.0}},
+    },
+    "2024-03-21": {
+        "code.exe": {"total_time": 60.0, "windows": {"proj-42 tests": 60.0}},
+    },
+}
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Fixture to create a storage instance with saved test days.
+
+    Returns:
+        DataStorage: Storage holding two days of window titles
+    """
+    storage = DataStorage(data_dir=tmp_path)
+    for day, applications in TEST_DAYS.items():
+        storage.write_day(date.fromisoformat(day), {
+            "date": day,
+            "total_tracking_time": sum(a["total_time"] for a in applications.values()),
+            "applications": applications,
+        })
+    return storage
+
+class TestTitleIndex:
+    """Test suite for the window title inverted index."""
+
+    def test_tokenize(self):
+        """Test that joined identifiers are indexed whole and by parts."""
+        assert tokenize("PROJ-42 fix - main.py") == {"proj-42", "proj", "42", "fix",
+                                                     "main.py", "main", "py"}, \
+            "Should lowercase and split titles into tokens"
+
+    @pytest.mark.storage
+    def test_segment_written_on_save(self, storage):
+        """Test that writing a day writes its index segment."""
+        path = storage.index_path(date(2024, 3, 21))
+        assert path.exists(), "Index segment should be saved next to the day file"
+        segment = IndexSegment(path.read_bytes())
+        assert list(segment.postings("tests")) == [0], "Tokens should map to title ids"
+        assert segment.title(0) == ("code.exe", "proj-42 tests", 60.0), \
+            "Title ids should resolve to the app, title and seconds"
+        assert segment.postings("missing") is None, "Unknown tokens should have no postings"
+
+    @pytest.mark.storage
+    def test_search(self, storage):
+        """Test intersecting postings across days."""
+        hits = list(TitleIndex(storage).search("proj-42"))
+        assert sum(hit.seconds for hit in hits) == 200.0, "Should total every matching title"
+        assert TitleHit(date(2024, 3, 20), "chrome.exe", "PROJ-42 review", 40.0) in hits, \
+            "Should report the day, app and title of each match"
+
+        hits = list(TitleIndex(storage).search("PROJ-42 main", app="code.exe"))
+        assert [hit.title for hit in hits] == ["PROJ-42 fix parser - main.py"], \
+            "Every query token should match"
+
+        hits = list(TitleIndex(storage).search("proj-42", start=date(2024, 3, 21)))
+        assert [hit.day for hit in hits] == [date(2024, 3, 21)], "Should respect the range"
+
+    @pytest.mark.storage
+    def test_stale_segment_rebuilt(self, storage):
+        """Test that a segment not matching its day file is rebuilt."""
+        day = date(2024, 3, 21)
+        storage.index_path(day).unlink()
+        assert [hit.title for hit in TitleIndex(storage).search("tests")] == ["proj-42 tests"], \
+            "A missing segment should be rebuilt from the day file"
+        assert storage.index_path(day).exists(), "The rebuilt segment should be saved"
+
+    @pytest.mark.storage
+    @pytest.mark.slow
+    def test_segment_smaller_and_faster_than_scan(self, tmp_path):
+        """Test that segments beat scanning the day files on size and search time."""
+        storage = DataStorage(data_dir=tmp_path)
+        first = date(2024, 3, 1)
+        for offset in range(10):
+            day = first + timedelta(days=offset)
+            windows = {f"PROJ-{offset * 5000 + n} task {n % 97} - module_{n % 311}.py": 1.0
+                       for n in range(5000)}
+            storage.write_day(day, {
+                "date": day.isoformat(),
+                "total_tracking_time": 5000.0,
+                "applications": {"code.exe": {"total_time": 5000.0, "windows": windows}},
+            })
+        index = TitleIndex(storage)
+
+        index_size = sum(storage.index_path(day).stat().st_size for day, _ in storage.iter_days())
+        day_size = sum(storage.day_path(day).stat().st_size for day, _ in storage.iter_days())
+        assert index_size < day_size, "Segments should be smaller than the day files"
+
+        started = time.perf_counter()
+        hits = list(index.search("proj-12345"))
+        indexed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scanned = [title for day, _ in storage.iter_days()
+                   for app in storage.load_day(day)["applications"].values()
+                   for title in app["windows"] if "proj-12345" in tokenize(title)]
+        scan = time.perf_counter() - started
+
+        assert [hit.title for hit in hits] == scanned, "Search should match a plain scan"
+        assert indexed * 5 < scan, \
+            f"Search ({indexed:.4f}s) should be well ahead of a scan ({scan:.4f}s)"
+
+    def test_search_command(self, storage, capsys):
+        """Test the search command totals matching titles."""
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--data-dir", str(storage.data_dir), "search", "PROJ-42"])
+
+        assert exit_info.value.code == 0, "Search should succeed"
+        out = capsys.readouterr().out
+        assert "code.exe (PROJ-42 fix parser - main.py): 1.67 minutes" in out, \
+            "Should list matching titles"
+        assert "Total: 3.33 minutes" in out, "Should print the total"
@@ -1,5 +1,8 @@
 import pytest
+import time
 from PyQt6.QtWidgets import QApplication
+from time_tracker.data_handlers.storage import DataStorage
+from time_tracker.tracker.application_tracker import ApplicationTracker
 from time_tracker.ui.main_window import TimeTrackerUI
 
 @pytest.fixture
@@ -8,9 +11,10 @@ def app():
     return QApplication([])
 
 @pytest.fixture
-def window(app):
-    """Create the main window."""
-    return TimeTrackerUI()
+def window(app, tmp_path):
+    """Create the main window, saving into a temporary directory."""
+    tracker = ApplicationTracker(storage_handler=DataStorage(data_dir=tmp_path))
+    return TimeTrackerUI(tracker)
 
 class TestTimeTrackerUI:
     def test_window_title(self, window):
@@ -28,4 +32,18 @@ class TestTimeTrackerUI:
         
         window.stop_tracking()
         assert window.start_button.isEnabled()
-        assert not window.stop_button.isEnabled() 
\ No newline at end of file
+        assert not window.stop_button.isEnabled()
+    
+    def test_timeline_seeded_once(self, app, tmp_path):
+        """Test that segments already in the seeded timeline are not added again."""
+        tracker = ApplicationTracker(storage_handler=DataStorage(data_dir=tmp_path))
+        now = time.time()
+        tracker._record_segment("code.exe (main.py)", now - 120, now - 60)
+        window = TimeTrackerUI(tracker)
+        window.update_timeline()
+        assert window.shown_segments == len(tracker.segments), \
+            "Segments in the seeded timeline should count as shown"
+        
+        tracker._record_segment("chrome.exe", now - 60, now - 30)
+        window.update_timeline()
+        assert window.shown_segments == 2, "Only newer segments should be added" 
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, Mock
 from time_tracker.tracker.utils import get_active_window_info
+from time_tracker.tracker.process_table import ProcessInfo
 import psutil
 
 # Constants for testing
@@ -161,4 +162,23 @@ class TestWindowInfo:
         long_title = "A" * 1000  # Very long title
         mock_window_setup['text'].return_value = long_title
         result = get_active_window_info()
-        assert result == f"test_app.exe ({long_title})" 
\ No newline at end of file
+        assert result == f"test_app.exe ({long_title})" 
+    @pytest.mark.process
+    def test_process_table_lookup(self, mock_window_setup):
+        """Test that a process snapshot replaces the per-poll psutil call."""
+        table = Mock()
+        table.lookup.return_value = ProcessInfo(
+            TEST_PROCESS_ID, "python.exe", None, ("python.exe", "manage.py", "runserver"), 1)
+        result = get_active_window_info(process_table=table)
+        
+        assert result == f"python.exe [manage.py] ({TEST_WINDOW_TITLE})", \
+            "Interpreter should be named by its script"
+        mock_window_setup['process'].assert_not_called()
+
+    @pytest.mark.process
+    def test_process_table_miss_falls_back(self, mock_window_setup):
+        """Test that a process missing from the snapshot is looked up directly."""
+        table = Mock()
+        table.lookup.return_value = None
+        result = get_active_window_info(process_table=table)
+        assert result == f"{TEST_PROCESS_NAME} ({TEST_WINDOW_TITLE})"
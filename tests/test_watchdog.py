@@ -0,0 +1,147 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from time_tracker.tracker.application_tracker import ApplicationTracker
+from time_tracker.tracker.watchdog import WatchdogProbe
+
+# Constants for testing
+TEST_DEADLINE = 0.05
+
+class ScriptedProbe:
+    """Window probe that answers from a list and hangs while `release` is clear."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.release = threading.Event()
+        self.release.set()
+        self.delay = 0.0
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait()
+        time.sleep(self.delay)
+        return self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+
+@pytest.fixture
+def scripted():
+    """
+    Fixture to create a probe and a watchdog around it.
+
+    Returns:
+        tuple: (ScriptedProbe, WatchdogProbe) with a short deadline
+    """
+    probe = ScriptedProbe(["code.exe (main.py)", "chrome.exe (Docs)"])
+    watchdog = WatchdogProbe(probe, deadline=TEST_DEADLINE, max_strikes=2, max_abandoned=2)
+    yield probe, watchdog
+    probe.release.set()
+    watchdog.close()
+
+class TestWatchdogProbe:
+    """Test suite for the deadline-bound window probe."""
+
+    def test_passes_results_through(self, scripted):
+        """Test that a responsive probe's results are returned fresh."""
+        _, watchdog = scripted
+        assert watchdog() == "code.exe (main.py)", "Should return the probe's answer"
+        assert watchdog() == "chrome.exe (Docs)", "Should return the next answer"
+        assert not watchdog.stale, "Answers within the deadline are not stale"
+
+    def test_hang_returns_stale_result(self, scripted):
+        """Test that a hung probe is cut off at the deadline with the last result."""
+        probe, watchdog = scripted
+        watchdog()
+        probe.release.clear()
+
+        started = time.monotonic()
+        assert watchdog() == "code.exe (main.py)", "Should reuse the last known window"
+        assert time.monotonic() - started < TEST_DEADLINE * 5, "Should not wait past the deadline"
+        assert watchdog.stale and watchdog.timeouts == 1, "The result should be flagged stale"
+
+        probe.release.set()
+        assert watchdog() == "chrome.exe (Docs)", "Should recover once the probe answers"
+        assert not watchdog.stale, "Fresh results clear the flag"
+
+    def test_long_hang_stops_accruing(self, scripted):
+        """Test that a probe stuck past max_stale returns None instead of the last app."""
+        probe, watchdog = scripted
+        watchdog.max_stale = TEST_DEADLINE
+        watchdog()
+        probe.release.clear()
+
+        assert watchdog() == "code.exe (main.py)", "A short hang keeps the last app"
+        assert watchdog() is None, "A long hang should stop crediting the last app"
+        assert watchdog.stale, "The result is still flagged stale"
+
+    def test_skips_probes_queued_behind_a_hang(self):
+        """Test that a recovered worker runs only the newest queued probe."""
+        probe = ScriptedProbe(["code.exe (main.py)"])
+        watchdog = WatchdogProbe(probe, deadline=TEST_DEADLINE, max_strikes=100)
+        try:
+            watchdog()
+            probe.release.clear()
+            for _ in range(5):
+                watchdog()
+            probe.release.set()
+            time.sleep(TEST_DEADLINE * 2)
+
+            assert probe.calls == 3, \
+                "Only the hung call and the newest queued one should run"
+        finally:
+            probe.release.set()
+            watchdog.close()
+
+    def test_recycles_stuck_workers(self, scripted):
+        """Test that repeated timeouts replace the worker, up to a limit."""
+        probe, watchdog = scripted
+        watchdog()
+        probe.release.clear()
+        for _ in range(6):
+            watchdog()
+
+        assert watchdog.recycled == 2, "A worker should be replaced every two timeouts"
+        assert watchdog._current_worker() is None, \
+            "No new worker should start while the abandoned ones are stuck"
+
+        probe.release.set()
+        time.sleep(TEST_DEADLINE)
+        assert watchdog() == "chrome.exe (Docs)", "Should start over once they exit"
+
+    def test_counts_slow_probes(self, scripted):
+        """Test that answers slower than the threshold are counted but used."""
+        probe, watchdog = scripted
+        probe.delay = TEST_DEADLINE * 0.7
+        assert watchdog() == "code.exe (main.py)", "A slow answer is still fresh"
+        assert watchdog.slow == 1, "It should be counted as an outlier"
+
+    def test_tracker_keeps_cadence(self, scripted):
+        """Test that a tracker polling a hung probe keeps accounting time."""
+        probe, watchdog = scripted
+        tracker = ApplicationTracker(storage_handler=Mock(), window_source=watchdog)
+        tracker.poll()
+        probe.release.clear()
+
+        started = time.monotonic()
+        for _ in range(5):
+            tracker.poll()
+        assert time.monotonic() - started < 5 * TEST_DEADLINE * 3, \
+            "Polls should return within their deadlines"
+        assert tracker.current_app == "code.exe (main.py)", \
+            "The last known app should stay current"
+
+    def test_events_mark_stale_periods(self, scripted):
+        """Test that events() reports when the probe went stale and recovered."""
+        probe, watchdog = scripted
+        tracker = ApplicationTracker(storage_handler=Mock(), window_source=watchdog)
+        events = tracker.events(interval=0, heartbeat_every=1000, checkpoint_every=1000)
+        try:
+            probe.release.clear()
+            stale = next(events)
+            probe.release.set()
+            fresh = next(events)
+        finally:
+            events.close()
+
+        assert stale["type"] == "stale", "A hung probe should be reported"
+        assert fresh["type"] == "fresh", "Recovery should be reported too"
@@ -1,12 +1,32 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from .ui.main_window import TimeTrackerUI
+from .cli import build_parser, start_tracker
+from .tracker.activity_log import configure_logging
 
-def main():
-    app = QApplication(sys.argv)
-    window = TimeTrackerUI()
+def run_gui(args):
+    """Start the tracker window."""
+    from PyQt6.QtWidgets import QApplication
+    from .ui.main_window import TimeTrackerUI
+
+    tracker, stop = start_tracker(args)
+    app = QApplication(sys.argv[:1])
+    window = TimeTrackerUI(tracker=tracker)
     window.show()
-    sys.exit(app.exec())
+    try:
+        return app.exec()
+    finally:
+        stop()
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    listener = configure_logging()
+    try:
+        if args.command is None:
+            status = run_gui(args)
+        else:
+            status = args.func(args)
+    finally:
+        listener.stop()
+    sys.exit(status)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
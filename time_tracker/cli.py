@@ -0,0 +1,359 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+from datetime import date
+from functools import partial
+from pathlib import Path
+from .data_handlers.compaction import Compactor, RetentionPolicy
+from .data_handlers.export import EXPORT_WRITERS, iter_usage_rows
+from .data_handlers.focus_stats import FOCUS_QUANTILES, focus_percentiles, merge_focus_sketches
+from .data_handlers.importer import LegacyImporter
+from .data_handlers.migration import migrate_flat_layout
+from .data_handlers.query_cache import QueryCache
+from .data_handlers.storage import DataStorage
+from .data_handlers.sync import DirectorySync
+from .data_handlers.title_index import TitleIndex
+from .ingest.server import IngestServer
+from .metrics import MetricsServer, register_process_gauges
+from .tracker.application_tracker import ApplicationTracker
+from .tracker.pipeline import load_pipeline_config
+from .tracker.process_table import ProcessSnapshotter
+from .tracker.shared_snapshot import SnapshotPublisher
+from .tracker.utils import get_active_window_info
+from .tracker.watchdog import WatchdogProbe
+from .tracker.replay import ReplayEngine, load_trace, synthetic_trace
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+def build_parser():
+    """Build the command line parser. Without a command the GUI is started."""
+    parser = argparse.ArgumentParser(prog="time-tracker",
+                                     description="An application usage time tracker")
+    parser.add_argument("--data-dir", default="data",
+                        help="directory holding the saved day files (default: data)")
+    parser.add_argument("--title-capacity", type=int,
+                        help="keep at most this many window titles, folding the rest "
+                             "into their process totals")
+    parser.add_argument("--pipeline-config",
+                        help="JSON file declaring the segment processing stages and sinks")
+    parser.add_argument("--process-metadata", action="store_true",
+                        help="read process details from a background snapshot and "
+                             "name interpreters by the script they run")
+    parser.add_argument("--shared-snapshot", nargs="?", const="time_tracker", metavar="NAME",
+                        help="publish live totals in shared memory segments named NAME "
+                             "and NAME_names (default: time_tracker)")
+    parser.add_argument("--probe-deadline", type=float, default=0.25,
+                        help="seconds a window probe may take before the last known "
+                             "window is reused (default: 0.25)")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    commands = parser.add_subparsers(dest="command")
+
+    export = commands.add_parser("export", help="export saved history as flat rows")
+    export.add_argument("--format", choices=sorted(EXPORT_WRITERS), default="csv")
+    export.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="first day to export (YYYY-MM-DD)")
+    export.add_argument("--to", dest="end", type=date.fromisoformat,
+                        help="last day to export (YYYY-MM-DD)")
+    export.add_argument("--output", "-o", help="file to write instead of stdout")
+    export.set_defaults(func=export_command)
+
+    report = commands.add_parser("report", help="summarize time per app over a date range")
+    report.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="first day to include (YYYY-MM-DD)")
+    report.add_argument("--to", dest="end", type=date.fromisoformat,
+                        help="last day to include (YYYY-MM-DD)")
+    report.set_defaults(func=report_command)
+
+    focus = commands.add_parser("focus", help="percentiles of uninterrupted focus time "
+                                              "per app over a date range")
+    focus.add_argument("--from", dest="start", type=date.fromisoformat,
+                       help="first day to include (YYYY-MM-DD)")
+    focus.add_argument("--to", dest="end", type=date.fromisoformat,
+                       help="last day to include (YYYY-MM-DD)")
+    focus.add_argument("--fleet", action="store_true",
+                       help="also include every client collected by the ingest server")
+    focus.set_defaults(func=focus_command)
+
+    search = commands.add_parser("search", help="total the time on window titles "
+                                                "containing every word of a query")
+    search.add_argument("query", help="words to look for, e.g. PROJ-42")
+    search.add_argument("--from", dest="start", type=date.fromisoformat,
+                        help="first day to search (YYYY-MM-DD)")
+    search.add_argument("--to", dest="end", type=date.fromisoformat,
+                        help="last day to search (YYYY-MM-DD)")
+    search.add_argument("--app", help="only search titles of this process")
+    search.set_defaults(func=search_command)
+
+    render = commands.add_parser("render", help="render chart images for saved day files "
+                                                "without opening a window")
+    render.add_argument("inputs", nargs="+",
+                        help="day files, or directories searched for day files")
+    render.add_argument("--output-dir", "-o", default="reports",
+                        help="directory for the images (default: reports)")
+    render.add_argument("--format", choices=("png", "svg"), default="png")
+    render.add_argument("--workers", type=int,
+                        help="worker processes (default: one per CPU)")
+    render.set_defaults(func=render_command)
+
+    compact = commands.add_parser("compact", help="apply the retention policy to old days")
+    compact.add_argument("--detail-days", type=int, default=30,
+                         help="days to keep every window title (default: 30)")
+    compact.add_argument("--summary-days", type=int, default=365,
+                         help="days to keep per-day app totals (default: 365)")
+    compact.add_argument("--top-titles", type=int, default=10,
+                         help="titles kept per app in summarized days (default: 10)")
+    compact.set_defaults(func=compact_command)
+
+    migrate = commands.add_parser("migrate",
+                                  help="move a flat data directory into YYYY/MM partitions")
+    migrate.set_defaults(func=migrate_command)
+
+    importer = commands.add_parser("import", help="bulk-load day files written by the "
+                                                  "old app_tracker.py script")
+    importer.add_argument("paths", nargs="+",
+                          help="legacy day files, or directories searched for them")
+    importer.add_argument("--workers", type=int,
+                          help="worker processes (default: one per CPU)")
+    importer.add_argument("--dry-run", action="store_true",
+                          help="validate and count without writing anything")
+    importer.set_defaults(func=import_command)
+
+    sync = commands.add_parser("sync", help="mirror the data directory into another "
+                                            "directory, sending only changed chunks")
+    sync.add_argument("--to", dest="destination", required=True,
+                      help="directory to keep up to date, e.g. a shared folder")
+    sync.set_defaults(func=sync_command)
+
+    ingest = commands.add_parser("ingest-server",
+                                 help="collect segment events from remote trackers "
+                                      "into DATA_DIR/clients/<client id>")
+    ingest.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on (default: 127.0.0.1)")
+    ingest.add_argument("--port", type=int, default=9500, help="port (default: 9500)")
+    ingest.add_argument("--queue-size", type=int, default=1024,
+                        help="received batches held before reading pauses (default: 1024)")
+    ingest.set_defaults(func=ingest_command)
+
+    stream = commands.add_parser("stream", help="track without the window and write "
+                                                "switch, heartbeat and checkpoint events "
+                                                "to stdout as NDJSON")
+    stream.add_argument("--interval", type=float, default=0.5,
+                        help="seconds between window probes (default: 0.5)")
+    stream.add_argument("--heartbeat", type=float, default=30.0,
+                        help="seconds between heartbeat events (default: 30)")
+    stream.add_argument("--checkpoint", type=float, default=300.0,
+                        help="seconds between saves, each reported as a checkpoint "
+                             "event (default: 300)")
+    stream.set_defaults(func=stream_command)
+
+    replay = commands.add_parser("replay", help="replay a switch trace on a virtual clock")
+    replay.add_argument("--trace", help="NDJSON trace of {timestamp, app} records; "
+                                        "a synthetic trace is generated if omitted")
+    replay.add_argument("--switches", type=int, default=50000,
+                        help="switches in the synthetic trace (default: 50000)")
+    replay.add_argument("--hours", type=float, default=8.0,
+                        help="length of the synthetic trace (default: 8)")
+    replay.add_argument("--seed", type=int, default=0)
+    replay.set_defaults(func=replay_command)
+
+    return parser
+
+def export_command(args):
+    """Stream saved days as CSV or NDJSON rows."""
+    storage = DataStorage(args.data_dir)
+    rows = iter_usage_rows(storage, args.start, args.end)
+    write = EXPORT_WRITERS[args.format]
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8",
+                  buffering=OUTPUT_BUFFER_SIZE) as out:
+            write(rows, out)
+    else:
+        # Same buffering and line endings as a file: text-mode stdout would
+        # turn the csv module's \r\n into \r\r\n on Windows
+        sys.stdout.flush()
+        out = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, OUTPUT_BUFFER_SIZE),
+                               encoding="utf-8", newline="")
+        try:
+            write(rows, out)
+        finally:
+            # Flushes both layers but leaves sys.stdout's own buffer open
+            out.detach().detach().flush()
+    return 0
+
+def report_command(args):
+    """Print per-app totals for a date range, served from the query cache when possible."""
+    cache = QueryCache(DataStorage(args.data_dir))
+    totals = cache.app_totals(args.start, args.end)
+    cache.save()
+
+    print("\nApplication Usage Report:")
+    print("-" * 60)
+    for app_name, seconds in sorted(totals.items(), key=lambda x: x[1], reverse=True):
+        print(f"{app_name}: {seconds / 60:.2f} minutes")
+    return 0
+
+def focus_command(args):
+    """Print p50/p90/p99 focus segment lengths per app, merged from the saved sketches."""
+    storages = [DataStorage(args.data_dir)]
+    clients_dir = Path(args.data_dir) / "clients"
+    if args.fleet and clients_dir.is_dir():
+        storages.extend(DataStorage(path) for path in sorted(clients_dir.iterdir())
+                        if path.is_dir())
+
+    rows = focus_percentiles(merge_focus_sketches(storages, args.start, args.end))
+    labels = " / ".join(f"p{round(q * 100)}" for q in FOCUS_QUANTILES)
+    print(f"\nFocus time per switch (minutes): {labels}")
+    print("-" * 60)
+    for app_name, count, values in rows:
+        minutes = " / ".join(f"{value / 60:.1f}" for value in values)
+        print(f"{app_name} ({count} segments): {minutes}")
+    return 0
+
+def search_command(args):
+    """Print the time spent on matching window titles, from the title index."""
+    totals = {}
+    for hit in TitleIndex(DataStorage(args.data_dir)).search(args.query, args.start,
+                                                            args.end, args.app):
+        key = (hit.app, hit.title)
+        totals[key] = totals.get(key, 0) + hit.seconds
+
+    print(f"\nWindow titles matching {args.query!r}:")
+    print("-" * 60)
+    for (app_name, title), seconds in sorted(totals.items(), key=lambda x: x[1], reverse=True):
+        print(f"{app_name} ({title}): {seconds / 60:.2f} minutes")
+    print(f"Total: {sum(totals.values()) / 60:.2f} minutes")
+    return 0
+
+def render_command(args):
+    """Render pie and bar chart images for many day files in parallel."""
+    # Qt is only needed here, so load it on demand
+    from .ui.report_renderer import find_report_jobs, render_reports
+
+    jobs = find_report_jobs(args.inputs, args.output_dir, args.format)
+    rendered = render_reports(jobs, workers=args.workers)
+    print(f"Rendered {rendered} report(s) to {args.output_dir}")
+    return 0
+
+def compact_command(args):
+    """Summarize and roll up days that aged out of the retention policy."""
+    policy = RetentionPolicy(args.detail_days, args.summary_days, args.top_titles)
+    summarized, rolled_up = Compactor(DataStorage(args.data_dir), policy).run()
+    print(f"Summarized {summarized} day(s), rolled up {rolled_up} day(s) into monthly totals")
+    return 0
+
+def migrate_command(args):
+    """Convert the data directory to the partitioned layout and rebuild its manifest."""
+    storage = DataStorage(args.data_dir)
+    moved = migrate_flat_layout(storage)
+    print(f"Moved {moved} file(s); manifest lists {len(list(storage.iter_days()))} day(s)")
+    return 0
+
+def import_command(args):
+    """Validate, deduplicate and load legacy day files in one batch."""
+    result = LegacyImporter(DataStorage(args.data_dir), args.workers).run(
+        args.paths, dry_run=args.dry_run)
+    action = "Would import" if args.dry_run else "Imported"
+    print(f"{action} {result.imported} file(s) into {len(result.days)} day(s); "
+          f"skipped {result.duplicates} duplicate(s)")
+    for path, error in result.invalid:
+        print(f"  INVALID {path}: {error}")
+    return 1 if result.invalid else 0
+
+def sync_command(args):
+    """Bring a mirror of the data directory up to date."""
+    result = DirectorySync(args.data_dir, args.destination).run()
+    print(f"Updated {result.changed} file(s) with {result.chunks_sent} chunk(s) "
+          f"({result.bytes_sent} bytes), {result.unchanged} unchanged, "
+          f"{result.deleted} deleted")
+    return 0
+
+def ingest_command(args):
+    """Run the ingest server until interrupted."""
+    server = IngestServer(args.data_dir, args.host, args.port, args.queue_size)
+    print(f"Listening for tracker events on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def start_tracker(args):
+    """Build a resumed tracker and the optional services the global options ask for.
+
+    Returns (tracker, stop), where stop() shuts down the window probe, the
+    process snapshotter, the metrics server and the shared snapshot.
+    """
+    snapshotter = None
+    probe = get_active_window_info
+    if args.process_metadata:
+        snapshotter = ProcessSnapshotter().start()
+        probe = partial(get_active_window_info, process_table=snapshotter)
+    # Probes run on a worker so a hung window or process cannot stall tracking
+    window_source = WatchdogProbe(probe, deadline=args.probe_deadline)
+
+    pipeline_config = None
+    if args.pipeline_config:
+        pipeline_config = load_pipeline_config(args.pipeline_config)
+
+    tracker = ApplicationTracker(storage_handler=DataStorage(args.data_dir),
+                                 title_capacity=args.title_capacity,
+                                 window_source=window_source,
+                                 pipeline_config=pipeline_config,
+                                 resume=True)
+    if args.shared_snapshot:
+        tracker.publisher = SnapshotPublisher(args.shared_snapshot)
+
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(port=args.metrics_port).start()
+        register_process_gauges(tracker)
+
+    def stop():
+        window_source.close()
+        if snapshotter is not None:
+            snapshotter.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if tracker.publisher is not None:
+            tracker.publisher.close()
+
+    return tracker, stop
+
+def stream_command(args):
+    """Write tracker events to stdout, one JSON object per line, until interrupted."""
+    tracker, stop = start_tracker(args)
+    events = tracker.events(args.interval, args.heartbeat, args.checkpoint)
+    try:
+        for event in events:
+            sys.stdout.write(json.dumps(event, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # The reader went away; keep the interpreter from failing to flush stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        events.close()
+        tracker.close()
+        stop()
+    return 0
+
+def replay_command(args):
+    """Replay a trace through the tracker and check the totals."""
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        trace = synthetic_trace(args.switches, args.hours * 3600, seed=args.seed)
+
+    result = ReplayEngine(trace).run()
+    print(f"Replayed {len(trace)} events ({result.switches} switches, "
+          f"{result.traced_seconds / 3600:.1f}h) in {result.elapsed:.2f}s "
+          f"({result.speedup:,.0f}x real time)")
+    for app, (expected, actual) in sorted(result.mismatches.items()):
+        print(f"  MISMATCH {app}: expected {expected}, got {actual}")
+    return 1 if result.mismatches else 0
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from .fileio import read_json
+
+SUMMARY_LEVEL = "summary"
+
+class RetentionPolicy:
+    """How long each level of detail is kept.
+
+    Days younger than ``detail_days`` keep every window title. Older days
+    keep per-app totals and only the ``top_titles`` longest titles. Once a
+    whole month is older than ``summary_days`` its days are folded into a
+    single monthly per-app rollup.
+    """
+
+    def __init__(self, detail_days=30, summary_days=365, top_titles=10):
+        if summary_days < detail_days:
+            raise ValueError("summary_days must not be shorter than detail_days")
+        self.detail_days = detail_days
+        self.summary_days = summary_days
+        self.top_titles = top_titles
+
+class Compactor:
+    """Incrementally apply a retention policy to a DataStorage directory.
+
+    The storage manifest records which days were summarized, and rolled up
+    days are removed, so every run finds the remaining work (including
+    old days that were imported or ingested after their month was already
+    compacted) from the manifest alone. Every rewrite is atomic, so an
+    interrupted run simply picks up where it stopped.
+    """
+
+    def __init__(self, storage, policy=None):
+        self.storage = storage
+        self.policy = policy or RetentionPolicy()
+
+    def run(self, today=None):
+        """Compact every day that aged out of its level. Returns (summarized, rolled_up)."""
+        today = today or date.today()
+
+        # Only roll up months whose last day is past the summary window
+        cutoff = today - timedelta(days=self.policy.summary_days + 1)
+        rollup_end = cutoff if _is_month_end(cutoff) else cutoff.replace(day=1) - timedelta(days=1)
+        rolled_up = 0
+        for day, path in list(self.storage.iter_days(end=rollup_end)):
+            self._roll_up_day(day, path)
+            rolled_up += 1
+
+        summarized = 0
+        summary_end = today - timedelta(days=self.policy.detail_days + 1)
+        for day, path in list(self.storage.iter_days(rollup_end + timedelta(days=1),
+                                                     summary_end)):
+            if self.storage.manifest_entry(day).get("compaction") == SUMMARY_LEVEL:
+                continue
+            if self._summarize_day(day, path):
+                summarized += 1
+
+        return summarized, rolled_up
+
+    def _summarize_day(self, day, path):
+        """Trim a day to per-app totals and its top titles. Returns False if already done."""
+        data = read_json(path)
+        if data.get("compaction") == SUMMARY_LEVEL:
+            # Summarized before the manifest recorded it; rewriting records it
+            self.storage.write_day(day, data)
+            return False
+
+        for app_data in data["applications"].values():
+            windows = app_data.get("windows", {})
+            top = sorted(windows.items(), key=lambda x: x[1], reverse=True)
+            app_data["windows"] = dict(top[:self.policy.top_titles])
+        data["compaction"] = SUMMARY_LEVEL
+
+        self.storage.write_day(day, data)
+        return True
+
+    def _roll_up_day(self, day, path):
+        """Fold a day into its monthly rollup and remove the day file.
+
+        The rollup records the hash of every day file folded into it. A day
+        file that shows up again for a rolled up day (an import or late
+        ingest) holds time the rollup does not have yet and is added; the
+        very same file left by an interrupted run is not counted twice.
+        """
+        data = read_json(path)
+        sha256 = self.storage.manifest_entry(day)["sha256"]
+        month = self.storage.load_month(day) or {
+            "month": day.strftime("%Y-%m"),
+            "days": [],
+            "total_tracking_time": 0,
+            "applications": {},
+        }
+        merged = month.setdefault("merged", [])
+
+        if sha256 not in merged:
+            if day.isoformat() not in month["days"]:
+                month["days"].append(day.isoformat())
+                month["days"].sort()
+            merged.append(sha256)
+            month["total_tracking_time"] = round(
+                month["total_tracking_time"] + data["total_tracking_time"], 2)
+            for app_name, app_data in data["applications"].items():
+                totals = month["applications"].setdefault(app_name, {"total_time": 0})
+                totals["total_time"] = round(totals["total_time"] + app_data["total_time"], 2)
+            self.storage.write_month(day, month)
+
+        self.storage.delete_day(day)
+
+def _is_month_end(day):
+    """Return True if the date is the last day of its month."""
+    return (day + timedelta(days=1)).day == 1
@@ -0,0 +1,45 @@
+import csv
+import json
+
+EXPORT_FIELDS = ("date", "app", "window", "seconds")
+
+def iter_usage_rows(storage, start=None, end=None):
+    """Yield flat (date, app, window, seconds) rows for saved days, one file at a time.
+
+    Months that compaction rolled up yield their per-app totals, dated
+    "YYYY-MM" and without window titles.
+    """
+    for _, path in storage.iter_periods(start, end):
+        with open(path) as f:
+            data = json.load(f)
+        yield from day_rows(data)
+
+def day_rows(data):
+    """Flatten one day's (or monthly rollup's) saved data into (date, app, window, seconds) rows."""
+    day = data.get("date") or data["month"]
+    for app_name, app_data in data["applications"].items():
+        windows = app_data.get("windows", {})
+        for window, seconds in windows.items():
+            yield (day, app_name, window, seconds)
+
+        # Time without a window title is only part of the app total
+        untitled = round(app_data["total_time"] - sum(windows.values()), 2)
+        if untitled > 0:
+            yield (day, app_name, "", untitled)
+
+def write_csv(rows, out):
+    """Write rows as CSV with a header line."""
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_FIELDS)
+    writer.writerows(rows)
+
+def write_ndjson(rows, out):
+    """Write rows as newline-delimited JSON objects."""
+    for row in rows:
+        out.write(json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False))
+        out.write("\n")
+
+EXPORT_WRITERS = {
+    "csv": write_csv,
+    "ndjson": write_ndjson,
+}
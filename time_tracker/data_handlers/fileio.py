@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+def atomic_write_bytes(path, data):
+    """Write bytes to a file so readers see either the old or the new content."""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+def atomic_write_json(path, data, **kwargs):
+    """Serialize data as JSON and write it atomically."""
+    atomic_write_bytes(path, json.dumps(data, **kwargs).encode('utf-8'))
+
+def read_json(path, default=None):
+    """Load a JSON file, returning a default if it does not exist."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
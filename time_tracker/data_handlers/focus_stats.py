@@ -0,0 +1,24 @@
+FOCUS_QUANTILES = (0.5, 0.9, 0.99)
+
+def merge_focus_sketches(storages, start=None, end=None):
+    """Merge the focus sketches saved for a date range across several storages.
+
+    Returns {process name: KLLSketch}. The cost grows with the number of
+    saved sketches, not with the number of segments they summarize.
+    """
+    merged = {}
+    for storage in storages:
+        for day, _ in storage.iter_days(start, end):
+            for app_name, sketch in storage.load_focus_sketches(day).items():
+                if app_name in merged:
+                    merged[app_name].merge(sketch)
+                else:
+                    merged[app_name] = sketch
+    return merged
+
+def focus_percentiles(sketches, quantiles=FOCUS_QUANTILES):
+    """Return (app, segment count, [value per quantile]) rows, most segments first."""
+    rows = [(app_name, sketch.count, sketch.quantiles(quantiles))
+            for app_name, sketch in sketches.items() if sketch.count]
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows
@@ -4,13 +4,43 @@ def group_application_data(app_times):
     
     for app_window, duration in app_times.items():
         app_name = app_window.split(" (")[0]
-        window_title = app_window.split(" (")[1][:-1] if " (" in app_window else ""
+        window_title = app_window.split(" (", 1)[1][:-1] if " (" in app_window else ""
         
         if app_name not in app_groups:
             app_groups[app_name] = {"total": 0, "windows": {}}
         
         app_groups[app_name]["total"] += duration
         if window_title:
-            app_groups[app_name]["windows"][window_title] = duration
+            windows = app_groups[app_name]["windows"]
+            windows[window_title] = windows.get(window_title, 0) + duration
     
-    return app_groups 
\ No newline at end of file
+    return app_groups
+
+def format_applications(app_times):
+    """Return the "applications" mapping of a day file for flat app_times."""
+    return {
+        app_name: {
+            'total_time': round(data["total"], 2),
+            'windows': {
+                window: round(duration, 2)
+                for window, duration in data["windows"].items()
+            }
+        }
+        for app_name, data in group_application_data(app_times).items()
+    }
+
+def ungroup_application_data(applications):
+    """Rebuild flat app_times from a saved day's "applications" mapping.
+
+    Each window becomes a "process (title)" entry; time not covered by any
+    window is credited to the bare process name.
+    """
+    app_times = {}
+    for app_name, app_data in applications.items():
+        windows = app_data.get("windows", {})
+        for window, duration in windows.items():
+            app_times[f"{app_name} ({window})"] = duration
+        remainder = round(app_data["total_time"] - sum(windows.values()), 2)
+        if remainder > 0:
+            app_times[app_name] = remainder
+    return app_times
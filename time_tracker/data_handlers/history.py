@@ -0,0 +1,86 @@
+import heapq
+import json
+import tempfile
+from contextlib import ExitStack
+from itertools import islice
+from .export import EXPORT_FIELDS, day_rows
+from .fileio import read_json
+
+# Rows sorted in memory at once before a run is spilled to a temporary file
+RUN_ROWS = 50000
+
+class HistoryQuery:
+    """Saved history rows, filtered and sorted by the data layer.
+
+    Sorting by date (the default) streams one day file at a time, so any
+    page can be produced without loading the whole range. Other sort
+    columns are served by an external merge sort: matching rows are sorted
+    in runs of at most RUN_ROWS, spilled to temporary files and merged
+    lazily, so memory stays bounded by one run however long the range.
+    The filter is a case-insensitive substring of the app or the
+    window title. Months that compaction rolled up appear as per-app rows
+    dated "YYYY-MM".
+    """
+
+    def __init__(self, storage, filter_text="", sort_column="date", descending=False,
+                 start=None, end=None):
+        if sort_column not in EXPORT_FIELDS:
+            raise ValueError(f"Unknown history column: {sort_column!r}")
+        self.storage = storage
+        self.filter_text = filter_text.lower()
+        self.sort_column = sort_column
+        self.descending = descending
+        self.start = start
+        self.end = end
+
+    def rows(self):
+        """Yield matching (date, app, window, seconds) rows in sort order."""
+        if self.sort_column != "date":
+            yield from self._sorted_rows()
+            return
+
+        days = list(self._days())
+        if self.descending:
+            days.reverse()
+        yield from self._matching(days)
+
+    def pages(self, page_size=500):
+        """Yield lists of at most page_size rows."""
+        rows = self.rows()
+        while True:
+            page = list(islice(rows, page_size))
+            if not page:
+                return
+            yield page
+
+    def _sorted_rows(self):
+        """Yield the matching rows ordered by a non-date column, via sorted runs."""
+        column = EXPORT_FIELDS.index(self.sort_column)
+        key = lambda row: (row[column], row[0])
+        matching = self._matching(self._days())
+        run = sorted(islice(matching, RUN_ROWS), key=key, reverse=self.descending)
+        if len(run) < RUN_ROWS:
+            # Everything fit in one run
+            yield from run
+            return
+
+        with ExitStack() as stack:
+            runs = []
+            while run:
+                f = stack.enter_context(tempfile.TemporaryFile('w+', encoding='utf-8'))
+                f.writelines(json.dumps(row) + "\n" for row in run)
+                f.seek(0)
+                runs.append(tuple(json.loads(line)) for line in f)
+                run = sorted(islice(matching, RUN_ROWS), key=key, reverse=self.descending)
+            yield from heapq.merge(*runs, key=key, reverse=self.descending)
+
+    def _days(self):
+        return self.storage.iter_periods(self.start, self.end)
+
+    def _matching(self, days):
+        """Yield the rows of each day that pass the filter."""
+        for _, path in days:
+            for row in day_rows(read_json(path)):
+                if not self.filter_text or (self.filter_text in row[1].lower()
+                                            or self.filter_text in row[2].lower()):
+                    yield row
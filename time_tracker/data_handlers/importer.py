@@ -0,0 +1,153 @@
+import hashlib
+import json
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from .fileio import atomic_write_json, read_json
+from .storage import DAY_FILE_PATTERN
+
+IMPORT_LOG_FILENAME = "import_log.json"
+
+# Outcome of reading one legacy file; data is None when error is set
+LegacyFile = namedtuple('LegacyFile', ['path', 'day', 'sha256', 'data', 'error'])
+ImportResult = namedtuple('ImportResult', ['imported', 'duplicates', 'invalid', 'days'])
+
+def discover_legacy_files(roots, exclude=None):
+    """Return the legacy day files found under the given files and directories."""
+    exclude = Path(exclude).resolve() if exclude else None
+    found = set()
+    for root in map(Path, roots):
+        candidates = root.rglob('app_usage_*.json') if root.is_dir() else [root]
+        for path in candidates:
+            if not DAY_FILE_PATTERN.match(path.name):
+                continue
+            resolved = path.resolve()
+            if exclude is not None and exclude in resolved.parents:
+                continue
+            found.add(resolved)
+    return sorted(found)
+
+def read_legacy_file(path):
+    """Validate and normalize one legacy day file. Runs in a worker process.
+
+    Window times are clamped so they never exceed their app's total (the
+    old grouping bug lost, but never added, window time) and the day
+    totals are recomputed from the apps.
+    """
+    path = Path(path)
+    day = DAY_FILE_PATTERN.match(path.name).group(1)
+    try:
+        # The name only looks like a date; app_usage_2024-13-45.json does not parse
+        date.fromisoformat(day)
+        payload = path.read_bytes()
+        raw = json.loads(payload)
+        applications = {}
+        for app_name, app_data in raw["applications"].items():
+            windows = {
+                str(title): round(float(seconds), 2)
+                for title, seconds in app_data.get("windows", {}).items()
+                if float(seconds) > 0
+            }
+            total = max(float(app_data["total_time"]), sum(windows.values()))
+            applications[str(app_name)] = {"total_time": round(total, 2), "windows": windows}
+        if raw.get("date", day) != day:
+            raise ValueError(f"date {raw['date']!r} does not match the file name")
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        return LegacyFile(str(path), day, None, None, f"{type(e).__name__}: {e}")
+
+    data = {
+        "date": day,
+        "total_tracking_time": round(sum(a["total_time"] for a in applications.values()), 2),
+        "applications": applications,
+    }
+    return LegacyFile(str(path), day, hashlib.sha256(payload).hexdigest(), data, None)
+
+def merge_day_data(base, extra):
+    """Return the sum of two days' data, keeping base's other keys."""
+    applications = {
+        app_name: {"total_time": app_data["total_time"], "windows": dict(app_data["windows"])}
+        for app_name, app_data in base["applications"].items()
+    }
+    for app_name, app_data in extra["applications"].items():
+        target = applications.setdefault(app_name, {"total_time": 0, "windows": {}})
+        target["total_time"] = round(target["total_time"] + app_data["total_time"], 2)
+        for title, seconds in app_data["windows"].items():
+            target["windows"][title] = round(target["windows"].get(title, 0) + seconds, 2)
+    merged = dict(base)
+    merged["total_tracking_time"] = round(sum(a["total_time"] for a in applications.values()), 2)
+    merged["applications"] = applications
+    return merged
+
+class LegacyImporter:
+    """Bulk-load files written by the old app_tracker.py script.
+
+    Files are read and normalized in parallel, deduplicated by the SHA-256
+    of their content (against each other and against every earlier import,
+    recorded in import_log.json), merged per day into what storage already
+    holds, and written as one batch. Each day file lists the hashes of the
+    sources merged into it under "imported_sources", so an import that
+    stopped after writing the days but before its log is not applied twice
+    when retried.
+    """
+
+    def __init__(self, storage, workers=None):
+        self.storage = storage
+        self.workers = workers
+        self.log_path = storage.data_dir / IMPORT_LOG_FILENAME
+
+    def run(self, roots, dry_run=False):
+        """Import every legacy file under roots. Returns an ImportResult."""
+        paths = discover_legacy_files(roots, exclude=self.storage.data_dir)
+        log = read_json(self.log_path, {"imported": {}})
+        seen = set(log["imported"])
+
+        merged = {}
+        changed = set()
+        imported = []
+        recovered = []
+        duplicates = 0
+        invalid = []
+        for legacy in self._read_all(paths):
+            if legacy.error is not None:
+                invalid.append((legacy.path, legacy.error))
+                continue
+            if legacy.sha256 in seen:
+                duplicates += 1
+                continue
+            seen.add(legacy.sha256)
+
+            day = date.fromisoformat(legacy.day)
+            if day not in merged:
+                merged[day] = self.storage.load_day(day)
+            current = merged[day]
+            sources = current.get("imported_sources", []) if current is not None else []
+            if legacy.sha256 in sources:
+                # Written by an import that stopped before saving its log
+                duplicates += 1
+                recovered.append(legacy)
+                continue
+            imported.append(legacy)
+            merged[day] = (merge_day_data(current, legacy.data)
+                           if current is not None else dict(legacy.data))
+            merged[day]["imported_sources"] = sources + [legacy.sha256]
+            changed.add(day)
+
+        if not dry_run and (changed or recovered):
+            if changed:
+                self.storage.write_days({day: merged[day] for day in changed})
+            imported_at = datetime.now().isoformat(timespec='seconds')
+            for legacy in imported + recovered:
+                log["imported"][legacy.sha256] = {
+                    "source": legacy.path, "date": legacy.day, "imported_at": imported_at,
+                }
+            atomic_write_json(self.log_path, log, indent=1, sort_keys=True)
+
+        return ImportResult(len(imported), duplicates, invalid, sorted(changed))
+
+    def _read_all(self, paths):
+        """Read files in worker processes, or inline when workers is 1."""
+        if self.workers == 1 or len(paths) < 2:
+            return map(read_legacy_file, paths)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(read_legacy_file, paths, chunksize=64))
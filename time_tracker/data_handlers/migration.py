@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import re
+from datetime import date
+from .fileio import atomic_write_json, read_json
+from .formatters import format_applications, ungroup_application_data
+from ..tracker.quantiles import KLLSketch
+
+FLAT_FILE_PATTERN = re.compile(r'^app_usage_(\d{4})-(\d{2})(?:-(\d{2}))?\.(json|timeline)$')
+
+def migrate_flat_layout(storage):
+    """Move files from the old flat data directory into YYYY/MM/ partitions.
+
+    Day files, timelines and monthly rollups are moved with os.replace, so
+    re-running after an interruption just finishes the remaining files.
+    A flat day file whose partitioned copy already exists is merged into
+    it by summing their totals. Any other file that would overwrite a
+    different one is left in place, and FileExistsError is raised once
+    the rest were moved. Returns the number of files moved or merged.
+    """
+    moved = 0
+    conflicts = []
+    for path in sorted(storage.data_dir.glob('app_usage_*')):
+        match = FLAT_FILE_PATTERN.match(path.name)
+        if not match or not path.is_file():
+            continue
+        year, month, day, kind = match.groups()
+        target_dir = storage.partition_dir(date(int(year), int(month), 1))
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / path.name
+        if not target.exists():
+            os.replace(path, target)
+        elif day is not None and kind == 'json':
+            _merge_day_file(path, target)
+        elif path.read_bytes() == target.read_bytes():
+            path.unlink()
+        else:
+            conflicts.append(path.name)
+            continue
+        moved += 1
+
+    storage.rebuild_manifest()
+    if conflicts:
+        raise FileExistsError(f"Not migrated, partitioned copies differ: {', '.join(conflicts)}")
+    return moved
+
+def _merge_day_file(path, target):
+    """Add a flat day file's totals into its partitioned copy, then remove it.
+
+    The merged file records the flat file's hash, so a migration
+    interrupted before the removal does not add it twice.
+    """
+    payload = path.read_bytes()
+    digest = hashlib.sha256(payload).hexdigest()
+    data = read_json(target)
+    if digest not in data.get("merged_from", []):
+        flat = json.loads(payload)
+        app_times = ungroup_application_data(data["applications"])
+        for app, duration in ungroup_application_data(flat["applications"]).items():
+            app_times[app] = app_times.get(app, 0) + duration
+        data["applications"] = format_applications(app_times)
+        data["total_tracking_time"] = (data.get("total_tracking_time", 0)
+                                       + flat.get("total_tracking_time", 0))
+
+        sketches = {name: KLLSketch.from_dict(sketch)
+                    for name, sketch in data.get("focus_sketches", {}).items()}
+        for name, sketch in flat.get("focus_sketches", {}).items():
+            sketch = KLLSketch.from_dict(sketch)
+            if name in sketches:
+                sketches[name].merge(sketch)
+            else:
+                sketches[name] = sketch
+        if sketches:
+            data["focus_sketches"] = {name: sketch.to_dict() for name, sketch in sketches.items()}
+
+        data["merged_from"] = data.get("merged_from", []) + [digest]
+        atomic_write_json(target, data, indent=4)
+    path.unlink()
@@ -0,0 +1,100 @@
+import json
+from .fileio import atomic_write_json, read_json
+
+CACHE_VERSION = 1
+CACHE_FILENAME = "query_cache.json"
+MAX_CACHED_QUERIES = 64
+
+class QueryCache:
+    """Persistent cache of parsed day files and of history query results.
+
+    Monthly rollups left by compaction count like day files. Each file's
+    per-app totals are cached under its relative path and
+    validated against (size, mtime_ns), so an unchanged file costs one
+    stat() instead of a JSON parse. Query results record the stat of every
+    day they were computed from and are recomputed as soon as any of those
+    days changes, appears or disappears.
+    """
+
+    def __init__(self, storage, cache_path=None):
+        self.storage = storage
+        self.cache_path = cache_path or storage.data_dir / ".cache" / CACHE_FILENAME
+        self._files = None
+        self._queries = None
+        self._dirty = False
+
+    def app_totals(self, start=None, end=None):
+        """Return {app: seconds} summed over the saved days in a range."""
+        self._load()
+        key = f"app_totals:{start}:{end}"
+        days = list(self.storage.iter_periods(start, end))
+        deps = {self._key(path): _signature(path) for _, path in days}
+
+        cached = self._queries.get(key)
+        if cached is not None and cached["deps"] == deps:
+            return dict(cached["result"])
+
+        totals = {}
+        for _, path in days:
+            for app_name, seconds in self._aggregate(path, deps[self._key(path)]).items():
+                totals[app_name] = round(totals.get(app_name, 0) + seconds, 2)
+
+        self._queries.pop(key, None)
+        self._queries[key] = {"deps": deps, "result": totals}
+        while len(self._queries) > MAX_CACHED_QUERIES:
+            del self._queries[next(iter(self._queries))]
+        self._dirty = True
+        return dict(totals)
+
+    def save(self):
+        """Write the cache back to disk if anything changed."""
+        if not self._dirty:
+            return
+        # Forget files that were deleted or compacted away
+        self._files = {
+            key: entry for key, entry in self._files.items()
+            if (self.storage.data_dir / key).exists()
+        }
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.cache_path, {
+            "version": CACHE_VERSION,
+            "files": self._files,
+            "queries": self._queries,
+        }, separators=(",", ":"))
+        self._dirty = False
+
+    def _aggregate(self, path, signature):
+        """Return the per-app totals of one day file, parsing it only if it changed."""
+        key = self._key(path)
+        entry = self._files.get(key)
+        if entry is not None and entry[:2] == signature:
+            return entry[2]
+
+        with open(path) as f:
+            data = json.load(f)
+        totals = {
+            app_name: app_data["total_time"]
+            for app_name, app_data in data["applications"].items()
+        }
+        self._files[key] = signature + [totals]
+        self._dirty = True
+        return totals
+
+    def _load(self):
+        """Read the cache file on first use."""
+        if self._files is not None:
+            return
+        cache = read_json(self.cache_path, {})
+        if cache.get("version") != CACHE_VERSION:
+            cache = {}
+        self._files = cache.get("files", {})
+        self._queries = cache.get("queries", {})
+
+    def _key(self, path):
+        """Return a stable cache key for a data file."""
+        return path.relative_to(self.storage.data_dir).as_posix()
+
+def _signature(path):
+    """Return [size, mtime_ns] for a file, as stored in the cache."""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
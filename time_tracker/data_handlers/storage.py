@@ -1,38 +1,356 @@
+import bisect
+import hashlib
 import json
-from datetime import datetime
+import logging
+import os
+import re
+import shutil
+from datetime import date, datetime
 from pathlib import Path
-from .formatters import group_application_data
+from ..metrics import timed
+from .fileio import atomic_write_bytes, atomic_write_json, read_json
+from .formatters import format_applications, group_application_data, ungroup_application_data
+from .migration import migrate_flat_layout
+from .title_index import write_day_index
+from ..tracker.quantiles import KLLSketch
+from ..tracker.timeline import DayTimeline
+
+DAY_FILE_PATTERN = re.compile(r'^app_usage_(\d{4}-\d{2}-\d{2})\.json$')
+MONTH_FILE_PATTERN = re.compile(r'^app_usage_(\d{4}-\d{2})\.json$')
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+STAGING_DIRNAME = ".staging"
+
+logger = logging.getLogger(__name__)
 
 class DataStorage:
+    """Day files partitioned as <data_dir>/YYYY/MM/, indexed by manifest.json.
+    
+    The manifest maps each day to its file, size, total tracking time and
+    SHA-256, and each monthly rollup left by compaction to its file and
+    the first and last day it covers. It is rewritten atomically whenever
+    a day or rollup is written or deleted, so listing a date range never
+    has to glob or parse file names.
+    The cached manifest is never modified in place: writers edit a copy
+    and swap in a new (signature, manifest, sorted days) tuple, so readers
+    on other threads always see one consistent version.
+    """
+    
     def __init__(self, data_dir="data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.manifest_path = self.data_dir / MANIFEST_FILENAME
+        self._manifest_state = (None, None, [])
+    
+    def partition_dir(self, day):
+        """Return the YYYY/MM directory holding a day's files."""
+        return self.data_dir / f'{day.year:04d}' / f'{day.month:02d}'
+    
+    def day_path(self, day):
+        """Return the path of the JSON file holding a day's data."""
+        return self.partition_dir(day) / f'app_usage_{day.isoformat()}.json'
+    
+    def timeline_path(self, day):
+        """Return the path of the binary timeline saved next to a day file."""
+        return self.partition_dir(day) / f'app_usage_{day.isoformat()}.timeline'
     
-    def save_data(self, app_times):
-        """Save tracking data to a JSON file."""
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        filename = self.data_dir / f'app_usage_{current_date}.json'
+    def totals_path(self, day):
+        """Return the path of the resume snapshot saved next to a day file."""
+        return self.partition_dir(day) / f'app_usage_{day.isoformat()}.totals'
+    
+    def index_path(self, day):
+        """Return the path of the title index segment saved next to a day file."""
+        return self.partition_dir(day) / f'app_usage_{day.isoformat()}.index'
+    
+    def month_path(self, month):
+        """Return the path of the rollup file for the month containing a date."""
+        return self.partition_dir(month) / f'app_usage_{month.strftime("%Y-%m")}.json'
+    
+    def iter_days(self, start=None, end=None):
+        """Yield (date, path) for each saved day in the inclusive range, oldest first."""
+        _, manifest, days = self._load_manifest_state()
+        lo = bisect.bisect_left(days, start.isoformat()) if start else 0
+        hi = bisect.bisect_right(days, end.isoformat()) if end else len(days)
+        for key in days[lo:hi]:
+            yield date.fromisoformat(key), self.data_dir / manifest["days"][key]["file"]
+    
+    def iter_periods(self, start=None, end=None):
+        """Yield (key, path) for the saved days and monthly rollups in a range, oldest first.
         
-        app_groups = group_application_data(app_times)
+        The key is the ISO date of a day or "YYYY-MM" of a rollup. A rollup
+        cannot be split, so it is included whole when any day it covers is
+        in the range.
+        """
+        _, manifest, days = self._load_manifest_state()
+        lo = bisect.bisect_left(days, start.isoformat()) if start else 0
+        hi = bisect.bisect_right(days, end.isoformat()) if end else len(days)
+        periods = [(key, manifest["days"][key]["file"]) for key in days[lo:hi]]
+        for key, record in manifest["months"].items():
+            if (start is None or record["last"] >= start.isoformat()) and \
+                    (end is None or record["first"] <= end.isoformat()):
+                periods.append((key, record["file"]))
+        for key, relative_path in sorted(periods):
+            yield key, self.data_dir / relative_path
+    
+    def manifest_entry(self, day):
+        """Return the manifest record for a day, or None if it is not saved."""
+        return self._load_manifest()["days"].get(day.isoformat())
+    
+    def write_day(self, day, data):
+        """Atomically replace the saved data for a day and update the manifest."""
+        payload = json.dumps(data, indent=4).encode('utf-8')
+        path = self.day_path(day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, payload)
+        
+        manifest = self._editable_manifest()
+        record = _manifest_record(path.relative_to(self.data_dir), payload, data)
+        manifest["days"][day.isoformat()] = record
+        self._save_manifest(manifest)
+        write_day_index(self.index_path(day), data, record["sha256"])
+        return path
+    
+    def write_days(self, days):
+        """Write many days as one batch with a single manifest update.
+        
+        Every day file is first written to a staging directory; live data is
+        only touched once all of them were written, by renaming each into
+        place and then saving the manifest. A failure while staging leaves
+        the data directory as it was.
+        """
+        staging = self.data_dir / STAGING_DIRNAME
+        staged = []
+        try:
+            for day, data in sorted(days.items()):
+                payload = json.dumps(data, indent=4).encode('utf-8')
+                path = staging / self.day_path(day).relative_to(self.data_dir)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(payload)
+                staged.append((day, data, payload, path))
+            
+            manifest = self._editable_manifest()
+            for day, data, payload, staged_path in staged:
+                path = self.day_path(day)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged_path, path)
+                manifest["days"][day.isoformat()] = _manifest_record(
+                    path.relative_to(self.data_dir), payload, data)
+            self._save_manifest(manifest)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        
+        for day, data, _, _ in staged:
+            write_day_index(self.index_path(day), data,
+                            manifest["days"][day.isoformat()]["sha256"])
+        return [self.day_path(day) for day, _, _, _ in staged]
+    
+    def write_month(self, month, data):
+        """Atomically replace the rollup for the month containing a date and list it."""
+        payload = json.dumps(data, indent=4).encode('utf-8')
+        path = self.month_path(month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, payload)
         
+        manifest = self._editable_manifest()
+        manifest["months"][month.strftime("%Y-%m")] = _month_record(
+            path.relative_to(self.data_dir), payload, data)
+        self._save_manifest(manifest)
+        return path
+    
+    def load_month(self, month):
+        """Return the rollup for the month containing a date, or None if there is none."""
+        record = self._load_manifest()["months"].get(month.strftime("%Y-%m"))
+        if record is None:
+            return None
+        return read_json(self.data_dir / record["file"])
+    
+    def delete_day(self, day):
+        """Remove a day's data file, its sidecar files and its manifest entry."""
+        manifest = self._editable_manifest()
+        if manifest["days"].pop(day.isoformat(), None) is not None:
+            self._save_manifest(manifest)
+        for path in (self.day_path(day), self.timeline_path(day),
+                     self.totals_path(day), self.index_path(day)):
+            if path.exists():
+                path.unlink()
+    
+    def rebuild_manifest(self):
+        """Recreate the manifest from the day files found in the partitions."""
+        manifest = {"version": MANIFEST_VERSION, "days": {}, "months": self._scan_months()}
+        for path in sorted(self.data_dir.glob('[0-9]*/[0-9]*/app_usage_*.json')):
+            match = DAY_FILE_PATTERN.match(path.name)
+            if not match:
+                continue
+            payload = path.read_bytes()
+            manifest["days"][match.group(1)] = _manifest_record(
+                path.relative_to(self.data_dir), payload, json.loads(payload))
+        self._save_manifest(manifest)
+        return manifest
+    
+    def _scan_months(self):
+        """Return manifest entries for the monthly rollups found in the partitions."""
+        months = {}
+        for path in sorted(self.data_dir.glob('[0-9]*/[0-9]*/app_usage_*.json')):
+            match = MONTH_FILE_PATTERN.match(path.name)
+            if not match:
+                continue
+            payload = path.read_bytes()
+            data = json.loads(payload)
+            if data.get("days"):
+                months[match.group(1)] = _month_record(
+                    path.relative_to(self.data_dir), payload, data)
+        return months
+    
+    def _load_manifest(self):
+        """Return the manifest, re-reading it only if another writer changed it.
+        
+        The result is shared with other readers and must not be modified.
+        """
+        return self._load_manifest_state()[1]
+    
+    def _load_manifest_state(self):
+        """Return the current (signature, manifest, sorted day keys) tuple."""
+        try:
+            stat = self.manifest_path.stat()
+        except FileNotFoundError:
+            if any(self.data_dir.glob('app_usage_*.json')):
+                # An empty manifest would hide the flat days from every reader
+                logger.warning("%s uses the old flat layout; migrating it", self.data_dir)
+                try:
+                    migrate_flat_layout(self)
+                except FileExistsError as e:
+                    # The manifest was rebuilt; "migrate" reports the files left over
+                    logger.warning("%s", e)
+            else:
+                self.rebuild_manifest()
+            return self._manifest_state
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        state = self._manifest_state
+        if signature != state[0]:
+            manifest = read_json(self.manifest_path)
+            if "months" not in manifest:
+                # Written before rollups were listed; find the ones compaction left
+                self._save_manifest(dict(manifest, months=self._scan_months()))
+                return self._manifest_state
+            state = self._set_manifest(manifest, signature)
+        return state
+    
+    def _editable_manifest(self):
+        """Return a copy of the manifest that a writer may change and then save."""
+        manifest = self._load_manifest()
+        return dict(manifest, days=dict(manifest["days"]), months=dict(manifest["months"]))
+    
+    def _save_manifest(self, manifest):
+        """Atomically write the manifest and remember its signature."""
+        atomic_write_json(self.manifest_path, manifest, indent=1, sort_keys=True)
+        stat = self.manifest_path.stat()
+        self._set_manifest(manifest, (stat.st_mtime_ns, stat.st_size))
+    
+    def _set_manifest(self, manifest, signature):
+        """Cache a manifest along with its sorted day keys, as one reference swap."""
+        state = self._manifest_state = (signature, manifest, sorted(manifest["days"]))
+        return state
+    
+    @timed("time_tracker_save_seconds", "Latency of saving the day's totals")
+    def save_data(self, app_times, day=None, focus_sketches=None):
+        """Save tracking data to a JSON file, for today unless another day is given."""
+        if day is None:
+            day = date.fromisoformat(datetime.now().strftime('%Y-%m-%d'))
+        filename = self.write_app_times(day, app_times, focus_sketches)
+        # Logged rather than printed: stdout may carry a data stream (see "stream")
+        logger.info("Data saved to %s", filename)
+    
+    def write_app_times(self, day, app_times, focus_sketches=None):
+        """Write a day's file from flat app_times, with its resume snapshot. Returns the path.
+        
+        focus_sketches maps process names to KLLSketches of their focus
+        segment lengths and is stored in the day file when given.
+        """
         data = {
-            'date': current_date,
+            'date': day.isoformat(),
             'total_tracking_time': sum(app_times.values()),
-            'applications': {
-                app_name: {
-                    'total_time': round(data["total"], 2),
-                    'windows': {
-                        window: round(duration, 2)
-                        for window, duration in data["windows"].items()
-                    }
-                }
-                for app_name, data in app_groups.items()
-            }
+            'applications': format_applications(app_times),
         }
+        if focus_sketches:
+            data['focus_sketches'] = {
+                app_name: sketch.to_dict() for app_name, sketch in focus_sketches.items()
+            }
+        
+        filename = self.write_day(day, data)
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"\nData saved to {filename}")
+        # Unrounded, ungrouped totals so a restart can resume exactly, with
+        # the sketches so it need not parse the day file; tied to this
+        # version of the day file by its hash
+        atomic_write_json(self.totals_path(day), {
+            "sha256": self.manifest_entry(day)["sha256"],
+            "app_times": dict(app_times),
+            "focus_sketches": data.get('focus_sketches', {}),
+        }, separators=(",", ":"))
+        return filename
+    
+    def load_day(self, day):
+        """Return the saved data for a day, or None if it is not saved."""
+        entry = self.manifest_entry(day)
+        if entry is None:
+            return None
+        return read_json(self.data_dir / entry["file"])
+    
+    def load_app_times(self, day):
+        """Return the flat app_times saved for a day, or {} if there are none.
+        
+        The resume snapshot is used when it matches the current day file;
+        otherwise (e.g. the day was compacted or imported) the totals are
+        rebuilt from the day file.
+        """
+        entry = self.manifest_entry(day)
+        if entry is None:
+            return {}
+        snapshot = read_json(self.totals_path(day), {})
+        if snapshot.get("sha256") == entry["sha256"]:
+            return snapshot["app_times"]
+        return ungroup_application_data(self.load_day(day)["applications"])
+    
+    def load_resume_state(self, day):
+        """Return (app_times, focus_sketches) saved for a day with a single load.
+        
+        Both come from the resume snapshot when it matches the current day
+        file; otherwise the day file is read once for both.
+        """
+        entry = self.manifest_entry(day)
+        if entry is None:
+            return {}, {}
+        snapshot = read_json(self.totals_path(day), {})
+        if snapshot.get("sha256") == entry["sha256"] and "focus_sketches" in snapshot:
+            app_times, sketches = snapshot["app_times"], snapshot["focus_sketches"]
+        else:
+            data = self.load_day(day)
+            app_times = ungroup_application_data(data["applications"])
+            sketches = data.get("focus_sketches", {})
+        return app_times, {
+            app_name: KLLSketch.from_dict(sketch) for app_name, sketch in sketches.items()
+        }
+    
+    def load_focus_sketches(self, day):
+        """Return the focus length sketches saved for a day, by process name."""
+        data = self.load_day(day) or {}
+        return {
+            app_name: KLLSketch.from_dict(sketch)
+            for app_name, sketch in data.get("focus_sketches", {}).items()
+        }
+    
+    def save_timeline(self, timeline):
+        """Save a day timeline next to the day's JSON file."""
+        filename = self.timeline_path(timeline.day)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(filename, timeline.to_bytes())
+    
+    def load_timeline(self, day):
+        """Load the timeline saved for a day, or None if there is none."""
+        filename = self.timeline_path(day)
+        if not filename.exists():
+            return None
+        return DayTimeline.from_bytes(filename.read_bytes())
     
     def display_summary(self, app_times):
         """Display a summary of time spent on each application."""
@@ -54,4 +372,21 @@ class DataStorage:
                                             key=lambda x: x[1], 
                                             reverse=True):
                     minutes = duration / 60
-                    print(f"    - {window}: {minutes:.2f} minutes") 
\ No newline at end of file
+                    print(f"    - {window}: {minutes:.2f} minutes") 
+
+def _manifest_record(relative_path, payload, data):
+    """Build the manifest entry for a serialized day file."""
+    record = {
+        "file": relative_path.as_posix(),
+        "size": len(payload),
+        "total": data.get("total_tracking_time", 0),
+        "sha256": hashlib.sha256(payload).hexdigest(),
+    }
+    if "compaction" in data:
+        record["compaction"] = data["compaction"]
+    return record
+
+def _month_record(relative_path, payload, data):
+    """Build the manifest entry for a serialized monthly rollup."""
+    return dict(_manifest_record(relative_path, payload, data),
+                first=min(data["days"]), last=max(data["days"]))
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+from .fileio import atomic_write_bytes, atomic_write_json, read_json
+from .storage import MANIFEST_FILENAME
+
+CHUNK_SIZE = 8192
+STATE_FILENAME = ".sync_state.json"
+STATE_VERSION = 1
+
+SyncResult = namedtuple('SyncResult', ['changed', 'unchanged', 'deleted', 'chunks_sent',
+                                       'bytes_sent'])
+
+class DirectorySync:
+    """Mirror a data directory into another directory, sending only changed chunks.
+
+    A state file in the source remembers, per destination, the size,
+    modification time and chunk hashes last sent for each file, and the
+    modification time the destination copy got. Files whose size and
+    mtime did not change are skipped without being read. A destination
+    copy that is still exactly as last sent is patched: it is copied to a
+    temporary file next to it, the changed chunks are written into the
+    copy, and the copy replaces it atomically. Any other file is sent
+    whole the same way. Readers of the destination thus only ever see a
+    complete old or new file. The state is saved after every file, so an interrupted sync resumes where
+    it stopped. The manifest goes last and removed files are deleted
+    after it, so the destination's manifest never lists a day it does not
+    have.
+    """
+
+    def __init__(self, source, destination, chunk_size=CHUNK_SIZE):
+        self.source = Path(source)
+        self.destination = Path(destination)
+        self.chunk_size = chunk_size
+        self.state_path = self.source / STATE_FILENAME
+
+    def run(self):
+        """Bring the destination up to date. Returns a SyncResult."""
+        source = self.source.resolve()
+        destination = self.destination.resolve()
+        if destination == source or source in destination.parents:
+            raise ValueError("The sync destination must be outside the data directory")
+        state = read_json(self.state_path, {})
+        if state.get("version") != STATE_VERSION:
+            state = {"version": STATE_VERSION, "destinations": {}}
+        sent = state["destinations"].setdefault(str(destination), {})
+
+        changed = unchanged = chunks_sent = bytes_sent = 0
+        current = self._source_files()
+        for rel, path in current:
+            stat = path.stat()
+            known = sent.get(rel)
+            target = self.destination / rel
+            if (known is not None and known["size"] == stat.st_size
+                    and known["mtime_ns"] == stat.st_mtime_ns and target.exists()):
+                unchanged += 1
+                continue
+
+            data = path.read_bytes()
+            chunks = [hashlib.sha256(data[offset:offset + self.chunk_size]).hexdigest()
+                      for offset in range(0, len(data), self.chunk_size)]
+            written = self._send(target, data, chunks, known)
+            if written is not None:
+                changed += 1
+                chunks_sent += len(written)
+                bytes_sent += sum(min(self.chunk_size, len(data) - index * self.chunk_size)
+                                  for index in written)
+            else:
+                unchanged += 1
+            sent[rel] = {"size": len(data), "mtime_ns": stat.st_mtime_ns, "chunks": chunks,
+                         "destination_mtime_ns": target.stat().st_mtime_ns}
+            atomic_write_json(self.state_path, state)
+
+        deleted = 0
+        present = {rel for rel, _ in current}
+        for rel in [rel for rel in sent if rel not in present]:
+            try:
+                (self.destination / rel).unlink()
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            del sent[rel]
+            atomic_write_json(self.state_path, state)
+
+        return SyncResult(changed, unchanged, deleted, chunks_sent, bytes_sent)
+
+    def _source_files(self):
+        """Return (relative posix path, path) for every file to mirror, manifest last.
+
+        Hidden files and directories (staging areas, temporary files, this
+        sync's own state) are left out.
+        """
+        files = []
+        for path in sorted(self.source.rglob("*")):
+            rel = path.relative_to(self.source)
+            if path.is_file() and not any(part.startswith(".") for part in rel.parts):
+                files.append((rel.as_posix(), path))
+        files.sort(key=lambda item: item[0] == MANIFEST_FILENAME)
+        return files
+
+    def _send(self, target, data, chunks, known):
+        """Update one destination file.
+
+        Returns the indexes of the chunks written, or None if the file's
+        content did not change.
+        """
+        # Patching needs a destination copy that nobody touched since it was sent
+        if known is not None:
+            try:
+                stat = target.stat()
+            except FileNotFoundError:
+                known = None
+            else:
+                if (stat.st_size != known["size"]
+                        or stat.st_mtime_ns != known.get("destination_mtime_ns")):
+                    known = None
+        if known is None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(target, data)
+            return list(range(len(chunks)))
+
+        old = known["chunks"]
+        changed = [index for index, digest in enumerate(chunks)
+                   if index >= len(old) or old[index] != digest]
+        if not changed and known["size"] == len(data):
+            return None
+
+        patches = [(index * self.chunk_size,
+                    data[index * self.chunk_size:(index + 1) * self.chunk_size])
+                   for index in changed]
+        _patch_file(target, len(data), patches)
+        return changed
+
+def _patch_file(path, length, patches):
+    """Atomically replace a file with a copy of it patched at the given (offset, bytes)."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'r+b') as f:
+            with open(path, 'rb') as original:
+                shutil.copyfileobj(original, f)
+            for offset, piece in patches:
+                f.seek(offset)
+                f.write(piece)
+            f.truncate(length)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
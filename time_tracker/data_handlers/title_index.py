@@ -0,0 +1,250 @@
+import bisect
+import hashlib
+import mmap
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import namedtuple
+from .fileio import atomic_write_bytes
+
+INDEX_VERSION = 2
+
+# Words, keeping joined identifiers such as "PROJ-42" or "main.py" whole
+TOKEN_PATTERN = re.compile(r"\w+(?:[-.]\w+)*")
+WORD_PATTERN = re.compile(r"\w+")
+
+# Titles per compressed block
+BLOCK_TITLES = 64
+
+# Header: magic, format version, day file sha256, app count, token count,
+# title count, length of the NUL-separated app names
+_HEADER = struct.Struct('<4sH32sIIII')
+_MAGIC = b'TIX2'
+_U32 = struct.Struct('<I')
+
+TitleHit = namedtuple('TitleHit', ['day', 'app', 'title', 'seconds'])
+
+def tokenize(text):
+    """Return the set of index tokens in a title or query.
+
+    Joined identifiers are indexed both whole and by their parts, so
+    "PROJ-42" is found by "proj-42", "proj" or "42".
+    """
+    tokens = set()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.add(token)
+        tokens.update(WORD_PATTERN.findall(token))
+    return tokens
+
+def token_hash(token):
+    """Return the 32-bit key a token is filed under."""
+    return _U32.unpack(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest())[0]
+
+def build_day_index(data, sha256):
+    """Build the binary index segment for one day's data.
+
+    After the header come the app names and the first title id of each
+    app. Then the token table: sorted token hashes and, for each, where
+    its postings (title ids, 16-bit when the day has few enough titles)
+    start. Last come the titles with their seconds, zlib-compressed in
+    blocks of BLOCK_TITLES with a table of block offsets. A token is found
+    by binary search in the hash table, and only the blocks holding its
+    titles are decompressed.
+    """
+    apps = []
+    app_starts = array('I')
+    titles = []
+    seconds = array('d')
+    postings = {}
+    for app_name, app_data in data["applications"].items():
+        apps.append(app_name)
+        app_starts.append(len(titles))
+        for title, duration in app_data.get("windows", {}).items():
+            for token in tokenize(title):
+                postings.setdefault(token_hash(token), []).append(len(titles))
+            titles.append(title.encode('utf-8'))
+            seconds.append(duration)
+
+    hashes = array('I', sorted(postings))
+    posting_offsets = array('I', [0])
+    ids = array(_id_typecode(len(titles)))
+    for key in hashes:
+        ids.extend(postings[key])
+        posting_offsets.append(len(ids))
+
+    blocks = []
+    block_offsets = array('I', [0])
+    for first in range(0, len(titles), BLOCK_TITLES):
+        block_titles = titles[first:first + BLOCK_TITLES]
+        block = zlib.compress(b''.join([
+            _little_endian(seconds[first:first + BLOCK_TITLES]),
+            _little_endian(array('I', map(len, block_titles))),
+            *block_titles,
+        ]))
+        blocks.append(block)
+        block_offsets.append(block_offsets[-1] + len(block))
+
+    names = '\0'.join(apps).encode('utf-8')
+    return b''.join([
+        _HEADER.pack(_MAGIC, INDEX_VERSION, bytes.fromhex(sha256), len(apps), len(hashes),
+                     len(titles), len(names)),
+        names,
+        *(_little_endian(values) for values in
+          (app_starts, hashes, posting_offsets, block_offsets, ids)),
+        *blocks,
+    ])
+
+def write_day_index(path, data, sha256):
+    """Write a day's index segment next to its day file."""
+    atomic_write_bytes(path, build_day_index(data, sha256))
+
+class IndexSegment:
+    """Read access to one day's index segment without decoding all of it."""
+
+    def __init__(self, buf):
+        magic, version, digest, app_count, tokens, titles, names_len = \
+            _HEADER.unpack_from(buf)
+        if magic != _MAGIC or version != INDEX_VERSION:
+            raise ValueError("Not a title index segment")
+        self.buf = buf
+        self.sha256 = digest.hex()
+        self.token_count = tokens
+        self.title_count = titles
+        self._id_typecode = _id_typecode(titles)
+        self._id_size = array(self._id_typecode).itemsize
+
+        pos = _HEADER.size
+        self.apps = bytes(buf[pos:pos + names_len]).decode('utf-8').split('\0')[:app_count]
+        pos += names_len
+        self._app_starts = self._read_array('I', pos, app_count)
+        self._hashes = pos + 4 * app_count
+        self._posting_offsets = self._hashes + 4 * tokens
+        self._block_offsets = self._posting_offsets + 4 * (tokens + 1)
+        block_count = -(-titles // BLOCK_TITLES)
+        self._ids = self._block_offsets + 4 * (block_count + 1)
+        (total_ids,) = _U32.unpack_from(buf, self._posting_offsets + 4 * tokens)
+        self._blocks = self._ids + self._id_size * total_ids
+        self._block_cache = {}
+
+    def postings(self, token):
+        """Return the ids of the titles containing a token, or None if none does.
+
+        A hash collision can add unrelated ids; callers check the titles.
+        """
+        key = token_hash(token)
+        low, high = 0, self.token_count
+        while low < high:
+            middle = (low + high) // 2
+            if _U32.unpack_from(self.buf, self._hashes + 4 * middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.token_count or _U32.unpack_from(self.buf, self._hashes + 4 * low)[0] != key:
+            return None
+        start, end = struct.unpack_from('<II', self.buf, self._posting_offsets + 4 * low)
+        return self._read_array(self._id_typecode, self._ids + self._id_size * start, end - start)
+
+    def title(self, title_id):
+        """Return (app, title, seconds) for a title id."""
+        block_index, slot = divmod(title_id, BLOCK_TITLES)
+        seconds, titles = self._block(block_index)
+        app_id = bisect.bisect_right(self._app_starts, title_id) - 1
+        return self.apps[app_id], titles[slot], seconds[slot]
+
+    def _block(self, block_index):
+        """Return (seconds, titles) of one block, decompressing it once."""
+        block = self._block_cache.get(block_index)
+        if block is None:
+            start, end = struct.unpack_from('<II', self.buf, self._block_offsets + 4 * block_index)
+            raw = zlib.decompress(self.buf[self._blocks + start:self._blocks + end])
+            count = min(BLOCK_TITLES, self.title_count - block_index * BLOCK_TITLES)
+            seconds = self._read_array('d', 0, count, raw)
+            lengths = self._read_array('I', 8 * count, count, raw)
+            titles = []
+            pos = 12 * count
+            for length in lengths:
+                titles.append(raw[pos:pos + length].decode('utf-8'))
+                pos += length
+            block = self._block_cache[block_index] = (seconds, titles)
+        return block
+
+    def _read_array(self, typecode, offset, count, buf=None):
+        """Read `count` little-endian values starting at a byte offset."""
+        values = array(typecode)
+        values.frombytes((self.buf if buf is None else buf)[offset:offset + values.itemsize * count])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+class TitleIndex:
+    """Token search over the window titles of every saved day.
+
+    Each day has its own binary index segment, rewritten whenever the day
+    is written. A segment is only trusted while its recorded hash matches
+    the day's manifest entry; otherwise it is rebuilt on first use.
+    Segments are memory-mapped and a search reads only the postings of the
+    query's rarest token, then checks those titles for the other tokens.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def search(self, query, start=None, end=None, app=None):
+        """Yield a TitleHit for each title containing every token of the query."""
+        tokens = tokenize(query)
+        if not tokens:
+            return
+        for day, _ in self.storage.iter_days(start, end):
+            entry = self.storage.manifest_entry(day)
+            if entry is None:
+                continue
+            path = self.storage.index_path(day)
+            hits = self._search_segment(path, entry["sha256"], day, tokens, app)
+            if hits is None:
+                write_day_index(path, self.storage.load_day(day), entry["sha256"])
+                hits = self._search_segment(path, entry["sha256"], day, tokens, app)
+            yield from hits
+
+    def _search_segment(self, path, sha256, day, tokens, app):
+        """Return the hits in one segment, or None if it is missing or stale."""
+        try:
+            with open(path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                try:
+                    segment = IndexSegment(buf)
+                except (ValueError, struct.error):
+                    return None
+                if segment.sha256 != sha256:
+                    return None
+
+                candidates = None
+                for token in tokens:
+                    ids = segment.postings(token)
+                    if ids is None:
+                        return []
+                    if candidates is None or len(ids) < len(candidates):
+                        candidates = ids
+
+                # The title itself settles the other tokens and any hash collision
+                hits = []
+                for title_id in candidates:
+                    app_name, title, seconds = segment.title(title_id)
+                    if (app is None or app_name == app) and tokens <= tokenize(title):
+                        hits.append(TitleHit(day, app_name, title, seconds))
+                return hits
+        except (FileNotFoundError, ValueError):
+            # ValueError: an empty file cannot be mapped
+            return None
+
+def _id_typecode(title_count):
+    """Return the array typecode wide enough for a day's title ids."""
+    return 'H' if title_count <= 0x10000 else 'I'
+
+def _little_endian(values):
+    """Return the raw bytes of an array in little-endian order."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
@@ -0,0 +1,173 @@
+import logging
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from .protocol import encode_frame, recv_frame
+
+logger = logging.getLogger(__name__)
+
+class IngestClient:
+    """Ship segment events to an IngestServer from a background thread.
+
+    send() only appends to a bounded buffer, so the tracker never waits on
+    the network. The thread numbers each batch, keeps it until the server
+    acknowledges it, and after a reconnect resends every batch the
+    server's welcome does not list as committed. When the buffer is full
+    the oldest unsent events are dropped and counted, as are batches the
+    server rejects as malformed.
+    """
+
+    def __init__(self, host, port, client_id, batch_size=500, max_buffered=100000,
+                 flush_interval=1.0, retry_delay=1.0, timeout=10.0):
+        self.address = (host, port)
+        self.client_id = client_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.dropped = 0
+        self.rejected = 0
+        self._events = deque()
+        self._max_buffered = max_buffered
+        self._unacked = OrderedDict()
+        self._next_seq = None
+        self._sock = None
+        self._changed = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ingest-client", daemon=True)
+        self._thread.start()
+
+    def send(self, app, start, end):
+        """Queue one finished segment."""
+        with self._changed:
+            if len(self._events) >= self._max_buffered:
+                self._events.popleft()
+                self.dropped += 1
+            self._events.append({"app": app, "start": start, "end": end})
+            if len(self._events) >= self.batch_size:
+                self._changed.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every queued event was acknowledged. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            self._changed.notify_all()
+            while self._events or self._unacked:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def wake(self):
+        """Have the thread send what is queued now, without waiting for it."""
+        with self._changed:
+            self._changed.notify_all()
+
+    def close(self, timeout=5.0):
+        """Flush what can be flushed in time, then stop the thread.
+
+        Waits at most about twice the timeout; a thread still stuck
+        connecting is left behind as a daemon.
+        """
+        self.flush(timeout)
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        """Send batches until closed, reconnecting after any failure."""
+        while not self._closed:
+            try:
+                if self._sock is None:
+                    self._connect()
+                    # Resend what the server did not confirm before the reconnect
+                    for seq, events in list(self._unacked.items()):
+                        self._send_batch(seq, events)
+                batch = self._next_batch()
+                if batch is not None:
+                    self._send_batch(*batch)
+            except (OSError, ValueError) as e:
+                logger.warning("Ingest connection to %s:%s failed: %s", *self.address, e)
+                self._disconnect()
+                with self._changed:
+                    if not self._closed:
+                        self._changed.wait(self.retry_delay)
+        self._disconnect()
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        sock.sendall(encode_frame({"type": "hello", "client": self.client_id}))
+        welcome = recv_frame(sock)
+        if welcome is None or welcome.get("type") != "welcome":
+            sock.close()
+            raise ConnectionError("Server did not welcome the client")
+
+        acked = welcome["ack"]
+        with self._changed:
+            for seq in [seq for seq in self._unacked if seq <= acked]:
+                del self._unacked[seq]
+            self._changed.notify_all()
+        last = next(reversed(self._unacked)) if self._unacked else acked
+        self._next_seq = max(self._next_seq or 0, last + 1, acked + 1)
+        self._sock = sock
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _next_batch(self):
+        """Number up to batch_size events as the next batch, waiting briefly for it to fill.
+
+        Returns (seq, events), or None if nothing is queued.
+        """
+        with self._changed:
+            if len(self._events) < self.batch_size and not self._closed:
+                self._changed.wait(self.flush_interval)
+            if not self._events:
+                return None
+            count = min(len(self._events), self.batch_size)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._unacked[seq] = [self._events.popleft() for _ in range(count)]
+            return seq, self._unacked[seq]
+
+    def _send_batch(self, seq, events):
+        """Send one batch and wait for its acknowledgement."""
+        self._sock.sendall(encode_frame({"type": "batch", "seq": seq, "events": events}))
+        reply = recv_frame(self._sock)
+        if reply is None or reply.get("type") not in ("ack", "reject") or reply.get("seq") != seq:
+            raise ConnectionError(f"Batch {seq} was not acknowledged")
+        if reply["type"] == "reject":
+            # Resending would only be rejected again
+            logger.warning("Server rejected batch %d: %s", seq, reply.get("error"))
+        with self._changed:
+            if reply["type"] == "reject":
+                self.rejected += len(events)
+            self._unacked.pop(seq, None)
+            self._changed.notify_all()
+
+class IngestSink:
+    """Pipeline sink that forwards segments to a remote IngestServer.
+
+    flush() only wakes the client thread, so saves never wait on the
+    network; close() waits up to close_timeout for the acknowledgements.
+    """
+
+    def __init__(self, host, port, client_id=None, batch_size=500, close_timeout=2.0):
+        client_id = client_id or re.sub(r'[^A-Za-z0-9_.-]', '_', socket.gethostname())[:64]
+        self.client = IngestClient(host, port, client_id, batch_size=batch_size)
+        self.close_timeout = close_timeout
+
+    def write(self, event):
+        self.client.send(event.app, event.start, event.end)
+
+    def flush(self):
+        self.client.wake()
+
+    def close(self):
+        self.client.close(timeout=self.close_timeout)
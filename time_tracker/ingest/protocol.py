@@ -0,0 +1,96 @@
+import json
+import math
+import struct
+from datetime import date
+
+# Frames are a 4-byte big-endian length followed by a UTF-8 JSON object
+_LENGTH = struct.Struct('>I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+class ProtocolError(ValueError):
+    """Raised when a peer sends a malformed or oversized frame."""
+
+def encode_frame(message):
+    """Return the wire bytes for a message."""
+    payload = json.dumps(message, separators=(",", ":")).encode('utf-8')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    return _LENGTH.pack(len(payload)) + payload
+
+def decode_payload(payload):
+    """Decode a frame payload into a message dict."""
+    try:
+        message = json.loads(payload)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid frame: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Frame is not a JSON object")
+    return message
+
+def validate_events(events):
+    """Check a batch's events before they are applied.
+
+    Each event needs a non-empty app name and numeric start and end
+    timestamps with start <= end that fall on a representable day. Raises
+    ProtocolError naming the first bad event.
+    """
+    if not isinstance(events, list):
+        raise ProtocolError("Batch events must be a list")
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            raise ProtocolError(f"Event {index} is not an object")
+        app = event.get("app")
+        start = event.get("start")
+        end = event.get("end")
+        if not isinstance(app, str) or not app:
+            raise ProtocolError(f"Event {index} has no app name")
+        for value in (start, end):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or \
+                    not math.isfinite(value):
+                raise ProtocolError(f"Event {index} has a non-numeric timestamp")
+        if start > end:
+            raise ProtocolError(f"Event {index} ends before it starts")
+        try:
+            date.fromtimestamp(start)
+            date.fromtimestamp(end)
+        except (OverflowError, OSError, ValueError):
+            raise ProtocolError(f"Event {index} has a timestamp out of range") from None
+    return events
+
+async def read_frame(reader):
+    """Read one message from an asyncio stream, or return None at a clean EOF."""
+    header = await reader.read(_LENGTH.size)
+    if not header:
+        return None
+    if len(header) < _LENGTH.size:
+        header += await reader.readexactly(_LENGTH.size - len(header))
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+    return decode_payload(await reader.readexactly(length))
+
+def recv_frame(sock):
+    """Read one message from a blocking socket, or return None at a clean EOF."""
+    header = _recv_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+    payload = _recv_exactly(sock, length)
+    if payload is None:
+        raise ConnectionError("Connection closed mid-frame")
+    return decode_payload(payload)
+
+def _recv_exactly(sock, size):
+    """Read exactly size bytes, or return None if the peer closed first."""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            if chunks:
+                raise ConnectionError("Connection closed mid-frame")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+from pathlib import Path
+from ..data_handlers.fileio import atomic_write_json, read_json
+from ..data_handlers.storage import DataStorage
+from ..tracker.quantiles import KLLSketch
+from .protocol import ProtocolError, encode_frame, read_frame, validate_events
+
+CLIENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+STATE_FILENAME = "ingest_state.json"
+
+logger = logging.getLogger(__name__)
+
+# One received batch waiting for the committer
+_Batch = namedtuple('_Batch', ['client', 'seq', 'events', 'error', 'done'])
+
+class IngestServer:
+    """Collect segment events from remote trackers into per-client storage.
+
+    Clients say hello with their id and learn the last sequence number
+    committed for them, then send numbered batches of {app, start, end}
+    events. A batch is acknowledged only after it was written, and a batch
+    whose number was already committed is acknowledged without being
+    applied again, so clients can resend after any failure. Received
+    batches wait in a bounded queue; when it is full, connections stop
+    being read, which pushes back on clients through TCP. A single
+    committer drains everything queued and writes it as one group.
+
+    A batch with a malformed event is answered with a reject instead of an
+    ack and none of its events are applied; its number still counts as
+    committed so the client moves on. Running totals are kept in memory
+    only for today and yesterday; a late event for an older day reloads
+    that day from disk.
+    """
+
+    def __init__(self, data_dir, host="127.0.0.1", port=0, queue_size=1024):
+        self.data_dir = Path(data_dir)
+        self.clients_dir = self.data_dir / "clients"
+        self.clients_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.data_dir / STATE_FILENAME
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.acked = read_json(self.state_path, {}).get("acked", {})
+        self.commits = 0
+        self._received = dict(self.acked)
+        self._pending = {}
+        self._failed = {}
+        self._connections = {}
+        self._storages = {}
+        self._days = {}
+        self._sketches = {}
+        self._queue = None
+        self._server = None
+        self._committer = None
+
+    async def start(self):
+        """Start listening and committing. Returns the bound port."""
+        self._queue = asyncio.Queue(self.queue_size)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._committer = asyncio.ensure_future(self._commit_loop())
+        return self.port
+
+    async def serve_forever(self):
+        """Run until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop accepting connections and commit what was already received."""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        await self._queue.join()
+        self._committer.cancel()
+
+    async def _handle(self, reader, writer):
+        """Serve one client connection."""
+        self._connections[writer] = asyncio.current_task()
+        acks = asyncio.Queue()
+        ack_writer = asyncio.ensure_future(self._write_acks(writer, acks))
+        try:
+            hello = await read_frame(reader)
+            client = hello.get("client") if hello else None
+            if hello is None or hello.get("type") != "hello" or \
+                    not isinstance(client, str) or not CLIENT_ID_PATTERN.match(client):
+                raise ProtocolError("Expected a hello with a valid client id")
+            writer.write(encode_frame({"type": "welcome", "ack": self.acked.get(client, 0)}))
+
+            while True:
+                message = await read_frame(reader)
+                if message is None:
+                    break
+                if message.get("type") != "batch":
+                    raise ProtocolError(f"Unexpected message type {message.get('type')!r}")
+                seq = message["seq"]
+                if isinstance(seq, bool) or not isinstance(seq, int) or seq < 1:
+                    raise ProtocolError(f"Invalid batch number {seq!r}")
+                await acks.put((seq, await self._submit(client, seq, message["events"])))
+        except (ProtocolError, KeyError, TypeError) as e:
+            logger.warning("Dropping ingest connection: %s", e)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            await acks.put(None)
+            await ack_writer
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def _submit(self, client, seq, events):
+        """Queue a batch unless it is a resend. Returns a future done once it is committed."""
+        loop = asyncio.get_running_loop()
+        if seq <= self.acked.get(client, 0):
+            done = loop.create_future()
+            done.set_result(None)
+            return done
+        if seq <= self._received.get(client, 0):
+            # Resent while the first copy is still waiting to be committed
+            return self._pending[(client, seq)]
+
+        error = None
+        try:
+            validate_events(events)
+        except ProtocolError as e:
+            logger.warning("Rejecting batch %d from %s: %s", seq, client, e)
+            events, error = [], str(e)
+
+        done = loop.create_future()
+        self._received[client] = seq
+        self._pending[(client, seq)] = done
+        await self._queue.put(_Batch(client, seq, events, error, done))
+        return done
+
+    async def _write_acks(self, writer, acks):
+        """Send acknowledgements (or rejects) in order as their batches are committed."""
+        while True:
+            item = await acks.get()
+            if item is None:
+                return
+            seq, done = item
+            try:
+                error = await asyncio.shield(done)
+                if error is None:
+                    writer.write(encode_frame({"type": "ack", "seq": seq}))
+                else:
+                    writer.write(encode_frame({"type": "reject", "seq": seq, "error": error}))
+                await writer.drain()
+            except Exception:
+                # Hang up; the client resends whatever was not acknowledged
+                writer.close()
+                return
+
+    async def _commit_loop(self):
+        """Commit everything queued as one group, repeatedly."""
+        loop = asyncio.get_running_loop()
+        while True:
+            queued = [await self._queue.get()]
+            while not self._queue.empty():
+                queued.append(self._queue.get_nowait())
+
+            # A client whose earlier batch failed must resend from there
+            # first, or acknowledging later batches would skip it
+            group, rejected = [], []
+            blocked = dict(self._failed)
+            for batch in queued:
+                if batch.seq > blocked.get(batch.client, batch.seq):
+                    rejected.append(batch)
+                else:
+                    blocked.pop(batch.client, None)
+                    group.append(batch)
+
+            try:
+                if group:
+                    await loop.run_in_executor(None, self._commit, group)
+            except Exception:
+                logger.exception("Group commit failed")
+                rejected.extend(group)
+                group = []
+            else:
+                for batch in group:
+                    self._failed.pop(batch.client, None)
+                    self._pending.pop((batch.client, batch.seq), None)
+                    batch.done.set_result(batch.error)
+
+            for batch in rejected:
+                self._failed[batch.client] = min(self._failed.get(batch.client, batch.seq),
+                                                 batch.seq)
+                self._received[batch.client] = self.acked.get(batch.client, 0)
+                self._pending.pop((batch.client, batch.seq), None)
+                batch.done.set_exception(ConnectionAbortedError("Batch was not committed"))
+            for _ in queued:
+                self._queue.task_done()
+
+    def _commit(self, group):
+        """Apply a group of batches and write every day they touched. Runs in a thread."""
+        # Work on copies so a failed commit leaves the running totals as they were
+        updated = {}
+        updated_sketches = {}
+        copied = set()
+        acked = dict(self.acked)
+        for batch in group:
+            for event in batch.events:
+                key = (batch.client, date.fromtimestamp(event["start"]))
+                app_times = updated.get(key)
+                if app_times is None:
+                    app_times = updated[key] = dict(self._day_totals(*key))
+                    updated_sketches[key] = dict(self._day_sketches(*key))
+                app = event["app"]
+                duration = event["end"] - event["start"]
+                app_times[app] = app_times.get(app, 0) + duration
+
+                sketches = updated_sketches[key]
+                process_name = app.split(" (")[0]
+                if (key, process_name) not in copied:
+                    sketch = sketches.get(process_name)
+                    sketches[process_name] = sketch.copy() if sketch else KLLSketch()
+                    copied.add((key, process_name))
+                sketches[process_name].update(duration)
+            acked[batch.client] = max(acked.get(batch.client, 0), batch.seq)
+
+        for (client, day), app_times in updated.items():
+            self._storage(client).write_app_times(day, app_times,
+                                                  updated_sketches[(client, day)])
+        atomic_write_json(self.state_path, {"acked": acked})
+        self._days.update(updated)
+        self._sketches.update(updated_sketches)
+        self.acked = acked
+        self.commits += 1
+        self._evict()
+
+    def _evict(self, today=None):
+        """Forget the running totals of days before yesterday; they are saved."""
+        oldest = (today or date.today()) - timedelta(days=1)
+        for cache in (self._days, self._sketches):
+            for key in [key for key in cache if key[1] < oldest]:
+                del cache[key]
+
+    def _day_totals(self, client, day):
+        """Return the running totals for a client's day, loading any saved ones first."""
+        key = (client, day)
+        if key not in self._days:
+            self._days[key] = self._storage(client).load_app_times(day)
+        return self._days[key]
+
+    def _day_sketches(self, client, day):
+        """Return the focus sketches for a client's day, loading any saved ones first."""
+        key = (client, day)
+        if key not in self._sketches:
+            self._sketches[key] = self._storage(client).load_focus_sketches(day)
+        return self._sketches[key]
+
+    def _storage(self, client):
+        storage = self._storages.get(client)
+        if storage is None:
+            storage = self._storages[client] = DataStorage(self.clients_dir / client)
+        return storage
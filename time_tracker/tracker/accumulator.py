@@ -0,0 +1,131 @@
+from collections.abc import Mapping, MutableMapping
+
+DEFAULT_SHARDS = 32
+
+# Shards are never mutated once published, so every empty slot can share one dict
+_EMPTY = {}
+
+class TimesSnapshot(Mapping):
+    """Per-app totals as they were at one epoch. Never changes once created."""
+
+    __slots__ = ('epoch', '_shards', '_len')
+
+    def __init__(self, epoch, shards, length):
+        self.epoch = epoch
+        self._shards = shards
+        self._len = length
+
+    def __getitem__(self, app):
+        return self._shards[hash(app) % len(self._shards)][app]
+
+    def __iter__(self):
+        for shard in self._shards:
+            yield from shard
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return f"TimesSnapshot(epoch={self.epoch}, {dict(self)!r})"
+
+    def diff(self, previous):
+        """Return (changed totals, removed apps) since an earlier snapshot.
+
+        Shards shared with the earlier snapshot are skipped without being
+        looked at, so the cost follows the number of updates in between
+        rather than the number of apps. previous=None means everything
+        changed.
+        """
+        if previous is None or len(previous._shards) != len(self._shards):
+            return dict(self), []
+        changed = {}
+        removed = []
+        for shard, old in zip(self._shards, previous._shards):
+            if shard is old:
+                continue
+            for app, seconds in shard.items():
+                if old.get(app) != seconds:
+                    changed[app] = seconds
+            removed.extend(app for app in old if app not in shard)
+        return changed, removed
+
+class TimeAccumulator(MutableMapping):
+    """Per-app totals with one writer and readers that never wait.
+
+    Keys are spread over a fixed number of shard dicts. An update copies
+    only the shard holding its key, builds a new snapshot that shares all
+    other shards with the previous one, and publishes it by swapping a
+    single reference. Readers take snapshot() and get a consistent view in
+    O(1), however long they keep it. Only the owning thread may write.
+    """
+
+    def __init__(self, initial=None, shards=DEFAULT_SHARDS):
+        self._snapshot = TimesSnapshot(0, (_EMPTY,) * shards, 0)
+        if initial:
+            self._commit(dict(initial))
+
+    def snapshot(self):
+        """Return the current immutable TimesSnapshot."""
+        return self._snapshot
+
+    @property
+    def epoch(self):
+        """Number of updates published so far."""
+        return self._snapshot.epoch
+
+    def __getitem__(self, app):
+        return self._snapshot[app]
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __contains__(self, app):
+        return app in self._snapshot
+
+    def __setitem__(self, app, seconds):
+        self._commit({app: seconds})
+
+    def __delitem__(self, app):
+        if app not in self._snapshot:
+            raise KeyError(app)
+        self._commit({}, (app,))
+
+    def __repr__(self):
+        return f"TimeAccumulator({dict(self._snapshot)!r})"
+
+    def add(self, app, seconds):
+        """Add seconds to an app's total."""
+        self._commit({app: self._snapshot.get(app, 0) + seconds})
+
+    def fold(self, app, into):
+        """Move an app's total onto another key in a single update."""
+        current = self._snapshot
+        seconds = current.get(app, 0)
+        self._commit({into: current.get(into, 0) + seconds}, (app,) if app in current else ())
+
+    def _commit(self, updates, removals=()):
+        """Publish a snapshot with updates applied and removals dropped."""
+        current = self._snapshot
+        shards = list(current._shards)
+        length = current._len
+        copied = set()
+
+        def writable(key):
+            index = hash(key) % len(shards)
+            if index not in copied:
+                shards[index] = dict(shards[index])
+                copied.add(index)
+            return shards[index]
+
+        for app in removals:
+            del writable(app)[app]
+            length -= 1
+        for app, seconds in updates.items():
+            shard = writable(app)
+            if app not in shard:
+                length += 1
+            shard[app] = seconds
+        self._snapshot = TimesSnapshot(current.epoch + 1, tuple(shards), length)
@@ -0,0 +1,48 @@
+import logging
+import logging.handlers
+import queue
+from collections import deque, namedtuple
+
+SwitchEvent = namedtuple('SwitchEvent', ['timestamp', 'from_app', 'to_app', 'duration'])
+
+def configure_logging(level=logging.INFO):
+    """Route root logging through a queue so callers never block on handler I/O.
+
+    Returns the started QueueListener; call stop() on it at shutdown to
+    flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for existing in root.handlers[:]:
+        if isinstance(existing, logging.handlers.QueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener.start()
+    return listener
+
+class RecentActivity:
+    """Fixed-size ring buffer of the most recent application switches."""
+
+    def __init__(self, maxlen=200):
+        self._events = deque(maxlen=maxlen)
+        self.total = 0  # Switches seen so far; lets readers skip redraws
+
+    def __len__(self):
+        return len(self._events)
+
+    def append(self, event):
+        """Record a switch, dropping the oldest one once full."""
+        self._events.append(event)
+        self.total += 1
+
+    def recent(self, n=None):
+        """Return up to n most recent switches, newest first."""
+        events = list(self._events)
+        events.reverse()
+        return events[:n]
@@ -1,67 +1,236 @@
 import time
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import logging
 from ..data_handlers.storage import DataStorage
+from ..metrics import REGISTRY, timed
+from .accumulator import TimeAccumulator
+from .activity_log import RecentActivity, SwitchEvent
+from .heavy_hitters import SpaceSaving, canonicalize_app
+from .pipeline import DEFAULT_PIPELINE_CONFIG, SegmentEvent, build_pipeline
+from .quantiles import KLLSketch
+from .segments import SegmentStore
+from .timeline import DayTimeline
 from .utils import get_active_window_info
 
+SWITCHES = REGISTRY.counter("time_tracker_switches_total", "Recorded application switches")
+
 class ApplicationTracker:
-    def __init__(self, storage_handler=None):
+    def __init__(self, storage_handler=None, title_capacity=None,
+                 clock=None, window_source=None, pipeline_config=None, resume=False):
         self.current_app = None
         self.start_time = None
-        self.app_times = {}
+        # Written only by the tracking thread; readers use app_times.snapshot()
+        self.app_times = TimeAccumulator()
+        self.timelines = {}
+        # Process name -> KLLSketch of focus segment lengths
+        self.focus_sketches = {}
+        # Today's segments; replaced at the first segment of each new day
+        self.segments = SegmentStore()
+        self.title_capacity = title_capacity
         self.storage = storage_handler or DataStorage()
         
-        # Initialize logging
-        logging.basicConfig(level=logging.INFO)
+        # Injectable time and probe; None means time.time / get_active_window_info
+        self.clock = clock
+        self.window_source = window_source
+        
+        # Bounded mode: only the heaviest window titles keep their own entry
+        self.title_sketch = SpaceSaving(title_capacity) if title_capacity else None
+        self.recent_switches = RecentActivity()
+        
+        # Set while the window source reports its answers as stale (see WatchdogProbe)
+        self.probe_stale = False
+        
+        # Optional SnapshotPublisher sharing live totals with other processes,
+        # and the totals it was last given
+        self.publisher = None
+        self._published_totals = None
+        
+        # Finished segments go through the pipeline; its tracker sink
+        # feeds them back into _record_segment
+        self.pipeline = build_pipeline(pipeline_config or DEFAULT_PIPELINE_CONFIG, self)
+        
+        # Handlers are configured by the entry point (see activity_log)
         self.logger = logging.getLogger(__name__)
+        
+        if resume:
+            self.resume_today()
     
     def track(self):
         """Start tracking application usage."""
         print("Starting application tracking... Press Ctrl+C to stop.")
         print("Tracking active windows... (Press Ctrl+C to stop)")
-        self.start_time = time.time()
+        self.start_time = self._now()
         
         try:
             while True:
-                active_app = get_active_window_info()
-                current_time = time.time()
-                
-                self._handle_app_switch(active_app, current_time)
+                self.poll()
                 time.sleep(0.5)  # Check every half second
                 
         except KeyboardInterrupt:
             self._handle_final_app()
-            self.storage.save_data(self.app_times)
-            self.storage.display_summary(self.app_times)
+            self.save()
+            self.close()
+            self.storage.display_summary(self.app_times.snapshot())
+    
+    def events(self, interval=0.5, heartbeat_every=30.0, checkpoint_every=300.0):
+        """Track like track(), yielding each switch, heartbeat and checkpoint as a dict.
+        
+        Polling only advances when the consumer asks for the next event, so
+        a slow reader holds the tracker back instead of letting events pile
+        up. Time keeps being accounted from timestamps meanwhile. A "stale"
+        event marks when the window probe stopped answering and a "fresh"
+        one when it recovered. Every checkpoint saves the data; closing the
+        generator accounts the current app and saves once more.
+        """
+        self.start_time = self._now()
+        last_heartbeat = last_checkpoint = self.start_time
+        was_stale = False
+        try:
+            while True:
+                switch = self.poll()
+                now = self._now()
+                if self.probe_stale != was_stale:
+                    was_stale = self.probe_stale
+                    yield {"type": "stale" if was_stale else "fresh", "time": now,
+                           "app": self.current_app}
+                if switch is not None:
+                    yield {"type": "switch", "time": switch.timestamp, "from": switch.from_app,
+                           "to": switch.to_app, "duration": switch.duration}
+                if now - last_heartbeat >= heartbeat_every:
+                    last_heartbeat = now
+                    yield {"type": "heartbeat", "time": now, "app": self.current_app,
+                           "since": self.start_time}
+                if now - last_checkpoint >= checkpoint_every:
+                    last_checkpoint = now
+                    self.save()
+                    yield {"type": "checkpoint", "time": now, "app_times": dict(self.app_times.snapshot())}
+                time.sleep(interval)
+        finally:
+            self._handle_final_app()
+            self.save()
+    
+    def poll(self):
+        """Probe the active window once and account any switch."""
+        window_source = self.window_source or get_active_window_info
+        active_app = window_source()
+        self.probe_stale = getattr(window_source, "stale", False)
+        now = self._now()
+        event = self._handle_app_switch(active_app, now)
+        if self.publisher is not None:
+            # Only entries changed since the last poll are handed over, so
+            # an idle poll costs the same however many titles were seen
+            totals = self.app_times.snapshot()
+            changed, removed = totals.diff(self._published_totals)
+            self.publisher.publish_changes(changed, removed, self.current_app, self.start_time, now)
+            self._published_totals = totals
+        return event
     
+    def _now(self):
+        """Return the current time from the injected clock or time.time()."""
+        return self.clock() if self.clock is not None else time.time()
+    
+    def save(self):
+        """Save the accumulated totals and day timelines."""
+        self.pipeline.flush()
+        self.storage.save_data(self.app_times.snapshot(), focus_sketches=self.focus_sketches)
+        for timeline in self.timelines.values():
+            self.storage.save_timeline(timeline)
+    
+    def close(self):
+        """Release the pipeline's sinks; call once tracking is over for good."""
+        self.pipeline.close()
+    
+    def resume_today(self):
+        """Load today's saved totals and timeline so the next save extends them."""
+        today = date.fromtimestamp(self._now())
+        saved_times, saved_sketches = self.storage.load_resume_state(today)
+        
+        # Merged as a plain dict and published in one step; adding entries
+        # one by one would copy a shard per entry
+        totals = dict(self.app_times.snapshot())
+        for app, duration in saved_times.items():
+            totals[app] = totals.get(app, 0) + duration
+            if self.title_sketch is not None and " (" in app:
+                evicted = self.title_sketch.add(app, duration)
+                if evicted is not None:
+                    process_name = evicted.split(" (")[0]
+                    totals[process_name] = totals.get(process_name, 0) + totals.pop(evicted, 0)
+        self.app_times = TimeAccumulator(totals)
+        
+        for process_name, sketch in saved_sketches.items():
+            self._focus_sketch(process_name).merge(sketch)
+        
+        timeline = self.storage.load_timeline(today)
+        if timeline is not None and today not in self.timelines:
+            self.timelines[today] = timeline
+    
+    @timed("time_tracker_switch_seconds", "Latency of handling one poll result")
     def _handle_app_switch(self, active_app, current_time):
-        """Handle switching between applications."""
+        """Handle switching between applications. Returns the recorded SwitchEvent, if any."""
+        event = None
         if active_app != self.current_app:
             if self.current_app is not None:
                 duration = current_time - self.start_time
+                segment = SegmentEvent(self.current_app, self.start_time, current_time)
                 
-                if duration > 1:  # Only log if duration is more than 1 second
-                    self._update_app_time(self.current_app, duration)
-                    self.logger.info(
-                        f"Switched from '{self.current_app}' to '{active_app}' "
-                        f"(duration: {duration:.2f}s)"
-                    )
+                if self.pipeline.send(segment) is not None:
+                    event = SwitchEvent(current_time, self.current_app, active_app, duration)
+                    self.recent_switches.append(event)
+                    SWITCHES.inc()
+                    self.logger.info("Switched from %r to %r (duration: %.2fs)",
+                                     self.current_app, active_app, duration)
             
             self.current_app = active_app
             self.start_time = current_time
+        return event
     
     def _handle_final_app(self):
         """Handle the final application when stopping tracking."""
         if self.current_app is not None:
-            duration = time.time() - self.start_time
-            if duration > 1:
-                self._update_app_time(self.current_app, duration)
+            end_time = self._now()
+            self.pipeline.send(SegmentEvent(self.current_app, self.start_time, end_time))
+    
+    def _record_segment(self, app, start, end):
+        """Account a finished segment in the totals and the day timelines."""
+        if self.title_sketch is not None:
+            app = canonicalize_app(app)
+        self._update_app_time(app, end - start)
+        
+        last_day = date.fromtimestamp(end)
+        if self.segments.day != last_day:
+            self.segments = SegmentStore(last_day, self.title_capacity)
+        self.segments.append(app, start, end)
+        
+        # A segment spanning midnight is recorded in both days' timelines
+        day = date.fromtimestamp(start)
+        while day <= last_day:
+            timeline = self.timelines.get(day)
+            if timeline is None:
+                timeline = self.timelines[day] = DayTimeline(day)
+            timeline.record(app, start, end)
+            day += timedelta(days=1)
     
     def _update_app_time(self, app, duration):
-        """Update the time spent on an application."""
-        # Only log if duration is more than 1 second
-        if duration >= 1.0:
-            if app in self.app_times:
-                self.app_times[app] += duration
-            else:
-                self.app_times[app] = duration 
\ No newline at end of file
+        """Update the time spent on an application.
+        
+        Too-short segments are dropped by the pipeline's debounce stage
+        before they get here, so every consumer sees the same cutoff.
+        """
+        if self.title_sketch is not None and " (" in app:
+            evicted = self.title_sketch.add(app, duration)
+            if evicted is not None:
+                self._fold_title(evicted)
+        
+        self.app_times.add(app, duration)
+        self._focus_sketch(app.split(" (")[0]).update(duration)
+    
+    def _focus_sketch(self, process_name):
+        """Return the focus length sketch for a process, creating it if needed."""
+        sketch = self.focus_sketches.get(process_name)
+        if sketch is None:
+            sketch = self.focus_sketches[process_name] = KLLSketch()
+        return sketch
+    
+    def _fold_title(self, app):
+        """Move an evicted title's time into its process total."""
+        self.app_times.fold(app, app.split(" (")[0])
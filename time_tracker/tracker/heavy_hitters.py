@@ -0,0 +1,79 @@
+import heapq
+import re
+
+# Volatile parts of window titles: notification counters such as "(3) Inbox"
+# or "Inbox (12+)", bracketed counts, and unsaved-change markers.
+_COUNTER = re.compile(r'(?:^|\s)[(\[]\d+\+?[)\]](?=\s|$)')
+_UNSAVED_MARKER = re.compile(r'^[*●•]\s+|\s+[*●•]$')
+_WHITESPACE = re.compile(r'\s+')
+
+def canonicalize_title(title):
+    """Strip volatile counters and markers from a window title."""
+    title = _COUNTER.sub(' ', title)
+    title = _UNSAVED_MARKER.sub('', title.strip())
+    return _WHITESPACE.sub(' ', title).strip()
+
+def canonicalize_app(app):
+    """Canonicalize the title part of a "process (title)" key."""
+    if " (" not in app:
+        return app
+    process_name, window_title = app.split(" (", 1)
+    window_title = canonicalize_title(window_title[:-1])
+    if not window_title:
+        return process_name
+    return f"{process_name} ({window_title})"
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter sketch with a fixed number of counters.
+
+    Any key whose true weight exceeds total_weight / capacity is guaranteed
+    to be monitored. A key admitted by evicting the smallest counter starts
+    from that counter's value, which is recorded as its maximum error.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, key, weight=1):
+        """Add weight to a key. Returns the key evicted to make room, if any."""
+        evicted = None
+        if key in self.counts:
+            self.counts[key] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0
+        else:
+            evicted, floor = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[key] = floor + weight
+            self.errors[key] = floor
+
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, k) for k, count in self.counts.items()]
+            heapq.heapify(self._heap)
+        return evicted
+
+    def _pop_min(self):
+        """Return the key with the smallest counter, skipping stale heap entries."""
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return key, count
+
+    def top(self, n=None):
+        """Return (key, count, error) tuples ordered by count, largest first."""
+        ranked = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        return [(key, count, self.errors[key]) for key, count in ranked[:n]]
@@ -0,0 +1,172 @@
+import json
+import re
+from collections import namedtuple
+from ..ingest.client import IngestSink
+from .heavy_hitters import canonicalize_app
+
+SegmentEvent = namedtuple('SegmentEvent', ['app', 'start', 'end', 'category'],
+                          defaults=[None])
+
+class ExcludeProcesses:
+    """Drop segments from the listed processes."""
+
+    def __init__(self, processes):
+        self.processes = frozenset(processes)
+
+    def __call__(self, event):
+        if event.app.split(" (")[0] in self.processes:
+            return None
+        return event
+
+class Canonicalize:
+    """Strip volatile counters from window titles."""
+
+    def __call__(self, event):
+        return event._replace(app=canonicalize_app(event.app))
+
+class Classify:
+    """Tag segments with the first category whose pattern matches the app."""
+
+    def __init__(self, rules):
+        self.rules = [
+            (category, re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE))
+            for category, patterns in rules.items()
+        ]
+
+    def __call__(self, event):
+        for category, pattern in self.rules:
+            if pattern.search(event.app):
+                return event._replace(category=category)
+        return event
+
+class Debounce:
+    """Drop segments that are too short to count as a real switch."""
+
+    def __init__(self, min_seconds=1.0):
+        self.min_seconds = min_seconds
+
+    def __call__(self, event):
+        if event.end - event.start > self.min_seconds:
+            return event
+        return None
+
+class TrackerSink:
+    """Account segments in an ApplicationTracker's totals and timelines."""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def write(self, event):
+        self.tracker._record_segment(event.app, event.start, event.end)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class NdjsonSink:
+    """Append segments to a newline-delimited JSON file in batches."""
+
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+
+    def write(self, event):
+        self._pending.append(json.dumps(event._asdict(), ensure_ascii=False))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(self._pending))
+            f.write('\n')
+        self._pending = []
+
+    def close(self):
+        self.flush()
+
+STAGE_TYPES = {
+    "exclude": ExcludeProcesses,
+    "canonicalize": Canonicalize,
+    "classify": Classify,
+    "debounce": Debounce,
+}
+
+SINK_TYPES = {
+    "ndjson": NdjsonSink,
+    "ingest": IngestSink,
+}
+
+DEFAULT_PIPELINE_CONFIG = {
+    "stages": [{"type": "debounce", "min_seconds": 1.0}],
+    "sinks": [{"type": "tracker"}],
+}
+
+class Pipeline:
+    """Stages and sinks fused into a single pass per segment.
+
+    Stages are callables that return the (possibly rewritten) event, or
+    None to drop it. Events that make it through every stage are written
+    to every sink. Nothing runs per poll; only finished segments go through.
+    """
+
+    def __init__(self, stages, sinks):
+        self.stages = tuple(stages)
+        self.sinks = tuple(sinks)
+
+    def send(self, event):
+        """Process one segment. Returns the accepted event, or None if it was dropped."""
+        for stage in self.stages:
+            event = stage(event)
+            if event is None:
+                return None
+        for sink in self.sinks:
+            sink.write(event)
+        return event
+
+    def run(self, events):
+        """Process an iterable of segments, yielding the accepted ones."""
+        for event in events:
+            event = self.send(event)
+            if event is not None:
+                yield event
+
+    def flush(self):
+        """Flush any batched sink output."""
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        """Flush and release the sinks at shutdown."""
+        for sink in self.sinks:
+            sink.close()
+
+def build_pipeline(config, tracker=None):
+    """Build a Pipeline from a config dict of typed stage and sink entries."""
+    stages = [_build(STAGE_TYPES, spec, "stage") for spec in config.get("stages", [])]
+    sinks = []
+    for spec in config.get("sinks", []):
+        if spec.get("type") == "tracker":
+            if tracker is None:
+                raise ValueError("A tracker sink needs a tracker")
+            sinks.append(TrackerSink(tracker))
+        else:
+            sinks.append(_build(SINK_TYPES, spec, "sink"))
+    return Pipeline(stages, sinks)
+
+def load_pipeline_config(path):
+    """Load a pipeline config from a JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+def _build(types, spec, kind):
+    """Instantiate a stage or sink from its config entry."""
+    options = dict(spec)
+    type_name = options.pop("type", None)
+    if type_name not in types:
+        raise ValueError(f"Unknown pipeline {kind} type: {type_name!r}")
+    return types[type_name](**options)
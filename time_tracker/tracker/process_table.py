@@ -0,0 +1,112 @@
+import ntpath
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+import psutil
+
+ProcessInfo = namedtuple('ProcessInfo', ['pid', 'name', 'exe', 'cmdline', 'ppid', 'create_time'],
+                         defaults=[None])
+
+# Hosts whose process name says little; the script they run is what matters
+INTERPRETERS = {
+    'python.exe', 'pythonw.exe', 'python', 'python3',
+    'node.exe', 'node', 'java.exe', 'javaw.exe', 'java',
+}
+
+class ProcessSnapshotter:
+    """Keep a pid -> ProcessInfo table refreshed on a background thread.
+
+    The table is rebuilt with a single psutil.process_iter() pass at a low
+    rate and published by swapping one reference to an immutable mapping,
+    so probes read it without locks or per-poll syscalls. When the looked
+    up pid or its table entry changes, the process's start time is checked
+    once, so a pid reused since the last refresh is not reported under the
+    old process's name; repeat lookups of the same foreground process are
+    answered from the table alone. A miss (usually a newly started
+    process) wakes the thread for an early refresh.
+    """
+
+    ATTRS = ['pid', 'name', 'exe', 'cmdline', 'ppid', 'create_time']
+
+    def __init__(self, interval=10.0):
+        self.interval = interval
+        self.table = MappingProxyType({})
+        self._verified = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Take a first snapshot and keep refreshing in the background."""
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="process-snapshotter",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def refresh(self):
+        """Rebuild the table from the current process list and publish it."""
+        table = {}
+        for process in psutil.process_iter(attrs=self.ATTRS, ad_value=None):
+            info = process.info
+            table[info['pid']] = ProcessInfo(info['pid'], info['name'], info['exe'],
+                                             tuple(info['cmdline'] or ()), info['ppid'],
+                                             info['create_time'])
+        self.table = MappingProxyType(table)
+
+    def lookup(self, pid):
+        """Return the ProcessInfo for a pid, or None if it is not in the snapshot."""
+        info = self.table.get(pid)
+        if info is not None and info is not self._verified:
+            if info.create_time is not None:
+                try:
+                    if psutil.Process(pid).create_time() != info.create_time:
+                        info = None
+                except psutil.Error:
+                    info = None
+            self._verified = info
+        if info is None:
+            self._wake.set()
+        return info
+
+    def _run(self):
+        """Refresh periodically, or early when a lookup missed."""
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the previous snapshot
+                pass
+
+def describe_process(info):
+    """Return a display name that tells interpreter processes apart by script."""
+    if not info.name or info.name.lower() not in INTERPRETERS:
+        return info.name
+
+    args = iter(info.cmdline[1:])
+    for arg in args:
+        if arg in ('-c', '-e'):
+            # Inline code (python -c, node -e); nothing after it is a script
+            return info.name
+        elif arg in ('-m', '-jar'):
+            target = next(args, None)
+            if target:
+                return f"{info.name} [{ntpath.basename(target)}]"
+        elif arg in ('-cp', '-classpath', '-X'):
+            next(args, None)
+        elif not arg.startswith('-'):
+            return f"{info.name} [{ntpath.basename(arg)}]"
+    return info.name
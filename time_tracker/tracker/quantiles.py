@@ -0,0 +1,125 @@
+import random
+
+class KLLSketch:
+    """KLL quantile sketch of a stream of values in bounded space.
+
+    Values enter level 0; a level that outgrows its capacity is sorted and
+    every other item (from a random offset) moves up a level, where each
+    item stands for twice as many values. Capacities shrink geometrically
+    towards the lower levels, so the sketch holds about 3k items however
+    long the stream is and ranks are off by roughly 1.7/k. Sketches with
+    the same k merge in any order by concatenating their levels.
+    """
+
+    def __init__(self, k=200, seed=None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.levels = [[]]
+        self._rng = random.Random(seed)
+
+    def __len__(self):
+        return self.count
+
+    def update(self, value):
+        """Add one value."""
+        self.levels[0].append(value)
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        if other.k != self.k:
+            raise ValueError("Only sketches with the same k can be merged")
+        if not other.count:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+
+    def quantile(self, q):
+        """Return the value at quantile q (0..1), or None if the sketch is empty."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """Return the values at several quantiles, sorting the items only once."""
+        if not self.count:
+            return [None] * len(qs)
+        weighted = sorted((value, 1 << level)
+                          for level, items in enumerate(self.levels) for value in items)
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            if q <= 0 or q >= 1:
+                results.append(self.min if q <= 0 else self.max)
+                continue
+            seen = 0
+            result = self.max
+            for value, weight in weighted:
+                seen += weight
+                if seen >= q * total:
+                    result = value
+                    break
+            results.append(result)
+        return results
+
+    def copy(self):
+        """Return an independent copy of the sketch."""
+        sketch = KLLSketch(self.k)
+        sketch.count = self.count
+        sketch.min = self.min
+        sketch.max = self.max
+        sketch.levels = [list(items) for items in self.levels]
+        return sketch
+
+    def to_dict(self):
+        """Return a JSON-serializable form of the sketch."""
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "levels": [[round(value, 2) for value in items] for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch from the output of to_dict()."""
+        sketch = cls(data["k"])
+        sketch.count = data["count"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.levels = [list(items) for items in data["levels"]] or [[]]
+        return sketch
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(self.k * (2 / 3) ** depth), 2)
+
+    def _compress(self):
+        """Compact levels until each fits its capacity."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                # An odd item out stays behind so no weight is lost
+                leftover = [items.pop()] if len(items) % 2 else []
+                self.levels[level + 1].extend(items[self._rng.randrange(2)::2])
+                self.levels[level] = leftover
+            level += 1
@@ -0,0 +1,117 @@
+from array import array
+
+# Column name -> array typecode; 8 + 8 + 4 + 4 = 24 bytes per segment
+COLUMNS = {'start': 'd', 'end': 'd', 'app_id': 'I', 'title_id': 'I'}
+
+class Segment:
+    """Read-only view of one row of a SegmentStore."""
+
+    __slots__ = ('_store', 'index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self.index = index
+
+    @property
+    def start(self):
+        return self._store.start[self.index]
+
+    @property
+    def end(self):
+        return self._store.end[self.index]
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def process(self):
+        return self._store.processes[self._store.app_id[self.index]]
+
+    @property
+    def title(self):
+        return self._store.titles[self._store.title_id[self.index]]
+
+    @property
+    def app(self):
+        """The app name in the tracker's "process (title)" form."""
+        title = self.title
+        return f"{self.process} ({title})" if title is not None else self.process
+
+    def __repr__(self):
+        return f"Segment({self.app!r}, {self.start!r}, {self.end!r})"
+
+class SegmentStore:
+    """Append-only log of one day's finished segments in parallel typed arrays.
+
+    Process names and window titles are interned into lists and stored as
+    ids, so a segment costs 24 bytes instead of a Python object per field.
+    Title id 0 means the app had no title. With a title_capacity, titles
+    beyond that many distinct ones are folded into their process (title
+    id 0) and counted in folded_titles, so the name tables stay bounded.
+    """
+
+    def __init__(self, day=None, title_capacity=None):
+        self.day = day
+        self.title_capacity = title_capacity
+        self.folded_titles = 0
+        self.start = array(COLUMNS['start'])
+        self.end = array(COLUMNS['end'])
+        self.app_id = array(COLUMNS['app_id'])
+        self.title_id = array(COLUMNS['title_id'])
+        self.processes = []
+        self.titles = [None]
+        self._process_ids = {}
+        self._title_ids = {}
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return Segment(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Segment(self, index)
+
+    def append(self, app, start, end):
+        """Record a finished segment of a "process (title)" app name."""
+        process, _, title = app.partition(" (")
+        self.start.append(start)
+        self.end.append(end)
+        self.app_id.append(_intern(process, self.processes, self._process_ids))
+        title_id = 0
+        if title:
+            title = title[:-1]
+            if (self.title_capacity is None or title in self._title_ids
+                    or len(self.titles) <= self.title_capacity):
+                title_id = _intern(title, self.titles, self._title_ids)
+            else:
+                self.folded_titles += 1
+        self.title_id.append(title_id)
+
+    def column(self, name):
+        """Return a memoryview of a snapshot of one column.
+
+        The view is over a copy, so holding it never stops the store from
+        growing, and later appends do not show up in it.
+        """
+        return memoryview(getattr(self, name)[:])
+
+    @property
+    def nbytes(self):
+        """Bytes used by the column data."""
+        return sum(len(column) * column.itemsize for column in
+                   (self.start, self.end, self.app_id, self.title_id))
+
+def _intern(name, names, ids):
+    """Return the id of a name, appending it to the table if it is new."""
+    name_id = ids.get(name)
+    if name_id is None:
+        name_id = ids[name] = len(names)
+        names.append(name)
+    return name_id
@@ -0,0 +1,222 @@
+import logging
+import struct
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+DEFAULT_NAME = "time_tracker"
+NAMES_SUFFIX = "_names"
+
+# Header: magic, version, sequence, publish time, current app start time,
+# current app name (offset, length), record count, record capacity, flags
+_HEADER = struct.Struct('<4sIQddIIIII')
+_MAGIC = b'TTS1'
+_VERSION = 2
+_SEQ_OFFSET = 8
+_SEQ = struct.Struct('<Q')
+
+# Record: seconds, app name offset and length in the names segment
+_RECORD = struct.Struct('<dII')
+
+# Names are appended as raw UTF-8 after a used-bytes counter
+_NAMES_HEADER = struct.Struct('<I')
+
+# Name offset of a missing current app, and of a removed record
+_NO_APP = 0xFFFFFFFF
+
+# Set while some apps could not be published for lack of space
+FLAG_INCOMPLETE = 1
+
+Snapshot = namedtuple('Snapshot', ['seq', 'timestamp', 'current_app', 'current_start', 'totals',
+                                   'complete'])
+
+logger = logging.getLogger(__name__)
+
+class SnapshotPublisher:
+    """Publish live per-app totals into shared memory for other processes.
+
+    The data segment holds a header guarded by a seqlock (the sequence is
+    odd while a write is in progress) followed by fixed-width records. App
+    names live in a second, append-only segment, so a name's offset never
+    changes once published. Each app keeps the record slot it was first
+    given and only changed records are rewritten. An app that disappears
+    from the totals (e.g. a title folded into its process) has its record
+    tombstoned and the slot reused. Apps that find no free slot or name
+    space are left out and the snapshot is flagged incomplete until they
+    fit. publish_changes() takes only what changed, so a writer that
+    knows its updates need not walk all of its totals. Segments
+    left behind by a publisher that did not exit cleanly are replaced.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, capacity=4096, names_size=1 << 20):
+        self.capacity = capacity
+        self.shm = _create(name, _HEADER.size + capacity * _RECORD.size)
+        self.names_shm = _create(name + NAMES_SUFFIX, names_size)
+        self.seq = 0
+        self._names = {}
+        self._names_used = 0
+        self._slots = {}
+        self._free_slots = []
+        self._slot_count = 0
+        self._published = {}
+        # Apps left out for lack of space -> their latest total
+        self._skipped = {}
+        self._flags = 0
+        _NAMES_HEADER.pack_into(self.names_shm.buf, 0, 0)
+        self._write_header(0.0, None, 0.0)
+
+    def publish(self, app_times, current_app=None, current_start=None, timestamp=0.0):
+        """Publish the totals and the current app, replacing the previous totals."""
+        removed = [app for app in (*self._published, *self._skipped) if app not in app_times]
+        changed = {app: seconds for app, seconds in app_times.items()
+                   if self._published.get(app) != seconds}
+        self.publish_changes(changed, removed, current_app, current_start, timestamp)
+
+    def publish_changes(self, changed, removed=(), current_app=None, current_start=None,
+                        timestamp=0.0):
+        """Publish updated totals and drop removed apps, leaving the other records as they are."""
+        buf = self.shm.buf
+        self._begin()
+        for app in removed:
+            self._skipped.pop(app, None)
+            slot = self._slots.pop(app, None)
+            if slot is not None:
+                _RECORD.pack_into(buf, _HEADER.size + slot * _RECORD.size, 0.0, _NO_APP, 0)
+                self._free_slots.append(slot)
+                del self._published[app]
+
+        if self._skipped and (self._free_slots or self._slot_count < self.capacity):
+            # Space was freed: retry the apps left out before
+            changed = {**self._skipped, **changed}
+        for app, seconds in changed.items():
+            if self._published.get(app) == seconds:
+                continue
+            slot = self._slots.get(app)
+            if slot is None:
+                slot = self._free_slot()
+                if slot is None or self._intern(app) is None:
+                    if slot is not None:
+                        self._free_slots.append(slot)
+                    self._skipped[app] = seconds
+                    continue
+                self._slots[app] = slot
+                self._skipped.pop(app, None)
+            offset, length = self._names[app]
+            _RECORD.pack_into(buf, _HEADER.size + slot * _RECORD.size, seconds, offset, length)
+            self._published[app] = seconds
+        if current_app is not None:
+            self._intern(current_app)
+        self._flags = FLAG_INCOMPLETE if self._skipped else 0
+        self._write_header(timestamp, current_app, current_start or 0.0)
+        self._end()
+
+    def close(self):
+        """Detach from and remove both segments."""
+        for shm in (self.shm, self.names_shm):
+            shm.close()
+            shm.unlink()
+
+    def _free_slot(self):
+        """Return a removed record's slot or a never used one, or None if all are taken."""
+        if self._free_slots:
+            return self._free_slots.pop()
+        if self._slot_count < self.capacity:
+            self._slot_count += 1
+            return self._slot_count - 1
+        return None
+
+    def _intern(self, app):
+        """Append a name to the names segment, returning (offset, length) or None if full."""
+        entry = self._names.get(app)
+        if entry is None:
+            encoded = app.encode('utf-8')
+            offset = _NAMES_HEADER.size + self._names_used
+            if offset + len(encoded) > self.names_shm.size:
+                return None
+            self.names_shm.buf[offset:offset + len(encoded)] = encoded
+            self._names_used += len(encoded)
+            _NAMES_HEADER.pack_into(self.names_shm.buf, 0, self._names_used)
+            entry = self._names[app] = (offset, len(encoded))
+        return entry
+
+    def _write_header(self, timestamp, current_app, current_start):
+        offset, length = self._names.get(current_app, (_NO_APP, 0))
+        _HEADER.pack_into(self.shm.buf, 0, _MAGIC, _VERSION, self.seq, timestamp,
+                          current_start, offset, length, self._slot_count, self.capacity,
+                          self._flags)
+
+    def _begin(self):
+        self.seq += 1
+        _SEQ.pack_into(self.shm.buf, _SEQ_OFFSET, self.seq)
+
+    def _end(self):
+        self.seq += 1
+        _SEQ.pack_into(self.shm.buf, _SEQ_OFFSET, self.seq)
+
+class SnapshotReader:
+    """Read consistent snapshots published by a SnapshotPublisher."""
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = _attach(name)
+        self.names_shm = _attach(name + NAMES_SUFFIX)
+        self._decoded = {}
+
+    def read(self, retries=1000):
+        """Return the latest Snapshot, retrying while a write is in progress."""
+        buf = self.shm.buf
+        for _ in range(retries):
+            (before,) = _SEQ.unpack_from(buf, _SEQ_OFFSET)
+            if before & 1:
+                continue
+            (magic, version, _, timestamp, current_start,
+             current_offset, current_length, count, _, flags) = _HEADER.unpack_from(buf)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Not a time tracker snapshot")
+            records = list(_RECORD.iter_unpack(
+                buf[_HEADER.size:_HEADER.size + count * _RECORD.size]))
+            (after,) = _SEQ.unpack_from(buf, _SEQ_OFFSET)
+            if before != after:
+                continue
+
+            totals = {self._name(offset, length): seconds
+                      for seconds, offset, length in records if offset != _NO_APP}
+            current_app = (self._name(current_offset, current_length)
+                           if current_offset != _NO_APP else None)
+            return Snapshot(before, timestamp, current_app,
+                            current_start if current_app is not None else None, totals,
+                            not flags & FLAG_INCOMPLETE)
+        raise TimeoutError("Snapshot kept changing while being read")
+
+    def close(self):
+        """Detach from both segments without removing them."""
+        self.shm.close()
+        self.names_shm.close()
+
+    def _name(self, offset, length):
+        """Decode a name from the append-only names segment, caching by offset."""
+        name = self._decoded.get(offset)
+        if name is None:
+            name = self._decoded[offset] = bytes(
+                self.names_shm.buf[offset:offset + length]).decode('utf-8')
+        return name
+
+def _create(name, size):
+    """Create a segment, replacing one a crashed publisher left behind."""
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        logger.warning("Replacing stale shared memory segment %s", name)
+        stale = shared_memory.SharedMemory(name=name, create=False)
+        stale.close()
+        stale.unlink()
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+def _attach(name):
+    """Attach to an existing segment without letting this process remove it on exit."""
+    shm = shared_memory.SharedMemory(name=name, create=False)
+    # Before Python 3.13 attaching registers the segment with the resource
+    # tracker, which would unlink it when this reader exits
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
@@ -0,0 +1,181 @@
+import struct
+import sys
+from array import array
+from datetime import date, datetime, time, timedelta
+
+# Header: magic, format version, slot length in seconds, flags, day ordinal
+_HEADER = struct.Struct('<4sHHHI')
+_MAGIC = b'TLN1'
+_VERSION = 1
+_FLAG_SECONDS = 1
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def local_day(day):
+    """Return (timestamp of local midnight, length of the day in seconds).
+
+    The length comes from the next local midnight, so days on which the
+    clocks change are 23 or 25 hours long.
+    """
+    origin = datetime.combine(day, time.min).timestamp()
+    end = datetime.combine(day + timedelta(days=1), time.min).timestamp()
+    return origin, int(round(end - origin))
+
+
+class DayTimeline:
+    """Fixed-size occupancy timeline for a single day.
+
+    The day is split into equal slots (one minute by default). Each slot holds
+    the id of the application that was active for most of it, so looking up
+    what was running at a given time of day is a single array index. Id 0
+    means nothing was recorded for the slot. Slots count elapsed time from
+    local midnight, and times of day are converted through their timestamp,
+    so days on which the clocks change get one slot per real minute.
+    """
+
+    def __init__(self, day, slot_seconds=60, track_seconds=True):
+        if SECONDS_PER_DAY % slot_seconds or not 0 < slot_seconds <= 3600:
+            raise ValueError("slot_seconds must divide a day and be at most an hour")
+
+        self.day = day
+        self.slot_seconds = slot_seconds
+        self._origin, self.day_seconds = local_day(day)
+        self.slot_count = -(-self.day_seconds // slot_seconds)
+        self.slots = array('I', [0]) * self.slot_count
+        self.seconds = array('H', [0]) * self.slot_count if track_seconds else None
+        self.apps = [None]
+        self._app_ids = {}
+
+        # Per-app seconds of the slot currently being filled. Segments arrive
+        # in time order, so only one slot is ever partially covered.
+        self._open_slot = -1
+        self._open_counts = {}
+
+    def app_id(self, app):
+        """Return the id for an application, assigning a new one if needed."""
+        app_id = self._app_ids.get(app)
+        if app_id is None:
+            app_id = len(self.apps)
+            self.apps.append(app)
+            self._app_ids[app] = app_id
+        return app_id
+
+    def record(self, app, start, end):
+        """Record that an application was active between two timestamps."""
+        start = max(start, self._origin)
+        end = min(end, self._origin + self.day_seconds)
+        if end <= start:
+            return
+
+        app_id = self.app_id(app)
+        offset = start - self._origin
+        stop = end - self._origin
+        first = int(offset // self.slot_seconds)
+        last = int((stop - 1e-9) // self.slot_seconds)
+
+        if first == last:
+            self._add(first, app_id, stop - offset)
+            return
+
+        self._add(first, app_id, (first + 1) * self.slot_seconds - offset)
+        if last > first + 1:
+            # Fully covered slots belong to this app outright
+            count = last - first - 1
+            self.slots[first + 1:last] = array('I', [app_id]) * count
+            if self.seconds is not None:
+                self.seconds[first + 1:last] = array('H', [self.slot_seconds]) * count
+        self._add(last, app_id, stop - last * self.slot_seconds)
+
+    def _add(self, slot, app_id, seconds):
+        """Add partial coverage to a slot and refresh its dominant app."""
+        if slot != self._open_slot:
+            self._open_slot = slot
+            self._open_counts = {}
+            if self.slots[slot]:
+                # Re-opening a slot: start from what was already committed
+                previous = self.seconds[slot] if self.seconds is not None else 0
+                self._open_counts[self.slots[slot]] = previous
+
+        counts = self._open_counts
+        counts[app_id] = counts.get(app_id, 0) + seconds
+        dominant = max(counts, key=counts.get)
+        self.slots[slot] = dominant
+        if self.seconds is not None:
+            self.seconds[slot] = min(int(round(counts[dominant])), 0xFFFF)
+
+    def slot_index(self, when):
+        """Return the slot index for a datetime, time of this day or timestamp."""
+        if isinstance(when, time):
+            when = datetime.combine(self.day, when)
+        if isinstance(when, datetime):
+            when = when.timestamp()
+        offset = when - self._origin
+        if not 0 <= offset < self.day_seconds:
+            raise ValueError(f"{when!r} is outside {self.day.isoformat()}")
+        return int(offset // self.slot_seconds)
+
+    def app_at(self, when):
+        """Return the dominant application at a time of day, or None."""
+        return self.apps[self.slots[self.slot_index(when)]]
+
+    def seconds_at(self, when):
+        """Return how many seconds of the slot the dominant app covered."""
+        if self.seconds is None:
+            return None
+        return self.seconds[self.slot_index(when)]
+
+    def to_bytes(self):
+        """Serialize the timeline into a compact binary blob."""
+        flags = _FLAG_SECONDS if self.seconds is not None else 0
+        names = '\0'.join(self.apps[1:]).encode('utf-8')
+        parts = [
+            _HEADER.pack(_MAGIC, _VERSION, self.slot_seconds, flags, self.day.toordinal()),
+            struct.pack('<I', len(names)),
+            names,
+            _little_endian(self.slots),
+        ]
+        if self.seconds is not None:
+            parts.append(_little_endian(self.seconds))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Rebuild a timeline from the output of to_bytes()."""
+        magic, version, slot_seconds, flags, ordinal = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a timeline file")
+
+        timeline = cls(date.fromordinal(ordinal), slot_seconds,
+                       track_seconds=bool(flags & _FLAG_SECONDS))
+        pos = _HEADER.size
+        (names_len,) = struct.unpack_from('<I', blob, pos)
+        pos += 4
+        if names_len:
+            for name in blob[pos:pos + names_len].decode('utf-8').split('\0'):
+                timeline.app_id(name)
+        pos += names_len
+
+        pos = _read_array(timeline.slots, blob, pos)
+        if timeline.seconds is not None:
+            _read_array(timeline.seconds, blob, pos)
+        return timeline
+
+
+def _little_endian(values):
+    """Return the raw bytes of an array in little-endian order."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(target, blob, pos):
+    """Fill a preallocated array from little-endian bytes and return the new offset."""
+    size = len(target) * target.itemsize
+    values = array(target.typecode)
+    values.frombytes(blob[pos:pos + size])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    target[:] = values
+    return pos + size
@@ -0,0 +1,161 @@
+from array import array
+from .timeline import SECONDS_PER_DAY, local_day
+
+class TimelinePyramid:
+    """Dominant app per time bucket for one day, at every power-of-two resolution.
+
+    Level 0 splits the day into base_seconds buckets, each holding the id
+    of the app that covered most of it and for how long. Every level above
+    halves the bucket count, keeping the stronger of each pair of children
+    (or their sum when both name the same app). A view of any span and
+    width is answered from the level whose buckets are just narrower than
+    a pixel, so it costs O(pixels) however many segments were added.
+    Offsets are elapsed seconds since local midnight, and the day is as
+    long as it really is (23 or 25 hours when the clocks change).
+    """
+
+    def __init__(self, day, base_seconds=1):
+        if SECONDS_PER_DAY % base_seconds:
+            raise ValueError("base_seconds must divide a day")
+        self.day = day
+        self.base_seconds = base_seconds
+        self.apps = [None]
+        self._app_ids = {}
+        self._origin, self.day_seconds = local_day(day)
+
+        self.levels = []
+        count = -(-self.day_seconds // base_seconds)
+        while True:
+            self.levels.append((array('I', [0]) * count, array('f', [0.0]) * count))
+            if count == 1:
+                break
+            count = (count + 1) // 2
+
+    @classmethod
+    def from_timeline(cls, timeline, base_seconds=1):
+        """Seed a pyramid from a saved DayTimeline's slots."""
+        pyramid = cls(timeline.day, base_seconds)
+        touched = None
+        for slot, app_id in enumerate(timeline.slots):
+            if app_id:
+                start = pyramid._origin + slot * timeline.slot_seconds
+                span = pyramid._fill(timeline.apps[app_id], start, start + timeline.slot_seconds)
+                touched = (touched or span)[0], span[1]
+        if touched is not None:
+            # One pass over the upper levels instead of one per slot
+            pyramid._rebuild(*touched)
+        return pyramid
+
+    def app_id(self, app):
+        """Return the id for an application, assigning a new one if needed."""
+        app_id = self._app_ids.get(app)
+        if app_id is None:
+            app_id = self._app_ids[app] = len(self.apps)
+            self.apps.append(app)
+        return app_id
+
+    def add(self, app, start, end):
+        """Record a segment given as timestamps, clipped to the day."""
+        span = self._fill(app, start, end)
+        if span is not None:
+            self._rebuild(*span)
+
+    def _fill(self, app, start, end):
+        """Record a segment in the base level only. Returns the touched bucket range."""
+        offset = max(start - self._origin, 0.0)
+        stop = min(end - self._origin, float(self.day_seconds))
+        if stop <= offset:
+            return None
+
+        app_id = self.app_id(app)
+        apps, seconds = self.levels[0]
+        width = self.base_seconds
+        first = int(offset // width)
+        last = int((stop - 1e-9) // width)
+
+        self._cover(first, app_id, min(stop, (first + 1) * width) - offset)
+        if last > first:
+            if last > first + 1:
+                # Fully covered buckets belong to this app outright
+                count = last - first - 1
+                apps[first + 1:last] = array('I', [app_id]) * count
+                seconds[first + 1:last] = array('f', [float(width)]) * count
+            self._cover(last, app_id, stop - last * width)
+        return first, last
+
+    def _cover(self, bucket, app_id, covered):
+        """Give a partially covered base bucket to the app if it covers more of it."""
+        apps, seconds = self.levels[0]
+        if apps[bucket] == app_id:
+            seconds[bucket] = min(seconds[bucket] + covered, float(self.base_seconds))
+        elif covered > seconds[bucket]:
+            apps[bucket] = app_id
+            seconds[bucket] = covered
+
+    def _rebuild(self, first, last):
+        """Recompute the parents of base buckets first..last on every level."""
+        for level in range(1, len(self.levels)):
+            child_apps, child_seconds = self.levels[level - 1]
+            apps, seconds = self.levels[level]
+            first //= 2
+            last //= 2
+            for bucket in range(first, last + 1):
+                left = 2 * bucket
+                right = left + 1
+                if right >= len(child_apps) or child_apps[right] == 0:
+                    apps[bucket], seconds[bucket] = child_apps[left], child_seconds[left]
+                elif child_apps[left] == child_apps[right]:
+                    apps[bucket] = child_apps[left]
+                    seconds[bucket] = child_seconds[left] + child_seconds[right]
+                elif child_seconds[right] > child_seconds[left]:
+                    apps[bucket], seconds[bucket] = child_apps[right], child_seconds[right]
+                else:
+                    apps[bucket], seconds[bucket] = child_apps[left], child_seconds[left]
+
+    def level_for(self, seconds_per_pixel):
+        """Return the coarsest level whose buckets are no wider than a pixel."""
+        level = 0
+        while (level + 1 < len(self.levels)
+               and self.base_seconds << (level + 1) <= seconds_per_pixel):
+            level += 1
+        return level
+
+    def dominant(self, start, end, pixels):
+        """Return the dominant app id of each of `pixels` equal slices of a span.
+
+        start and end are elapsed seconds since midnight. Id 0 means nothing
+        was recorded under that pixel.
+        """
+        result = array('I', [0]) * pixels
+        if pixels <= 0 or end <= start:
+            return result
+        span = (end - start) / pixels
+        level = self.level_for(span)
+        apps, seconds = self.levels[level]
+        width = self.base_seconds << level
+        last_bucket = len(apps) - 1
+
+        for pixel in range(pixels):
+            left = start + pixel * span
+            first = max(int(left // width), 0)
+            last = min(int((left + span - 1e-9) // width), last_bucket)
+            # A pixel overlaps at most three buckets of the chosen level;
+            # weigh each by how much of it lies under the pixel
+            best, best_seconds = 0, 0.0
+            for bucket in range(first, last + 1):
+                overlap = (min(left + span, (bucket + 1) * width)
+                           - max(left, bucket * width)) / width
+                if seconds[bucket] * overlap > best_seconds:
+                    best, best_seconds = apps[bucket], seconds[bucket] * overlap
+            result[pixel] = best
+        return result
+
+    def app_at(self, offset):
+        """Return the dominant app at a number of elapsed seconds since midnight, or None."""
+        if not 0 <= offset < self.day_seconds:
+            return None
+        return self.apps[self.levels[0][0][int(offset // self.base_seconds)]]
+
+    def timestamp(self, offset):
+        """Return the timestamp of an offset, e.g. to show its local clock time."""
+        return self._origin + offset
@@ -1,11 +1,25 @@
 import psutil
-import win32gui
-import win32process
-from win32gui import GetWindowText, GetForegroundWindow
-from win32process import GetWindowThreadProcessId
+from ..metrics import timed
+from .process_table import describe_process
 
-def get_active_window_info():
-    """Get information about the currently active window."""
+try:
+    from win32gui import GetWindowText, GetForegroundWindow
+    from win32process import GetWindowThreadProcessId
+except ImportError:
+    # Not on Windows: probing reports "Unknown", but injected window
+    # sources (e.g. replayed traces) still work.
+    GetWindowText = GetForegroundWindow = GetWindowThreadProcessId = None
+
+# System processes whose window titles are not worth recording
+UNTITLED_PROCESSES = frozenset(['explorer.exe', 'MemCompression', 'System'])
+
+@timed("time_tracker_probe_seconds", "Latency of one foreground window probe")
+def get_active_window_info(process_table=None):
+    """Get information about the currently active window.
+    
+    With a ProcessSnapshotter, the process is looked up in its table (and
+    interpreters are named by the script they run) instead of asking psutil.
+    """
     try:
         window = GetForegroundWindow()
         # Check for invalid window handle
@@ -20,14 +34,18 @@ def get_active_window_info():
             return "Unknown"
         
         try:
-            process = psutil.Process(pid)
-            process_name = process.name()
+            info = process_table.lookup(pid) if process_table is not None else None
+            if info is not None:
+                base_name, process_name = info.name, describe_process(info)
+            else:
+                process = psutil.Process(pid)
+                base_name = process_name = process.name()
             
             # Check for None or empty process name
             if not process_name:
                 return "Unknown"
                 
-            if window_title and process_name not in ['explorer.exe', 'MemCompression', 'System']:
+            if window_title and base_name not in UNTITLED_PROCESSES:
                 return f"{process_name} ({window_title})"
             return process_name
             
@@ -0,0 +1,169 @@
+import logging
+import queue
+import threading
+import time
+from ..metrics import REGISTRY
+from .utils import get_active_window_info
+
+TIMEOUTS = REGISTRY.counter("time_tracker_probe_timeouts_total",
+                            "Window probes that missed their deadline")
+SLOW_PROBES = REGISTRY.counter("time_tracker_probe_slow_total",
+                               "Window probes slower than the slow threshold")
+RECYCLED = REGISTRY.counter("time_tracker_probe_workers_recycled_total",
+                            "Probe workers abandoned after repeated timeouts")
+
+logger = logging.getLogger(__name__)
+
+# Returned by _ProbeWorker.call when the deadline passed
+_TIMED_OUT = object()
+
+class _ProbeWorker:
+    """Thread that runs probe calls one at a time."""
+
+    def __init__(self, probe, name):
+        self.probe = probe
+        self._requests = queue.SimpleQueue()
+        self._results = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def call(self, request_id, timeout):
+        """Run the probe, returning its result or _TIMED_OUT."""
+        self._requests.put(request_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                done_id, value = self._results.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                return _TIMED_OUT
+            if done_id == request_id:
+                return value
+            # A late answer to a call that already timed out
+
+    def stop(self):
+        """Ask the thread to exit once its current call returns."""
+        self._requests.put(None)
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            request_id = self._requests.get()
+            # Calls queued behind a hung probe already timed out; only the
+            # newest one can still be waiting for an answer
+            while request_id is not None:
+                try:
+                    request_id = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if request_id is None:
+                return
+            try:
+                value = self.probe()
+            except Exception:
+                logger.exception("Window probe failed")
+                value = "Unknown"
+            self._results.put((request_id, value))
+
+class WatchdogProbe:
+    """Window source that bounds how long a probe may block the tracker.
+
+    The wrapped probe runs on a worker thread and each call waits at most
+    `deadline` seconds. A call that misses it returns the last known
+    result and sets `stale`, so the tracking loop keeps its cadence even
+    when the OS calls hang. Once the probe has been stuck for `max_stale`
+    seconds, calls return None instead, so the tracker stops crediting
+    the hang to the last app. Probes slower than `slow_threshold` are
+    counted as outliers. After `max_strikes` timeouts in a row the worker is
+    abandoned (a blocked thread cannot be killed) and a fresh one takes
+    over; while `max_abandoned` abandoned workers are still stuck, no more
+    are started and calls keep returning the stale result.
+    """
+
+    def __init__(self, probe=None, deadline=0.25, slow_threshold=None, max_strikes=3,
+                 max_abandoned=4, max_stale=10.0):
+        self.probe = probe or get_active_window_info
+        self.deadline = deadline
+        self.max_stale = max_stale
+        self.slow_threshold = slow_threshold if slow_threshold is not None else deadline / 2
+        self.max_strikes = max_strikes
+        self.max_abandoned = max_abandoned
+        self.last_result = "Unknown"
+        self.stale = False
+        self.stale_since = None
+        self.timeouts = 0
+        self.slow = 0
+        self.recycled = 0
+        self._strikes = 0
+        self._calls = 0
+        self._worker = None
+        self._abandoned = []
+
+    def __call__(self):
+        """Return the active window, or the last known one if the probe is stuck."""
+        worker = self._current_worker()
+        if worker is None:
+            return self._stale_result()
+
+        self._calls += 1
+        started = time.perf_counter()
+        value = worker.call(self._calls, self.deadline)
+        if value is _TIMED_OUT:
+            self.timeouts += 1
+            TIMEOUTS.inc()
+            self._strikes += 1
+            if self._strikes == 1:
+                logger.warning("Window probe missed its %.2fs deadline; reusing %r",
+                               self.deadline, self.last_result)
+            if self._strikes >= self.max_strikes:
+                self._recycle()
+            return self._stale_result()
+
+        if time.perf_counter() - started > self.slow_threshold:
+            self.slow += 1
+            SLOW_PROBES.inc()
+        self._strikes = 0
+        self.stale = False
+        self.stale_since = None
+        self.last_result = value
+        return value
+
+    def _stale_result(self):
+        """Flag the result stale; the last known window, or None once stuck too long."""
+        now = time.monotonic()
+        if not self.stale:
+            self.stale = True
+            self.stale_since = now
+        if now - self.stale_since >= self.max_stale:
+            return None
+        return self.last_result
+
+    def close(self):
+        """Stop the worker threads once their current calls return."""
+        for worker in [self._worker] + self._abandoned:
+            if worker is not None:
+                worker.stop()
+        self._worker = None
+        self._abandoned = []
+
+    def _current_worker(self):
+        """Return the worker to use, starting one if allowed."""
+        if self._worker is None:
+            self._abandoned = [worker for worker in self._abandoned if worker.is_alive()]
+            if len(self._abandoned) >= self.max_abandoned:
+                return None
+            self._worker = _ProbeWorker(self.probe, f"window-probe-{self.recycled}")
+        return self._worker
+
+    def _recycle(self):
+        """Abandon the stuck worker; the next call starts a fresh one."""
+        logger.warning("Window probe timed out %d times in a row; starting a new worker",
+                       self._strikes)
+        self._worker.stop()
+        self._abandoned.append(self._worker)
+        self._worker = None
+        self._strikes = 0
+        self.recycled += 1
+        RECYCLED.inc()
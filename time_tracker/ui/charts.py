@@ -0,0 +1,93 @@
+from PyQt6.QtCore import Qt, QMargins
+from PyQt6.QtCharts import (
+    QChart, QPieSeries, QBarSeries, QBarSet,
+    QBarCategoryAxis, QValueAxis, QPieSlice
+)
+
+def create_pie_chart(animated=True):
+    """Create the usage distribution pie chart, without data."""
+    chart = QChart()
+    chart.setTitle("Application Usage Distribution")
+    if animated:
+        chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
+    chart.setTheme(QChart.ChartTheme.ChartThemeDark)
+    chart.setBackgroundVisible(False)
+    chart.legend().setVisible(True)
+    chart.legend().setAlignment(Qt.AlignmentFlag.AlignRight)
+    return chart
+
+def create_bar_chart(animated=True):
+    """Create the top applications bar chart, without data."""
+    chart = QChart()
+    chart.setTitle("Top Applications by Time")
+    if animated:
+        chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
+    chart.setTheme(QChart.ChartTheme.ChartThemeDark)
+    chart.setBackgroundVisible(False)
+    chart.setMargins(QMargins(10, 10, 10, 10))
+    chart.legend().setVisible(True)
+    chart.legend().setAlignment(Qt.AlignmentFlag.AlignBottom)
+    return chart
+
+def fill_pie_chart(chart, app_times):
+    """Replace the pie chart's series with the share of time per app."""
+    chart.removeAllSeries()
+    if not app_times:
+        return
+
+    pie_series = QPieSeries()
+    total_time = sum(app_times.values())
+
+    for app, duration in app_times.items():
+        app_name = app.split(" (")[0]
+        percentage = (duration / total_time) * 100
+        slice = pie_series.append(app_name, duration/60)  # Convert to minutes
+        slice.setLabelVisible(True)
+        slice.setLabel(f"{app_name}\n{percentage:.1f}%")
+        slice.setLabelPosition(QPieSlice.LabelPosition.LabelOutside)
+        slice.setExploded(True)
+        slice.setExplodeDistanceFactor(0.1)
+
+    chart.addSeries(pie_series)
+
+def fill_bar_chart(chart, app_times, top=5):
+    """Replace the bar chart's series and axes with the top apps by time."""
+    chart.removeAllSeries()
+    # Axes are rebuilt on every fill, so drop the previous ones
+    for axis in chart.axes():
+        chart.removeAxis(axis)
+
+    sorted_apps = sorted(app_times.items(), key=lambda x: x[1], reverse=True)[:top]
+    if not sorted_apps:  # Check if we have any data
+        return
+
+    # Create and configure axes first
+    axis_x = QBarCategoryAxis()
+    axis_y = QValueAxis()
+    axis_y.setTitleText("Minutes")
+
+    # Add axes to chart first
+    chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
+    chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
+
+    bar_series = QBarSeries()
+    bar_set = QBarSet("Duration (minutes)")
+
+    categories = []
+    for app, duration in sorted_apps:
+        app_name = app.split(" (")[0]
+        categories.append(app_name)
+        bar_set.append(duration / 60)  # Convert to minutes
+
+    # Update axis categories
+    axis_x.append(categories)
+
+    # Set y-axis range
+    max_value = max(bar_set) if len(bar_set) > 0 else 0
+    axis_y.setRange(0, max_value * 1.1 if max_value > 0 else 10)
+
+    # Add series and attach axes
+    bar_series.append(bar_set)
+    chart.addSeries(bar_series)
+    bar_series.attachAxis(axis_x)
+    bar_series.attachAxis(axis_y)
@@ -0,0 +1,115 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from ..data_handlers.export import EXPORT_FIELDS
+from ..data_handlers.history import HistoryQuery
+
+HISTORY_HEADERS = ("Date", "App", "Window", "Minutes")
+
+logger = logging.getLogger(__name__)
+
+class HistoryModel(QAbstractTableModel):
+    """Table model over saved history that pages rows in on demand.
+
+    Views ask for more rows through canFetchMore/fetchMore as they scroll;
+    each page is read by a HistoryQuery on a background thread and handed
+    back through a queued signal. Sorting and filtering restart the query
+    in the data layer instead of reordering rows here. Pages that arrive
+    for an outdated query are dropped.
+    """
+
+    page_loaded = pyqtSignal(int, list, bool)
+
+    def __init__(self, storage, page_size=500, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self.page_size = page_size
+        self.rows = []
+        self.filter_text = ""
+        self.sort_column = "date"
+        self.descending = True
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        self._generation = 0
+        self._pages = None
+        self._loading = False
+        self._exhausted = False
+        self.page_loaded.connect(self._on_page_loaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HISTORY_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self.rows[index.row()][index.column()]
+        if index.column() == 3:
+            return f"{value / 60:.1f}"
+        return value
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HISTORY_HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._loading and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Start loading the next page in the background."""
+        if not self.canFetchMore(parent):
+            return
+        if self._pages is None:
+            query = HistoryQuery(self.storage, self.filter_text, self.sort_column,
+                                 self.descending)
+            self._pages = query.pages(self.page_size)
+        self._loading = True
+        self._executor.submit(self._load_page, self._generation, self._pages)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Restart the query sorted by a column."""
+        self.sort_column = EXPORT_FIELDS[column]
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.refresh()
+
+    def set_filter_text(self, text):
+        """Restart the query keeping rows whose app or window contains text."""
+        self.filter_text = text
+        self.refresh()
+
+    def refresh(self):
+        """Drop the loaded rows and start over, e.g. after new data was saved."""
+        self.beginResetModel()
+        self._generation += 1
+        self.rows = []
+        self._pages = None
+        self._loading = False
+        self._exhausted = False
+        self.endResetModel()
+
+    def close(self):
+        """Stop the background thread."""
+        self._executor.shutdown(wait=False)
+
+    def _load_page(self, generation, pages):
+        """Read one page on the worker thread."""
+        try:
+            page = next(pages, [])
+        except Exception:
+            logger.exception("Could not read history")
+            page = []
+        self.page_loaded.emit(generation, page, len(page) < self.page_size)
+
+    def _on_page_loaded(self, generation, page, exhausted):
+        """Append a page on the GUI thread."""
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._exhausted = exhausted
+        if page:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
@@ -1,31 +1,38 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QTableWidget, QTableWidgetItem,
-    QSystemTrayIcon, QMenu, QStyle, QTabWidget, QFrame
+    QSystemTrayIcon, QMenu, QStyle, QTabWidget, QFrame,
+    QLineEdit, QTableView
 )
 from PyQt6.QtCore import Qt, QTimer, QRectF, QMargins
 from PyQt6.QtGui import QIcon, QPalette, QColor, QPainter, QFont
-from PyQt6.QtCharts import (
-    QChart, QChartView, QPieSeries, QBarSeries, QBarSet, 
-    QBarCategoryAxis, QValueAxis, QPieSlice
-)
+from PyQt6.QtCharts import QChartView
 from PyQt6.QtWidgets import QGraphicsScene
 from ..tracker.application_tracker import ApplicationTracker
-from ..tracker.utils import get_active_window_info
+from ..tracker.timeline_pyramid import TimelinePyramid
+from ..data_handlers.focus_stats import FOCUS_QUANTILES, focus_percentiles
 from ..data_handlers.storage import DataStorage
+from ..metrics import timed
+from .charts import create_bar_chart, create_pie_chart, fill_bar_chart, fill_pie_chart
+from .history_model import HistoryModel
 from .styles import DARK_THEME
+from .timeline_widget import TimelineWidget
+from datetime import date
 import time
 
 class TimeTrackerUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, tracker=None):
         super().__init__()
-        self.tracker = ApplicationTracker()
+        self.tracker = tracker or ApplicationTracker()
         self.timer = QTimer()
         self.tracking = False
         self.start_time = None
         self.current_app = None
         self.setup_ui()
         self.setStyleSheet(DARK_THEME)
+        if self.tracker.app_times:
+            # Totals resumed from an earlier run today
+            self.update_display()
         
     def setup_ui(self):
         """Setup the main window UI."""
@@ -87,13 +94,7 @@ class TimeTrackerUI(QMainWindow):
         pie_container = QWidget()
         pie_layout = QVBoxLayout(pie_container)
         
-        self.pie_chart = QChart()
-        self.pie_chart.setTitle("Application Usage Distribution")
-        self.pie_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-        self.pie_chart.setTheme(QChart.ChartTheme.ChartThemeDark)
-        self.pie_chart.setBackgroundVisible(False)
-        self.pie_chart.legend().setVisible(True)
-        self.pie_chart.legend().setAlignment(Qt.AlignmentFlag.AlignRight)
+        self.pie_chart = create_pie_chart()
         
         pie_view = QChartView(self.pie_chart)
         pie_view.setRenderHints(QPainter.RenderHint.Antialiasing | 
@@ -115,14 +116,7 @@ class TimeTrackerUI(QMainWindow):
         bar_container = QWidget()
         bar_layout = QVBoxLayout(bar_container)
         
-        self.bar_chart = QChart()
-        self.bar_chart.setTitle("Top Applications by Time")
-        self.bar_chart.setAnimationOptions(QChart.AnimationOption.SeriesAnimations)
-        self.bar_chart.setTheme(QChart.ChartTheme.ChartThemeDark)
-        self.bar_chart.setBackgroundVisible(False)
-        self.bar_chart.setMargins(QMargins(10, 10, 10, 10))
-        self.bar_chart.legend().setVisible(True)
-        self.bar_chart.legend().setAlignment(Qt.AlignmentFlag.AlignBottom)
+        self.bar_chart = create_bar_chart()
         
         bar_view = QChartView(self.bar_chart)
         bar_view.setRenderHints(QPainter.RenderHint.Antialiasing | 
@@ -161,6 +155,44 @@ class TimeTrackerUI(QMainWindow):
         stats_layout.addStretch()
         tab_widget.addTab(stats_tab, "Statistics")
         
+        # Recent activity tab, fed from the tracker's in-memory switch buffer
+        activity_tab = QWidget()
+        activity_layout = QVBoxLayout(activity_tab)
+        self.activity_table = QTableWidget()
+        self.activity_table.setColumnCount(4)
+        self.activity_table.setHorizontalHeaderLabels(["Time", "From", "To", "Duration (s)"])
+        self.activity_table.horizontalHeader().setStretchLastSection(True)
+        activity_layout.addWidget(self.activity_table)
+        tab_widget.addTab(activity_tab, "Recent Activity")
+        self.shown_switches = 0
+        
+        # Timeline tab, painted from a pyramid fed with finished segments
+        timeline_tab = QWidget()
+        timeline_layout = QVBoxLayout(timeline_tab)
+        self.timeline_widget = TimelineWidget()
+        timeline_layout.addWidget(self.timeline_widget)
+        tab_widget.addTab(timeline_tab, "Timeline")
+        self.timeline_pyramid = None
+        # Segments of tracker.segments already added; the tracker starts a new store each day
+        self.shown_store = None
+        self.shown_segments = 0
+        
+        # History tab, paged in from saved days as the table scrolls
+        history_tab = QWidget()
+        history_layout = QVBoxLayout(history_tab)
+        self.history_filter = QLineEdit()
+        self.history_filter.setPlaceholderText("Filter by app or window title")
+        history_layout.addWidget(self.history_filter)
+        self.history_model = HistoryModel(self.tracker.storage, parent=self)
+        self.history_view = QTableView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.setSortingEnabled(True)
+        self.history_view.sortByColumn(0, Qt.SortOrder.DescendingOrder)
+        self.history_view.horizontalHeader().setStretchLastSection(True)
+        self.history_filter.textChanged.connect(self.history_model.set_filter_text)
+        history_layout.addWidget(self.history_view)
+        tab_widget.addTab(history_tab, "History")
+        
         layout.addWidget(tab_widget)
         
         # Setup system tray
@@ -203,37 +235,30 @@ class TimeTrackerUI(QMainWindow):
         self.status_label.setText("Tracking stopped")
         
         # Handle final app
-        if self.current_app:
-            duration = time.time() - self.start_time
-            if duration > 1:
-                self.tracker._update_app_time(self.current_app, duration)
+        self.tracker._handle_final_app()
+        self.tracker.current_app = None
         
         # Save data
-        self.tracker.storage.save_data(self.tracker.app_times)
+        self.tracker.save()
         self.update_display()
+        self.history_model.refresh()
         
     def track_current_app(self):
         """Track the current active application."""
         if not self.tracking:
             return
             
-        current_time = time.time()
-        active_app = get_active_window_info()
-        
-        if active_app != self.current_app:
-            if self.current_app is not None:
-                duration = current_time - self.start_time
-                if duration > 1:
-                    self.tracker._update_app_time(self.current_app, duration)
-            
-            self.current_app = active_app
-            self.start_time = current_time
-            
+        self.tracker.poll()
+        if self.tracker.probe_stale:
+            self.status_label.setText("Tracking active (window probe not responding)")
+        else:
+            self.status_label.setText("Tracking active...")
         self.update_display()
         
     def update_charts(self):
         """Update the charts with current data."""
-        if not self.tracker.app_times:
+        app_times = self.tracker.app_times.snapshot()
+        if not app_times:
             self.pie_chart.removeAllSeries()
             self.bar_chart.removeAllSeries()
             self.pie_placeholder.show()
@@ -243,78 +268,18 @@ class TimeTrackerUI(QMainWindow):
         self.pie_placeholder.hide()
         self.bar_placeholder.hide()
         
-        # Update pie chart
-        pie_series = QPieSeries()
-        total_time = sum(self.tracker.app_times.values())
-        
-        for app, duration in self.tracker.app_times.items():
-            app_name = app.split(" (")[0]
-            percentage = (duration / total_time) * 100
-            slice = pie_series.append(app_name, duration/60)  # Convert to minutes
-            slice.setLabelVisible(True)
-            slice.setLabel(f"{app_name}\n{percentage:.1f}%")
-            slice.setLabelPosition(QPieSlice.LabelPosition.LabelOutside)
-            slice.setExploded(True)
-            slice.setExplodeDistanceFactor(0.1)
-        
-        self.pie_chart.removeAllSeries()
-        self.pie_chart.addSeries(pie_series)
-        
-        # Update bar chart
-        self.bar_chart.removeAllSeries()
-        
-        # Create and configure axes first
-        axis_x = QBarCategoryAxis()
-        axis_y = QValueAxis()
-        axis_y.setTitleText("Minutes")
-        
-        # Add axes to chart first
-        self.bar_chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
-        self.bar_chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
-        
-        bar_series = QBarSeries()
-        bar_set = QBarSet("Duration (minutes)")
-        
-        # Get top 5 apps
-        sorted_apps = sorted(
-            self.tracker.app_times.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
-        
-        if not sorted_apps:  # Check if we have any data
-            return
-            
-        categories = []
-        for app, duration in sorted_apps:
-            app_name = app.split(" (")[0]
-            categories.append(app_name)
-            bar_set.append(duration / 60)  # Convert to minutes
-        
-        # Update axis categories
-        axis_x.append(categories)
-        
-        # Set y-axis range
-        max_value = max(bar_set) if len(bar_set) > 0 else 0
-        axis_y.setRange(0, max_value * 1.1 if max_value > 0 else 10)
-        
-        # Add series and attach axes
-        bar_series.append(bar_set)
-        self.bar_chart.addSeries(bar_series)
-        bar_series.attachAxis(axis_x)
-        bar_series.attachAxis(axis_y)
-        
-        self.bar_chart.legend().setVisible(True)
-        self.bar_chart.legend().setAlignment(Qt.AlignmentFlag.AlignBottom)
+        fill_pie_chart(self.pie_chart, app_times)
+        fill_bar_chart(self.bar_chart, app_times)
         
     def update_statistics(self):
         """Update the statistics display."""
-        if not self.tracker.app_times:
+        app_times = self.tracker.app_times.snapshot()
+        if not app_times:
             self.stats_label.setText("No data available")
             return
             
-        total_time = sum(self.tracker.app_times.values())
-        app_count = len(self.tracker.app_times)
+        total_time = sum(app_times.values())
+        app_count = len(app_times)
         avg_time = total_time / app_count if app_count > 0 else 0
         
         stats_text = f"""
@@ -322,16 +287,26 @@ class TimeTrackerUI(QMainWindow):
         <p><b>Total Tracking Time:</b> {total_time/60:.1f} minutes</p>
         <p><b>Applications Tracked:</b> {app_count}</p>
         <p><b>Average Time per App:</b> {avg_time/60:.1f} minutes</p>
-        <p><b>Most Used App:</b> {max(self.tracker.app_times.items(), key=lambda x: x[1])[0]}</p>
+        <p><b>Most Used App:</b> {max(app_times.items(), key=lambda x: x[1])[0]}</p>
         """
+        
+        # Focus length percentiles for the apps switched to most often
+        labels = " / ".join(f"p{round(q * 100)}" for q in FOCUS_QUANTILES)
+        focus_rows = focus_percentiles(self.tracker.focus_sketches)[:5]
+        if focus_rows:
+            stats_text += f"<h3>Focus Time per Switch ({labels}, minutes)</h3>"
+            for app_name, count, values in focus_rows:
+                minutes = " / ".join(f"{value / 60:.1f}" for value in values)
+                stats_text += f"<p><b>{app_name}:</b> {minutes} ({count} switches)</p>"
         self.stats_label.setText(stats_text)
         
+    @timed("time_tracker_ui_update_seconds", "Latency of refreshing the tracker window")
     def update_display(self):
         """Update all displays."""
         # Update table
         self.table.setRowCount(0)
         sorted_apps = sorted(
-            self.tracker.app_times.items(),
+            self.tracker.app_times.snapshot().items(),
             key=lambda x: x[1],
             reverse=True
         )
@@ -355,6 +330,49 @@ class TimeTrackerUI(QMainWindow):
         # Update charts and statistics
         self.update_charts()
         self.update_statistics()
+        self.update_recent_activity()
+        self.update_timeline()
+        
+    def update_recent_activity(self):
+        """Show the most recent switches, redrawing only when new ones arrived."""
+        recent = self.tracker.recent_switches
+        if recent.total == self.shown_switches:
+            return
+        self.shown_switches = recent.total
+        
+        events = recent.recent(50)
+        self.activity_table.setRowCount(len(events))
+        for row, event in enumerate(events):
+            timestamp = time.strftime("%H:%M:%S", time.localtime(event.timestamp))
+            self.activity_table.setItem(row, 0, QTableWidgetItem(timestamp))
+            self.activity_table.setItem(row, 1, QTableWidgetItem(event.from_app))
+            self.activity_table.setItem(row, 2, QTableWidgetItem(event.to_app))
+            self.activity_table.setItem(row, 3, QTableWidgetItem(f"{event.duration:.1f}"))
+        
+    def update_timeline(self):
+        """Add segments finished since the last refresh to today's timeline."""
+        today = date.today()
+        if self.timeline_pyramid is None or self.timeline_pyramid.day != today:
+            # Start the day from the saved minute timeline, if there is one
+            saved = self.tracker.timelines.get(today)
+            self.timeline_pyramid = (TimelinePyramid.from_timeline(saved) if saved is not None
+                                     else TimelinePyramid(today))
+            self.timeline_widget.set_pyramid(self.timeline_pyramid)
+            # The tracker's timeline already holds every segment recorded so far
+            self.shown_store = self.tracker.segments
+            self.shown_segments = len(self.shown_store)
+        
+        segments = self.tracker.segments
+        if segments is not self.shown_store:
+            self.shown_store = segments
+            self.shown_segments = 0
+        if len(segments) == self.shown_segments:
+            return
+        for index in range(self.shown_segments, len(segments)):
+            segment = segments[index]
+            self.timeline_pyramid.add(segment.app, segment.start, segment.end)
+        self.shown_segments = len(segments)
+        self.timeline_widget.update()
         
     def quit_application(self):
         """Quit the application."""
@@ -366,4 +384,6 @@ class TimeTrackerUI(QMainWindow):
         """Handle application closing."""
         if self.tracking:
             self.stop_tracking()
+        self.tracker.close()
+        self.history_model.close()
         event.accept()
\ No newline at end of file
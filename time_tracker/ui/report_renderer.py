@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Render without a display; must be set before the QApplication exists
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QRect, QRectF, QSize
+from PyQt6.QtGui import QColor, QImage, QPainter
+from PyQt6.QtSvg import QSvgGenerator
+from PyQt6.QtWidgets import QApplication, QGraphicsScene
+from ..data_handlers.fileio import read_json
+from ..data_handlers.formatters import ungroup_application_data
+from ..data_handlers.storage import DAY_FILE_PATTERN
+from .charts import create_bar_chart, create_pie_chart, fill_bar_chart, fill_pie_chart
+
+BACKGROUND_COLOR = "#2b2b2b"
+
+class ChartRenderer:
+    """Draw the pie and bar charts side by side into image files.
+
+    The charts live in one QGraphicsScene that is refilled for every
+    report, so a worker builds its Qt objects once, not per image.
+    """
+
+    def __init__(self, width=1200, height=500):
+        self.app = QApplication.instance() or QApplication(["time-tracker-render"])
+        self.width = width
+        self.height = height
+        self.scene = QGraphicsScene(0, 0, width, height)
+        self.pie_chart = create_pie_chart(animated=False)
+        self.bar_chart = create_bar_chart(animated=False)
+        self.pie_chart.setGeometry(QRectF(0, 0, width / 2, height))
+        self.bar_chart.setGeometry(QRectF(width / 2, 0, width / 2, height))
+        self.scene.addItem(self.pie_chart)
+        self.scene.addItem(self.bar_chart)
+
+    def render(self, app_times, output):
+        """Render a report for app_times to a .png or .svg file."""
+        fill_pie_chart(self.pie_chart, app_times)
+        fill_bar_chart(self.bar_chart, app_times)
+        # Chart layouts (axes, legends) are applied from the event loop
+        self.app.processEvents()
+
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if output.suffix == ".svg":
+            target = QSvgGenerator()
+            target.setFileName(str(output))
+            target.setSize(QSize(self.width, self.height))
+            target.setViewBox(QRect(0, 0, self.width, self.height))
+        else:
+            target = QImage(self.width, self.height, QImage.Format.Format_ARGB32)
+
+        painter = QPainter(target)
+        painter.setRenderHints(QPainter.RenderHint.Antialiasing |
+                               QPainter.RenderHint.TextAntialiasing)
+        painter.fillRect(0, 0, self.width, self.height, QColor(BACKGROUND_COLOR))
+        self.scene.render(painter)
+        painter.end()
+
+        if isinstance(target, QImage) and not target.save(str(output)):
+            raise OSError(f"Could not write {output}")
+        return output
+
+    def render_day_file(self, day_file, output):
+        """Render the report for one saved day file."""
+        data = read_json(day_file)
+        return self.render(ungroup_application_data(data["applications"]), output)
+
+def find_report_jobs(inputs, output_dir, fmt="png"):
+    """Return (day_file, output) pairs for day files under the given paths.
+
+    Directories are searched recursively and keep their layout below the
+    output directory, so one directory per user renders one folder per user.
+    """
+    jobs = []
+    for root in map(Path, inputs):
+        if root.is_dir():
+            day_files = sorted(p for p in root.rglob("app_usage_*.json")
+                               if DAY_FILE_PATTERN.match(p.name))
+            jobs.extend((p, Path(output_dir) / p.relative_to(root).with_suffix(f".{fmt}"))
+                        for p in day_files)
+        else:
+            jobs.append((root, Path(output_dir) / root.with_suffix(f".{fmt}").name))
+    return jobs
+
+def render_reports(jobs, workers=None, width=1200, height=500):
+    """Render every job, fanning out over a process pool. Returns the count."""
+    if workers == 1:
+        renderer = ChartRenderer(width, height)
+        for day_file, output in jobs:
+            renderer.render_day_file(day_file, output)
+        return len(jobs)
+
+    # Spawned workers start without the parent's Qt state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(width, height)) as pool:
+        return sum(1 for _ in pool.map(_render_job, jobs, chunksize=16))
+
+_renderer = None
+
+def _init_worker(width, height):
+    """Create the worker process's reusable renderer."""
+    global _renderer
+    _renderer = ChartRenderer(width, height)
+
+def _render_job(job):
+    """Render one (day_file, output) job in a worker process."""
+    day_file, output = job
+    return str(_renderer.render_day_file(day_file, output))
@@ -0,0 +1,117 @@
+from datetime import datetime
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QColor, QPainter
+from PyQt6.QtWidgets import QToolTip, QWidget
+from ..tracker.timeline import SECONDS_PER_DAY
+
+MIN_SPAN = 60
+AXIS_HEIGHT = 18
+
+class TimelineWidget(QWidget):
+    """Gantt-style strip of the day showing which app was active when.
+
+    Paints from a TimelinePyramid: each repaint asks it for the dominant
+    app under every pixel of the visible span and draws runs of equal
+    pixels as one rectangle. Scrolling zooms around the cursor and
+    dragging pans; both only change the visible span.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pyramid = None
+        self.view_start = 0.0
+        self.view_end = float(SECONDS_PER_DAY)
+        self._drag_x = None
+        self._colors = {}
+        self.setMinimumHeight(80)
+        self.setMouseTracking(True)
+
+    def set_pyramid(self, pyramid):
+        """Show another day's pyramid, keeping the visible span."""
+        self.pyramid = pyramid
+        self.update()
+
+    def set_view(self, start, end):
+        """Show the span between two offsets in seconds since midnight."""
+        day_seconds = self.pyramid.day_seconds if self.pyramid is not None else SECONDS_PER_DAY
+        span = min(max(end - start, MIN_SPAN), day_seconds)
+        start = min(max(start, 0.0), day_seconds - span)
+        self.view_start, self.view_end = start, start + span
+        self.update()
+
+    def offset_at(self, x):
+        """Return the offset in seconds since midnight under a widget x position."""
+        return self.view_start + x / max(self.width(), 1) * (self.view_end - self.view_start)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1e1e1e"))
+        width = self.width()
+        height = self.height() - AXIS_HEIGHT
+        if self.pyramid is not None and width > 0:
+            dominant = self.pyramid.dominant(self.view_start, self.view_end, width)
+            run_start = 0
+            for x in range(1, width + 1):
+                if x == width or dominant[x] != dominant[run_start]:
+                    if dominant[run_start]:
+                        painter.fillRect(QRectF(run_start, 4, x - run_start, height - 8),
+                                         self._color(dominant[run_start]))
+                    run_start = x
+        self._paint_axis(painter, height)
+        painter.end()
+
+    def _paint_axis(self, painter, top):
+        """Label the visible span with evenly spaced times of day."""
+        painter.setPen(QColor("white"))
+        span = self.view_end - self.view_start
+        step = next((s for s in (60, 300, 900, 1800, 3600, 7200, 10800)
+                     if span / s <= 12), 21600)
+        tick = (int(self.view_start) // step + 1) * step
+        while tick < self.view_end:
+            x = (tick - self.view_start) / span * self.width()
+            painter.drawLine(int(x), top, int(x), top + 4)
+            painter.drawText(int(x) + 2, top + AXIS_HEIGHT - 4, self._clock(tick))
+            tick += step
+
+    def _clock(self, offset):
+        """Return the local HH:MM of an offset, which differs from it when the clocks change."""
+        if self.pyramid is None:
+            return f"{int(offset) // 3600:02d}:{int(offset) % 3600 // 60:02d}"
+        return datetime.fromtimestamp(self.pyramid.timestamp(offset)).strftime("%H:%M")
+
+    def _color(self, app_id):
+        """Return a stable color per process, so all of its titles match."""
+        # Keyed by name: app ids are only meaningful within one day's pyramid
+        process = self.pyramid.apps[app_id].split(" (")[0]
+        color = self._colors.get(process)
+        if color is None:
+            hue = sum(process.encode('utf-8')) * 47 % 360
+            color = self._colors[process] = QColor.fromHsv(hue, 160, 220)
+        return color
+
+    def wheelEvent(self, event):
+        """Zoom around the cursor."""
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        anchor = self.offset_at(event.position().x())
+        self.set_view(anchor - (anchor - self.view_start) * factor,
+                      anchor + (self.view_end - anchor) * factor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event):
+        x = event.position().x()
+        if self._drag_x is not None:
+            shift = (self._drag_x - x) / max(self.width(), 1) * (self.view_end - self.view_start)
+            self._drag_x = x
+            self.set_view(self.view_start + shift, self.view_end + shift)
+        elif self.pyramid is not None:
+            offset = self.offset_at(x)
+            app = self.pyramid.app_at(offset)
+            when = self._clock(offset)
+            QToolTip.showText(event.globalPosition().toPoint(),
+                              f"{when} {app}" if app else when, self)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None